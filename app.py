@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
 import panel
 from panel.template import BootstrapTemplate
 
@@ -28,35 +30,154 @@ panel.extension(
     ]
 )
 
-from ui.fresque_aeromaps_UI import FresqueAeroMapsUI
+import logging
+import time
+
+from core.memory_budget import MEMORY_BUDGET, SESSION_QUEUE_TIMEOUT, format_sessions_memory_usage
+from core.metrics import LIVE_SESSIONS
 
 from utils import APPLICATION_ICON_PATH
 
+# The interface (and its figures libraries) is only imported when the first session loads it, so the server serves the page shell without waiting for it :
+if TYPE_CHECKING:
+    from ui.fresque_aeromaps_UI import FresqueAeroMapsUI
 
 
 
-def create_application_view() -> BootstrapTemplate:
+
+LOGGER = logging.getLogger("app")
+
+# Interval between two admission attempts of a new session waiting for the memory to go back under the budget, in milliseconds :
+SESSION_QUEUE_RETRY_INTERVAL = 2000
+
+
+def build_application() -> "FresqueAeroMapsUI":
     """
-    Creates the Panel application view for the Fresqu'AéroMaps interface.
+    Builds the Fresqu'AéroMaps interface for the current session.
 
     #### Returns :
-    - `BootstrapTemplate`: A Panel Bootstrap template containing the application view.
+    - `FresqueAeroMapsUI`: The interface of the session.
+    """
+    from ui.fresque_aeromaps_UI import FresqueAeroMapsUI
+    from ui.utils.fresque_aeromaps_UI_widgets import close_widgets, get_kernel_widgets
+
+    # Draw the interface (the figures updates computed in the background are applied on the session's event loop) :
+    document = panel.state.curdoc
+    application = FresqueAeroMapsUI(
+        dispatch = document.add_next_tick_callback if document is not None else None
+    )
+
+    # Count the live sessions and their memory usage (exposed by the metrics route, see `metrics_plugin.py`) :
+    session_id = document.session_context.id if document is not None and document.session_context is not None else str(id(application))
+    LIVE_SESSIONS.inc()
+    MEMORY_BUDGET.register_session(session_id, application.get_memory_usage)
+    LOGGER.info("Session opened, %s", format_sessions_memory_usage({session_id: application.get_memory_usage()}))
+
+    # Release the interface with its session (the widgets are kept by the widgets library until they are closed) :
+    def release_application(_session_context: Any) -> None:
+        LIVE_SESSIONS.dec()
+        MEMORY_BUDGET.unregister_session(session_id)
+
+        # The document of the session is already destroyed, so the widgets cannot send their closing messages anymore.
+        # The widgets not reachable from the interface anymore (for instance, the replaced default layouts) are found through the kernel of the session :
+        session_widgets = get_kernel_widgets(application.checkboxes_grid_section)
+        application.close(notify_frontend = False)
+        close_widgets(session_widgets, notify_frontend = False)
+        LOGGER.info("Session %s closed.", session_id)
+
+    panel.state.on_session_destroyed(release_application)
+
+    return application
+
+
+def create_template(main: Any) -> BootstrapTemplate:
     """
-    # Draw the interface :
-    application = FresqueAeroMapsUI()
-    interface = application.display_interface()
+    Creates the Panel Bootstrap template of the application.
 
-    # Create the Panel application view :
-    app_view = panel.panel(interface, sizing_mode = "stretch_both")
+    #### Arguments :
+    - `main (Any)`: The main content of the template.
 
-    template = BootstrapTemplate(
-        main = app_view,
+    #### Returns :
+    - `BootstrapTemplate`: The Panel Bootstrap template.
+    """
+    return BootstrapTemplate(
+        main = main,
         title = "Fresqu'AéroMaps",
         favicon = APPLICATION_ICON_PATH
     )
 
-    return template.servable()
+
+def build_application_view() -> Tuple["FresqueAeroMapsUI", BootstrapTemplate]:
+    """
+    Builds the Fresqu'AéroMaps interface and its Panel application view for the current session, right away (see `create_application_view` for the served view).
+
+    #### Returns :
+    - `Tuple[FresqueAeroMapsUI, BootstrapTemplate]`: The interface of the session, and the Panel Bootstrap template containing its view.
+    """
+    application = build_application()
+    app_view = panel.panel(application.display_interface(), sizing_mode = "stretch_both")
+
+    return application, create_template(app_view)
+
+
+def create_application_view() -> BootstrapTemplate:
+    """
+    Creates the Panel application view for the Fresqu'AéroMaps interface.
+
+    The page is served with a loading placeholder, and the interface is built once the page is loaded in the browser.
+    If the memory of the server exceeds its budget (see `MEMORY_BUDGET_MB`), the interface is only built once the memory goes back under the budget, and the session is refused after `SESSION_QUEUE_TIMEOUT` seconds.
+
+    #### Returns :
+    - `BootstrapTemplate`: A Panel Bootstrap template containing the application view.
+    """
+    document = panel.state.curdoc
+    app_view = panel.Column(
+        panel.pane.Markdown("Chargement de Fresqu'AéroMaps..."),
+        sizing_mode = "stretch_both",
+        loading = True
+    )
+    queued_since: Optional[float] = None # Start of the wait of the session for the memory budget (None if it is not waiting).
+
+    def load_application() -> None:
+        nonlocal queued_since
+
+        # Wait for the memory to go back under the budget (the shared caches are released first) :
+        if not MEMORY_BUDGET.admit_session():
+            if queued_since is None:
+                queued_since = time.monotonic()
+                MEMORY_BUDGET.queue_session()
+                app_view.objects = [panel.pane.Markdown("Le serveur est très sollicité : l'application démarrera dans quelques instants...")]
+
+            if time.monotonic() - queued_since < SESSION_QUEUE_TIMEOUT:
+                document.add_timeout_callback(load_application, SESSION_QUEUE_RETRY_INTERVAL)
+                return
+
+            queued_since = None
+            MEMORY_BUDGET.unqueue_session(refused = True)
+            LOGGER.warning("Session refused, the memory budget stayed exceeded for %d seconds.", SESSION_QUEUE_TIMEOUT)
+            app_view.objects = [panel.pane.Markdown("Le serveur est saturé : merci de réessayer dans quelques minutes.")]
+            app_view.loading = False
+            return
+
+        if queued_since is not None:
+            queued_since = None
+            MEMORY_BUDGET.unqueue_session()
+
+        application = build_application()
+        app_view.objects = [panel.panel(application.display_interface(), sizing_mode = "stretch_both")]
+        app_view.loading = False
+
+    def forget_queued_session(_session_context: Any) -> None:
+        # The session was closed while waiting for the memory budget :
+        if queued_since is not None:
+            MEMORY_BUDGET.unqueue_session()
+
+    panel.state.onload(load_application)
+    panel.state.on_session_destroyed(forget_queued_session)
+
+    return create_template([app_view]).servable()
 
 
-# Launch the Panel server with the application view :
-create_application_view()
+# Launch the Panel server with the application view (only when served by `panel serve`, not when imported, for instance by `benchmarks/load_test.py`) :
+if __name__.startswith("bokeh"):
+    create_application_view()
@@ -0,0 +1,307 @@
+from typing import Any, Dict, IO, Iterator, List, Optional
+
+# Load the Python Path from the .env file :
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROOT_DIRECTORY = os.path.dirname(__file__)
+SRC_DIRECTORY  = os.getenv("PYTHONPATH", os.path.join(ROOT_DIRECTORY, "src"))
+if SRC_DIRECTORY not in sys.path:
+    sys.path.append(SRC_DIRECTORY)
+
+import argparse
+import csv
+import json
+import logging
+import math
+
+from pathlib import Path
+
+from bqplot_figures.utils.chart_data import ChartData, get_chart_data
+
+from core.aeromaps_utils.compute_pool import COMPUTE_POOL_MAX_WORKERS, iter_computed_scenarios
+from core.aeromaps_utils.scenario_lattice import iter_cards_combinations, compress_scenario_result, write_scenario_lattice
+
+
+
+
+LOGGER = logging.getLogger("batch")
+
+# Columns of the exported rows (one row per year of each plotted series, and one row per bar) :
+ROWS_COLUMNS = ["selection", "cards_ids", "scenario", "chart", "series", "year", "value"]
+
+
+def get_scenario_rows(
+        selection: int,
+        cards_ids: Optional[List[str]],
+        fingerprint: str,
+        chart_data: ChartData
+    ) -> Iterator[Dict[str, Any]]:
+    """
+    Get the plotted series and bar values of a scenario as rows (the long format shared by every output format).
+
+    #### Arguments :
+    - `selection (int)` : The index of the cards selection in the batch.
+    - `cards_ids (Optional[List[str]])` : The identifiers of the selected cards (None or empty for the reference scenario).
+    - `fingerprint (str)` : The fingerprint of the scenario (see `get_scenario_parameters`).
+    - `chart_data (ChartData)` : The chart data of the scenario.
+
+    #### Returns :
+    - `Iterator[Dict[str, Any]]` : The rows, with the columns of `ROWS_COLUMNS` (the year of a bar is None).
+    """
+    charts_configuration = chart_data.charts_configuration
+    row = {"selection": selection, "cards_ids": ";".join(cards_ids or []), "scenario": fingerprint}
+
+    lines = [
+        ("historic_line", charts_configuration.lines_names[0], chart_data.historic_line),
+        *zip(["prospective_lines"] * 2, charts_configuration.lines_names[1:3], chart_data.prospective_lines),
+        *zip( # The last area is closed by the "all aspects" line over the full years.
+            ["aspects_areas"] * (charts_configuration.number_of_aspects + 1),
+            [*charts_configuration.aspects_names, charts_configuration.lines_names[2]],
+            chart_data.aspects_areas
+        )
+    ]
+    for chart, series, line in lines:
+        for year, value in line.items():
+            yield {**row, "chart": chart, "series": series, "year": int(year), "value": float(value)}
+
+    bars = [
+        *zip(["consumption_bars"] * len(chart_data.consumption_bars), charts_configuration.bars_names, chart_data.consumption_bars),
+        *zip(["budget_bars"] * len(chart_data.budget_bars), charts_configuration.bars_names, chart_data.budget_bars)
+    ]
+    for chart, series, value in bars:
+        yield {**row, "chart": chart, "series": series, "year": None, "value": float(value)}
+
+
+class RowsWriter:
+    """
+    Base class of the writers streaming the exported rows to a file (the rows of each scenario are flushed as soon as it is computed).
+
+    #### Arguments :
+    - `path (Path)` : The path of the output file.
+    """
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+    def __enter__(self) -> "RowsWriter":
+        return self
+
+
+    def __exit__(self, *_exception_info: Any) -> None:
+        self.close()
+
+
+class CsvRowsWriter(RowsWriter):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+
+        self._file: IO[str] = open(path, "w", encoding = "utf-8", newline = "")
+        self._writer = csv.DictWriter(self._file, fieldnames = ROWS_COLUMNS)
+        self._writer.writeheader()
+
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesRowsWriter(RowsWriter):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+
+        self._file: IO[str] = open(path, "w", encoding = "utf-8")
+
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            # NaN is not valid JSON :
+            if row["value"] is not None and math.isnan(row["value"]):
+                row = {**row, "value": None}
+            self._file.write(json.dumps(row, ensure_ascii = False) + "\n")
+        self._file.flush()
+
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetRowsWriter(RowsWriter):
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+
+        # Optional dependency, only needed for this output format :
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as exception:
+            raise ValueError("The Parquet output needs the `pyarrow` package (`pip install pyarrow`).") from exception
+
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([
+            ("selection", pyarrow.int64()),
+            ("cards_ids", pyarrow.string()),
+            ("scenario", pyarrow.string()),
+            ("chart", pyarrow.string()),
+            ("series", pyarrow.string()),
+            ("year", pyarrow.int64()),
+            ("value", pyarrow.float64())
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(str(path), self._schema)
+
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # Each scenario is written as a row group :
+        self._writer.write_table(self._pyarrow.Table.from_pylist(rows, schema = self._schema))
+
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+# Writer of each output format (by file extension) :
+ROWS_WRITERS = {
+    "csv": CsvRowsWriter,
+    "jsonl": JsonLinesRowsWriter,
+    "parquet": ParquetRowsWriter
+}
+
+
+def read_cards_selections(arguments: argparse.Namespace) -> List[Optional[List[str]]]:
+    """
+    Get the cards selections to compute from the command line arguments.
+
+    #### Arguments :
+    - `arguments (argparse.Namespace)` : The parsed command line arguments.
+
+    #### Returns :
+    - `List[Optional[List[str]]]` : The identifiers of the cards of each selection (None for the reference scenario).
+    """
+    if arguments.all:
+        return [list(cards_ids) or None for cards_ids in iter_cards_combinations()]
+
+    if arguments.selections_file:
+        with open(arguments.selections_file, "r", encoding = "utf-8") as file:
+            selections = json.load(file)
+        if not isinstance(selections, list) or not all(selection is None or isinstance(selection, list) for selection in selections):
+            raise ValueError(f"The selections file '{arguments.selections_file}' must contain a JSON list of cards identifiers lists.")
+
+        return [selection or None for selection in selections]
+
+    return [
+        [card_id.strip() for card_id in selection.split(",") if card_id.strip()] or None
+        for selection in arguments.cards
+    ]
+
+
+def run_batch(
+        cards_ids_lists: List[Optional[List[str]]],
+        output_path: Path,
+        output_format: str,
+        max_workers: int = COMPUTE_POOL_MAX_WORKERS,
+        scenario_lattice_path: Optional[Path] = None
+    ) -> int:
+    """
+    Computes the distinct scenarios of several cards selections in parallel, and streams their plotted series and bar values to a file as each scenario finishes.
+
+    #### Arguments :
+    - `cards_ids_lists (List[Optional[List[str]]])` : The identifiers of the cards of each selection.
+    - `output_path (Path)` : The path of the output file.
+    - `output_format (str)` : The format of the output file (see `ROWS_WRITERS`).
+    - `max_workers (int)` : The maximal number of worker processes. Defaults to `COMPUTE_POOL_MAX_WORKERS`.
+    - `scenario_lattice_path (Optional[Path])` : If given, the computed scenarios are also written to this precomputed scenarios file (see `write_scenario_lattice`). Defaults to None.
+
+    #### Returns :
+    - `int` : The number of distinct scenarios computed.
+    """
+    if output_format not in ROWS_WRITERS:
+        raise ValueError(f"Unknown output format '{output_format}'. Allowed formats are: {list(ROWS_WRITERS)}.")
+
+    number_of_scenarios = 0
+    scenarios: Dict[str, bytes] = {}
+    with ROWS_WRITERS[output_format](output_path) as writer:
+        for selections, fingerprint, scenario_result in iter_computed_scenarios(cards_ids_lists, max_workers):
+            chart_data = get_chart_data(scenario_result)
+            writer.write([
+                row
+                for selection in selections
+                for row in get_scenario_rows(selection, cards_ids_lists[selection], fingerprint, chart_data)
+            ])
+
+            if scenario_lattice_path is not None:
+                scenarios[fingerprint] = compress_scenario_result(scenario_result)
+
+            number_of_scenarios += 1
+            LOGGER.info("Scenario %d exported (%d selections) : %s", number_of_scenarios, len(selections), fingerprint)
+
+    if scenario_lattice_path is not None:
+        write_scenario_lattice(scenarios, scenario_lattice_path)
+        LOGGER.info("%d scenarios written to '%s'.", len(scenarios), scenario_lattice_path)
+
+    return number_of_scenarios
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description = "Computes the scenarios of several cards selections without the interface, and exports their plotted series and bar values."
+    )
+
+    selections = parser.add_mutually_exclusive_group(required = True)
+    selections.add_argument("--all", action = "store_true", help = "Compute every combination of the implemented cards.")
+    selections.add_argument("--cards", action = "append", metavar = "IDS", help = "A selection of comma-separated cards identifiers (an empty string for the reference scenario). Can be repeated.")
+    selections.add_argument("--selections-file", type = Path, metavar = "PATH", help = "A JSON file containing a list of cards identifiers lists (null or [] for the reference scenario).")
+
+    parser.add_argument("-o", "--output", type = Path, required = True, metavar = "PATH", help = "The output file (.csv, .jsonl or .parquet).")
+    parser.add_argument("--format", choices = list(ROWS_WRITERS), help = "The output format. Defaults to the extension of the output file.")
+    parser.add_argument("--workers", type = int, default = COMPUTE_POOL_MAX_WORKERS, help = f"The maximal number of worker processes (1 computes the scenarios one after the other). Defaults to {COMPUTE_POOL_MAX_WORKERS}.")
+    parser.add_argument("--scenario-lattice", type = Path, metavar = "PATH", help = "Also write the computed scenarios to this precomputed scenarios file (read by the application on startup).")
+
+    parsed_arguments = parser.parse_args(arguments)
+    parsed_arguments.format = parsed_arguments.format or parsed_arguments.output.suffix.lstrip(".").lower()
+    if parsed_arguments.format not in ROWS_WRITERS:
+        parser.error(f"unknown output format '{parsed_arguments.format}', use --format {{{','.join(ROWS_WRITERS)}}}")
+
+    return parsed_arguments
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+    parsed_arguments = parse_arguments(arguments)
+
+    try:
+        cards_ids_lists = read_cards_selections(parsed_arguments)
+        LOGGER.info("%d cards selections to export to '%s'.", len(cards_ids_lists), parsed_arguments.output)
+
+        number_of_scenarios = run_batch(
+            cards_ids_lists,
+            parsed_arguments.output,
+            parsed_arguments.format,
+            parsed_arguments.workers,
+            parsed_arguments.scenario_lattice
+        )
+    except (OSError, ValueError) as exception:
+        LOGGER.error("%s", exception)
+        return 1
+
+    LOGGER.info("%d distinct scenarios exported to '%s'.", number_of_scenarios, parsed_arguments.output)
+    return 0
+
+
+if __name__ == "__main__":
+    # Example : `python batch.py --all --output scenarios.csv` (see `python batch.py --help`) :
+    sys.exit(main())
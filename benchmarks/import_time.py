@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional
+
+# Load the Python Path from the .env file :
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIRECTORY  = os.getenv("PYTHONPATH", os.path.join(ROOT_DIRECTORY, "src"))
+
+import argparse
+import json
+import logging
+import re
+import subprocess
+
+from collections import defaultdict
+from pathlib import Path
+
+
+
+
+LOGGER = logging.getLogger("import_time")
+
+# Modules imported by default : the served script, then the interface built by the first session :
+DEFAULT_MODULES = ["app", "ui.fresque_aeromaps_UI"]
+
+# Line of the `-X importtime` report : the self and cumulative durations (in microseconds), and the module (indented by its import depth) :
+IMPORT_TIME_LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def measure_imports(module: str) -> List[Dict[str, Any]]:
+    """
+    Imports a module in a new Python process with the `-X importtime` option, and parses the import duration of each imported module.
+
+    #### Arguments :
+    - `module (str)` : The name of the imported module (for instance `app` or `ui.fresque_aeromaps_UI`).
+
+    #### Returns :
+    - `List[Dict[str, Any]]` : The imported modules, in import order, with their self and cumulative import durations (in seconds) and their import depth.
+    """
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join([ROOT_DIRECTORY, SRC_DIRECTORY])}
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd = ROOT_DIRECTORY,
+        env = environment,
+        capture_output = True,
+        text = True
+    )
+    if completed_process.returncode != 0:
+        raise ValueError(f"The import of '{module}' failed:\n{completed_process.stderr.strip()}")
+
+    imports = []
+    for line in completed_process.stderr.splitlines():
+        match = IMPORT_TIME_LINE_PATTERN.match(line)
+        if match is None: # The header of the report, or the output of the imported modules.
+            continue
+        self_duration, cumulative_duration, indent, name = match.groups()
+        imports.append({
+            "module": name,
+            "self": int(self_duration) / 1e6,
+            "cumulative": int(cumulative_duration) / 1e6,
+            "depth": (len(indent) - 1) // 2
+        })
+
+    return imports
+
+
+def get_import_report(imports: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """
+    Summarizes the import durations of the modules imported by a module.
+
+    #### Arguments :
+    - `imports (List[Dict[str, Any]])` : The imported modules (see `measure_imports`).
+    - `top (int)` : The number of modules and packages reported.
+
+    #### Returns :
+    - `Dict[str, Any]` : The total import duration, the slowest modules (by cumulative and self duration), the slowest top-level packages (by self duration summed over their modules) and the number of imported modules.
+    """
+    packages_durations: Dict[str, float] = defaultdict(float)
+    for imported_module in imports:
+        packages_durations[imported_module["module"].split(".")[0]] += imported_module["self"]
+
+    return {
+        "total": sum(imported_module["cumulative"] for imported_module in imports if imported_module["depth"] == 0),
+        "number_of_modules": len(imports),
+        "slowest_cumulative": sorted(imports, key = lambda imported_module: -imported_module["cumulative"])[:top],
+        "slowest_self": sorted(imports, key = lambda imported_module: -imported_module["self"])[:top],
+        "slowest_packages": [
+            {"package": package, "self": duration}
+            for package, duration in sorted(packages_durations.items(), key = lambda item: -item[1])[:top]
+        ]
+    }
+
+
+def format_report(module: str, report: Dict[str, Any]) -> List[str]:
+    lines = [f"import {module} : {report['total'] * 1000:.0f} ms ({report['number_of_modules']} modules)"]
+
+    lines.append("  Slowest modules (cumulative) :")
+    lines.extend(f"    {imported_module['cumulative'] * 1000:8.1f} ms  {imported_module['module']}" for imported_module in report["slowest_cumulative"])
+    lines.append("  Slowest modules (self) :")
+    lines.extend(f"    {imported_module['self'] * 1000:8.1f} ms  {imported_module['module']}" for imported_module in report["slowest_self"])
+    lines.append("  Slowest packages (self) :")
+    lines.extend(f"    {package['self'] * 1000:8.1f} ms  {package['package']}" for package in report["slowest_packages"])
+
+    return lines
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description = "Audits the import time of the application modules, each imported in a new Python process, and reports the cost of each imported module and package.")
+    parser.add_argument("modules", nargs = "*", default = DEFAULT_MODULES, help = f"The imported modules. Defaults to {DEFAULT_MODULES}.")
+    parser.add_argument("--top", type = int, default = 15, help = "The number of modules and packages reported. Defaults to 15.")
+    parser.add_argument("--forbid", nargs = "+", default = [], metavar = "PACKAGE", help = "Fail if one of these packages is imported by the first module (for instance `--forbid aeromaps bqplot`).")
+    parser.add_argument("-o", "--output", type = Path, metavar = "PATH", help = "Also write the reports to this JSON file.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    reports = {}
+    forbidden_imports = []
+    try:
+        for index_module, module in enumerate(parsed_arguments.modules):
+            imports = measure_imports(module)
+            reports[module] = get_import_report(imports, parsed_arguments.top)
+            for line in format_report(module, reports[module]):
+                print(line)
+
+            if index_module == 0:
+                imported_packages = {imported_module["module"].split(".")[0] for imported_module in imports}
+                forbidden_imports = sorted(imported_packages & set(parsed_arguments.forbid))
+    except ValueError as exception:
+        LOGGER.error("%s", exception)
+        return 1
+
+    if parsed_arguments.output:
+        parsed_arguments.output.parent.mkdir(parents = True, exist_ok = True)
+        with open(parsed_arguments.output, "w", encoding = "utf-8") as file:
+            json.dump(reports, file, indent = 4)
+        LOGGER.info("Import time reports written to '%s'.", parsed_arguments.output)
+
+    if forbidden_imports:
+        LOGGER.error("'%s' imports %s at import time.", parsed_arguments.modules[0], forbidden_imports)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    # Example : `python benchmarks/import_time.py app --forbid aeromaps bqplot pandas` :
+    sys.exit(main())
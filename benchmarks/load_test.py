@@ -0,0 +1,525 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Load the Python Path from the .env file :
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIRECTORY  = os.getenv("PYTHONPATH", os.path.join(ROOT_DIRECTORY, "src"))
+if SRC_DIRECTORY not in sys.path:
+    sys.path.append(SRC_DIRECTORY)
+if ROOT_DIRECTORY not in sys.path:
+    sys.path.append(ROOT_DIRECTORY) # For `app.py` and `metrics_plugin.py`.
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from bokeh.client import ClientSession, pull_session
+
+from tornado.ioloop import IOLoop
+
+from run_benchmarks import get_environment_metadata
+
+from core.aeromaps_utils.process_pool import AEROMAPS_PROCESS_BACKENDS
+
+from crud.crud_cards import get_cards_registry
+
+from ui.utils.fresque_aeromaps_UI_constants import DEFAULT_NUMBER_OF_GROUPS, MAX_NUMBER_OF_GROUPS
+
+
+
+
+LOGGER = logging.getLogger("load_test")
+
+# Maximal duration of an interaction (or of the opening of a session), in seconds :
+INTERACTION_TIMEOUT = 300
+
+# Route of the server driving the interactions of its sessions :
+LOAD_TEST_ROUTE = "/load-test"
+
+
+###############################
+# SERVER (CHILD PROCESS SIDE) #
+###############################
+def run_server(port: int) -> None:
+    """
+    Serves the application of `app.py` on a local Panel server, with the metrics route and a route driving the interactions of its sessions (see `LoadTestHandler`).
+
+    The server runs until its process is terminated.
+
+    #### Arguments :
+    - `port (int)` : The port of the server.
+    """
+    import panel
+
+    from tornado.web import RequestHandler
+
+    from app import build_application_view
+    from metrics_plugin import ROUTES as METRICS_ROUTES
+
+    # Do not log every request of the load test :
+    logging.getLogger("tornado.access").setLevel(logging.WARNING)
+
+    # Interfaces and documents of the live sessions, by session identifier :
+    sessions: Dict[str, Tuple[Any, Any]] = {}
+
+    def create_session() -> Any:
+        application, template = build_application_view()
+
+        document = panel.state.curdoc
+        session_id = document.session_context.id
+        sessions[session_id] = (application, document)
+        panel.state.on_session_destroyed(lambda session_context: sessions.pop(session_context.id, None))
+
+        return template
+
+    def toggle_checkboxes(application: Any, group: int, cards: List[int]) -> None:
+        checkboxes = application.checkboxes_lists[group % application.number_of_groups]
+        for card in cards:
+            checkboxes[card].value = not checkboxes[card].value
+
+    def select_number_of_groups(application: Any, number_of_groups: int) -> None:
+        application.group_selector.value = number_of_groups
+        application.group_selector_button.click()
+
+    # Interactions of a session, as the widgets callbacks of a browser would run them :
+    interactions: Dict[str, Callable[..., None]] = {
+        "checkbox": toggle_checkboxes,
+        "update": lambda application: application.update_button.click(),
+        "slider": select_number_of_groups
+    }
+
+    class LoadTestHandler(RequestHandler):
+        async def post(self, session_id: str, interaction: str) -> None:
+            if session_id not in sessions or interaction not in interactions:
+                self.send_error(404)
+                return
+
+            application, document = sessions[session_id]
+            parameters = json.loads(self.request.body or b"{}")
+
+            loop = asyncio.get_running_loop()
+            done = loop.create_future()
+
+            def run_interaction() -> None:
+                try:
+                    interactions[interaction](application, **parameters)
+                    done.set_result(None)
+                except Exception as exception:
+                    done.set_exception(exception)
+
+            # The interaction runs on the event loop of the session (holding its document lock), then an update waits for its figures to be applied :
+            start = time.perf_counter()
+            document.add_next_tick_callback(run_interaction)
+            await done
+            if interaction == "update":
+                if not await loop.run_in_executor(None, application.update_runner.wait, INTERACTION_TIMEOUT):
+                    raise TimeoutError(f"The update of the session '{session_id}' did not end within {INTERACTION_TIMEOUT} seconds.")
+
+            self.write({"latency": time.perf_counter() - start})
+
+    panel.serve(
+        {"app": create_session},
+        port = port,
+        address = "127.0.0.1",
+        show = False,
+        start = True,
+        verbose = False,
+        extra_patterns = [*METRICS_ROUTES, (rf"{LOAD_TEST_ROUTE}/([^/]+)/([a-z]+)", LoadTestHandler, {})]
+    )
+
+
+################################
+# CLIENT (PARENT PROCESS SIDE) #
+################################
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
+        server_socket.bind(("127.0.0.1", 0))
+        return server_socket.getsockname()[1]
+
+
+def read_server_metrics(server_url: str) -> Dict[str, float]:
+    """
+    Get the metrics without labels of the server (see `metrics_plugin.py`).
+
+    #### Arguments :
+    - `server_url (str)` : The URL of the server.
+
+    #### Returns :
+    - `Dict[str, float]` : The values of the metrics without labels, by name.
+    """
+    with urllib.request.urlopen(f"{server_url}/metrics", timeout = INTERACTION_TIMEOUT) as response:
+        text = response.read().decode("utf-8")
+
+    metrics = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#") and "{" not in line:
+            name, value = line.rsplit(" ", 1)
+            metrics[name] = float(value)
+
+    return metrics
+
+
+def wait_for_server(server_process: subprocess.Popen, server_url: str, timeout: float = 120.0) -> None:
+    """
+    Wait until the server answers its metrics route.
+
+    #### Arguments :
+    - `server_process (subprocess.Popen)` : The process of the server.
+    - `server_url (str)` : The URL of the server.
+    - `timeout (float)` : The maximal waiting time, in seconds. Defaults to 120.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server_process.poll() is not None:
+            raise RuntimeError(f"The server stopped during its startup (exit code {server_process.returncode}).")
+        try:
+            read_server_metrics(server_url)
+            return
+        except (OSError, urllib.error.URLError):
+            time.sleep(0.5)
+
+    raise TimeoutError(f"The server did not start within {timeout} seconds.")
+
+
+def get_percentiles(values: List[float]) -> Dict[str, Any]:
+    """
+    Get the percentiles of durations.
+
+    #### Arguments :
+    - `values (List[float])` : The durations, in seconds.
+
+    #### Returns :
+    - `Dict[str, Any]` : The number of durations, and their median, 95th and 99th percentiles and maximum (None without any duration).
+    """
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    if len(values) == 1:
+        return {"count": 1, "p50": values[0], "p95": values[0], "p99": values[0], "max": values[0]}
+
+    quantiles = statistics.quantiles(values, n = 100, method = "inclusive")
+    return {"count": len(values), "p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98], "max": max(values)}
+
+
+class LoadTestSession:
+    """
+    Headless client session of the application, opened on the local server and driven by scripted interactions.
+
+    The session is opened with a Bokeh client, which keeps receiving the updates of the document like a browser (so the server does not buffer them).
+
+    #### Arguments :
+    - `server_url (str)` : The URL of the server.
+    """
+    def __init__(self, server_url: str) -> None:
+        self.server_url = server_url
+
+        self.session_id: Optional[str]       = None
+        self.construction_duration: float    = None
+        self.latencies: Dict[str, List[float]] = {"checkbox": [], "update": [], "slider": []}
+        self.errors: List[str] = []
+
+        self._opened = threading.Event()
+        self._io_loop: Optional[IOLoop] = None
+        self._client_session: Optional[ClientSession] = None
+
+
+    def open(self) -> None:
+        """
+        Opens the session (its interface is built by the server), then serves its connection until the server stops (run it in a dedicated thread).
+        """
+        self._io_loop = IOLoop()
+        try:
+            start = time.perf_counter()
+            self._client_session = pull_session(url = f"{self.server_url}/app", io_loop = self._io_loop)
+            self.construction_duration = time.perf_counter() - start
+            self.session_id = self._client_session.id
+        except Exception as exception:
+            self.errors.append(f"open: {exception}")
+            return
+        finally:
+            self._opened.set()
+
+        # The public Bokeh client API does not process the incoming messages of a pulled session :
+        self._client_session._loop_until_closed()
+
+
+    def close(self) -> None:
+        """
+        Closes the session (from any thread).
+        """
+        if self._client_session is not None:
+            self._io_loop.add_callback(self._client_session.close, "load test ended")
+
+
+    def wait_opened(self, timeout: float = INTERACTION_TIMEOUT) -> bool:
+        return self._opened.wait(timeout) and self.session_id is not None
+
+
+    def interact(self, interaction: str, **parameters: Any) -> None:
+        """
+        Runs an interaction on the session, and records its latency as measured by the server.
+
+        #### Arguments :
+        - `interaction (str)` : The interaction, either `checkbox`, `update` or `slider`.
+        - `parameters (Any)` : The parameters of the interaction.
+        """
+        request = urllib.request.Request(
+            f"{self.server_url}{LOAD_TEST_ROUTE}/{self.session_id}/{interaction}",
+            data = json.dumps(parameters).encode("utf-8"),
+            method = "POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout = INTERACTION_TIMEOUT) as response:
+                self.latencies[interaction].append(json.load(response)["latency"])
+        except (OSError, urllib.error.URLError, ValueError) as exception:
+            self.errors.append(f"{interaction}: {exception}")
+
+
+    def run_script(
+            self,
+            number_of_interactions: int,
+            think_time: float,
+            slider_every: int,
+            max_number_of_groups: int,
+            seed: int
+        ) -> None:
+        """
+        Drives the session like a workshop : each round toggles a few cards of a group and updates the figures, and the number of groups changes regularly.
+
+        #### Arguments :
+        - `number_of_interactions (int)` : The number of rounds.
+        - `think_time (float)` : The pause between two interactions, in seconds.
+        - `slider_every (int)` : The number of rounds between two changes of the number of groups (0 never changes it).
+        - `max_number_of_groups (int)` : The maximal number of groups chosen with the slider.
+        - `seed (int)` : The seed of the random choices of the script.
+        """
+        generator = random.Random(seed)
+        number_of_groups = DEFAULT_NUMBER_OF_GROUPS
+
+        for round_index in range(1, number_of_interactions + 1):
+            if slider_every > 0 and round_index % slider_every == 0:
+                number_of_groups = generator.randint(1, max_number_of_groups)
+                self.interact("slider", number_of_groups = number_of_groups)
+                time.sleep(think_time)
+
+            self.interact(
+                "checkbox",
+                group = generator.randrange(number_of_groups),
+                cards = generator.sample(range(len(get_cards_registry().names)), generator.randint(1, 3))
+            )
+            time.sleep(think_time)
+
+            self.interact("update")
+            time.sleep(think_time)
+
+
+def run_load_test(
+        number_of_sessions: int,
+        number_of_interactions: int,
+        think_time: float,
+        slider_every: int,
+        max_number_of_groups: int,
+        seed: int,
+        warmup_sessions: int = 1
+    ) -> Dict[str, Any]:
+    """
+    Opens concurrent headless sessions of the application on a local server (run in a child process), drives them with scripted interactions, and measures the server.
+
+    #### Arguments :
+    - `number_of_sessions (int)` : The number of concurrent sessions.
+    - `number_of_interactions (int)` : The number of rounds of interactions of each session (see `LoadTestSession.run_script`).
+    - `think_time (float)` : The pause between two interactions of a session, in seconds.
+    - `slider_every (int)` : The number of rounds between two changes of the number of groups of a session (0 never changes it).
+    - `max_number_of_groups (int)` : The maximal number of groups chosen with the slider.
+    - `seed (int)` : The seed of the random choices of the scripts.
+    - `warmup_sessions (int)` : The number of sessions opened (and updated once) before the measures, to fill the caches shared by the sessions. Defaults to 1.
+
+    #### Returns :
+    - `Dict[str, Any]` : The percentiles of the sessions construction durations and of each interaction latency, the memory of the server and the errors.
+    """
+    # The Bokeh models of the application documents (from the Panel and IPyWidgets extensions) are needed to open its sessions :
+    import app
+
+    port = get_free_port()
+    server_url = f"http://127.0.0.1:{port}"
+    server_process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port)])
+
+    def open_sessions(count: int) -> List[LoadTestSession]:
+        sessions = [LoadTestSession(server_url) for _ in range(count)]
+        for session in sessions:
+            threading.Thread(target = session.open, daemon = True).start()
+        for session in sessions:
+            session.wait_opened()
+        return sessions
+
+    try:
+        wait_for_server(server_process, server_url)
+        LOGGER.info("Server started at %s.", server_url)
+
+        # Warm the shared caches up (the first scenarios, charts data and figures of the server) :
+        warmup = open_sessions(warmup_sessions)
+        for session in warmup:
+            if session.session_id is not None:
+                session.interact("update")
+        memory_before_sessions = read_server_metrics(server_url).get("process_resident_memory_bytes")
+
+        # Open all the sessions at once :
+        LOGGER.info("Opening %d sessions...", number_of_sessions)
+        sessions = open_sessions(number_of_sessions)
+        opened_sessions = [session for session in sessions if session.session_id is not None]
+        server_metrics = read_server_metrics(server_url)
+        memory_after_sessions = server_metrics.get("process_resident_memory_bytes")
+        live_sessions = server_metrics.get("fresque_live_sessions")
+
+        # Drive all the sessions at once :
+        LOGGER.info("Driving %d sessions (%d rounds each)...", len(opened_sessions), number_of_interactions)
+        with ThreadPoolExecutor(max_workers = max(1, len(opened_sessions))) as executor:
+            for future in [
+                executor.submit(session.run_script, number_of_interactions, think_time, slider_every, max_number_of_groups, seed + index)
+                for index, session in enumerate(opened_sessions)
+            ]:
+                future.result()
+        memory_after_interactions = read_server_metrics(server_url).get("process_resident_memory_bytes")
+
+        for session in warmup + sessions:
+            session.close()
+    finally:
+        server_process.terminate()
+        try:
+            server_process.wait(timeout = 30)
+        except subprocess.TimeoutExpired:
+            server_process.kill()
+
+    def get_memory_per_session(memory: Optional[float]) -> Optional[float]:
+        if memory is None or memory_before_sessions is None or not opened_sessions:
+            return None
+        return (memory - memory_before_sessions) / len(opened_sessions)
+
+    return {
+        "sessions": {
+            "requested": number_of_sessions,
+            "opened": len(opened_sessions),
+            "live_on_server": live_sessions
+        },
+        "construction": get_percentiles([session.construction_duration for session in opened_sessions]),
+        "latencies": {
+            interaction: get_percentiles([latency for session in opened_sessions for latency in session.latencies[interaction]])
+            for interaction in ("checkbox", "update", "slider")
+        },
+        "memory": {
+            "before_sessions": memory_before_sessions,
+            "after_sessions": memory_after_sessions,
+            "after_interactions": memory_after_interactions,
+            "per_session_after_construction": get_memory_per_session(memory_after_sessions),
+            "per_session_after_interactions": get_memory_per_session(memory_after_interactions)
+        },
+        "errors": [error for session in sessions for error in session.errors]
+    }
+
+
+def format_report(results: Dict[str, Any]) -> List[str]:
+    """
+    Get a readable summary of the results of a load test.
+
+    #### Arguments :
+    - `results (Dict[str, Any])` : The results of the load test (see `run_load_test`).
+
+    #### Returns :
+    - `List[str]` : The lines of the summary.
+    """
+    def format_duration(duration: Optional[float]) -> str:
+        return "-" if duration is None else f"{duration * 1000:.1f} ms"
+
+    def format_memory(memory: Optional[float]) -> str:
+        return "-" if memory is None else f"{memory / 2 ** 20:.1f} MiB"
+
+    lines = [f"Sessions : {results['sessions']['opened']} opened / {results['sessions']['requested']} requested ({results['sessions']['live_on_server']} live on the server)"]
+    for name, percentiles in [("construction", results["construction"]), *results["latencies"].items()]:
+        lines.append(
+            f"{name:<12} : {percentiles['count']:>5} | "
+            f"p50 {format_duration(percentiles['p50'])} | p95 {format_duration(percentiles['p95'])} | p99 {format_duration(percentiles['p99'])} | max {format_duration(percentiles['max'])}"
+        )
+    lines.append(
+        f"Memory per session : {format_memory(results['memory']['per_session_after_construction'])} after construction, "
+        f"{format_memory(results['memory']['per_session_after_interactions'])} after the interactions "
+        f"(server : {format_memory(results['memory']['after_interactions'])})"
+    )
+    if results["errors"]:
+        lines.append(f"{len(results['errors'])} errors, the first one : {results['errors'][0]}")
+
+    return lines
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description = "Opens concurrent headless sessions of the application on a local server, drives them with scripted interactions, and reports the latencies and the memory of the server.")
+    parser.add_argument("--sessions", type = int, default = 10, help = "The number of concurrent sessions. Defaults to 10.")
+    parser.add_argument("--interactions", type = int, default = 20, help = "The number of rounds (cards toggles then update) of each session. Defaults to 20.")
+    parser.add_argument("--think-time", type = float, default = 0.5, help = "The pause between two interactions of a session, in seconds. Defaults to 0.5.")
+    parser.add_argument("--slider-every", type = int, default = 5, help = "The number of rounds between two changes of the number of groups (0 never changes it). Defaults to 5.")
+    parser.add_argument("--max-groups", type = int, default = MAX_NUMBER_OF_GROUPS, help = f"The maximal number of groups chosen with the slider. Defaults to {MAX_NUMBER_OF_GROUPS}.")
+    parser.add_argument("--warmup-sessions", type = int, default = 1, help = "The number of sessions opened before the measures, to fill the shared caches. Defaults to 1.")
+    parser.add_argument("--backend", choices = AEROMAPS_PROCESS_BACKENDS, help = "The processes computing the scenarios on the server (see `AEROMAPS_PROCESS_BACKEND`). Defaults to the `.env` configuration.")
+    parser.add_argument("--synthetic-delay", type = int, metavar = "MS", help = "The artificial duration of a synthetic computation, in milliseconds (see `SYNTHETIC_PROCESS_DELAY`).")
+    parser.add_argument("--seed", type = int, default = 0, help = "The seed of the random choices of the scripts. Defaults to 0.")
+    parser.add_argument("-o", "--output", type = Path, metavar = "PATH", help = "The results file. Defaults to `benchmarks/results/load_test_<date>.json`.")
+    parser.add_argument("--serve", action = "store_true", help = argparse.SUPPRESS) # Internal : run the server of the load test.
+    parser.add_argument("--port", type = int, help = argparse.SUPPRESS)
+    parsed_arguments = parser.parse_args(arguments)
+
+    if parsed_arguments.serve:
+        run_server(parsed_arguments.port)
+        return 0
+
+    if parsed_arguments.sessions < 1 or parsed_arguments.interactions < 0 or not (1 <= parsed_arguments.max_groups <= MAX_NUMBER_OF_GROUPS):
+        parser.error(f"the number of sessions must be positive, and the maximal number of groups between 1 and {MAX_NUMBER_OF_GROUPS}")
+
+    # The configuration is inherited by the server process :
+    if parsed_arguments.backend is not None:
+        os.environ["AEROMAPS_PROCESS_BACKEND"] = parsed_arguments.backend
+    if parsed_arguments.synthetic_delay is not None:
+        os.environ["SYNTHETIC_PROCESS_DELAY"] = str(parsed_arguments.synthetic_delay)
+
+    environment = get_environment_metadata()
+    results = run_load_test(
+        parsed_arguments.sessions,
+        parsed_arguments.interactions,
+        parsed_arguments.think_time,
+        parsed_arguments.slider_every,
+        parsed_arguments.max_groups,
+        parsed_arguments.seed,
+        parsed_arguments.warmup_sessions
+    )
+    for line in format_report(results):
+        print(line)
+
+    output_path = parsed_arguments.output or Path(ROOT_DIRECTORY) / "benchmarks" / "results" / f"load_test_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    output_path.parent.mkdir(parents = True, exist_ok = True)
+    with open(output_path, "w", encoding = "utf-8") as file:
+        json.dump({"environment": environment, "parameters": vars(parsed_arguments) | {"output": str(output_path)}, "results": results}, file, indent = 4)
+    LOGGER.info("Load test results written to '%s'.", output_path)
+
+    return 0 if not results["errors"] else 1
+
+
+if __name__ == "__main__":
+    # Example : `python benchmarks/load_test.py --sessions 20 --backend synthetic --synthetic-delay 500` :
+    sys.exit(main())
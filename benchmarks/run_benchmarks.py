@@ -0,0 +1,410 @@
+from typing import Any, Callable, Dict, List, Optional
+
+# Load the Python Path from the .env file :
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIRECTORY  = os.getenv("PYTHONPATH", os.path.join(ROOT_DIRECTORY, "src"))
+if SRC_DIRECTORY not in sys.path:
+    sys.path.append(SRC_DIRECTORY)
+
+import argparse
+import fnmatch
+import json
+import logging
+import pickle
+import platform
+import statistics
+import subprocess
+import time
+
+from datetime import datetime, timezone
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+
+from bqplot_figures.prospective_scenario_graph import (
+    ProspectiveScenarioGraph,
+    ProspectiveScenarioGroupComparisonGraph,
+    get_prospective_scenario_y_scales
+)
+from bqplot_figures.multidisciplinary_graph import MultidisciplinaryGraph
+from bqplot_figures.utils.chart_data import prepare_charts_data, _CHARTS_DATA_CACHE, _CHARTS_DATA_CACHE_LOCK
+from bqplot_figures.utils.prospective_scenario_graph_utils import get_y_prospective_lines_groups_comparison
+
+from core.aeromaps_utils.process_engine import ProcessEngine, compute_process
+from core.aeromaps_utils.process_pool import AEROMAPS_PROCESS_POOL, create_process
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.aeromaps_utils.scenario_parameters import get_scenario_parameters
+from core.aeromaps_utils.scenario_lattice import iter_cards_combinations
+from core.aeromaps_utils.evaluate_expression import evaluate_expression_aeromaps
+from core.aeromaps_utils.formula_variables import get_charts_formulas
+from core.aeromaps_utils.charts_configuration import get_charts_configuration
+
+
+
+
+LOGGER = logging.getLogger("benchmarks")
+
+# Numbers of groups each benchmark is run for (by default) :
+DEFAULT_NUMBERS_OF_GROUPS = [1, 2, 5, 10]
+
+# Version of the results file format :
+BENCHMARK_RESULTS_FORMAT_VERSION = 1
+
+# Packages whose version is recorded with the results :
+RECORDED_PACKAGES = ["aeromaps", "bqplot", "ipywidgets", "numpy", "pandas", "panel"]
+
+
+def measure(
+        function: Callable[[], Any],
+        setup: Optional[Callable[[], None]] = None,
+        repeat: int = 5
+    ) -> Dict[str, Any]:
+    """
+    Measures the duration of a function.
+
+    #### Arguments :
+    - `function (Callable[[], Any])` : The measured function.
+    - `setup (Optional[Callable[[], None]])` : A function called (and not measured) before each run, for instance to clear a cache. Defaults to None.
+    - `repeat (int)` : The number of runs. Defaults to 5.
+
+    #### Returns :
+    - `Dict[str, Any]` : The durations of the runs (in seconds) and their minimum, median, mean and standard deviation.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    return {
+        "repeat": repeat,
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+        "stdev": statistics.stdev(durations) if repeat > 1 else 0.0,
+        "durations": durations
+    }
+
+
+def get_environment_metadata() -> Dict[str, Any]:
+    """
+    Get the description of the environment of a benchmark run, to compare runs between them.
+
+    #### Returns :
+    - `Dict[str, Any]` : The date, git commit, Python and packages versions, machine and configuration of the run.
+    """
+    def get_package_version(package: str) -> Optional[str]:
+        try:
+            return version(package)
+        except PackageNotFoundError:
+            return None
+
+    try:
+        git_commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd = ROOT_DIRECTORY,
+            capture_output = True,
+            text = True,
+            check = True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        git_commit = None
+
+    return {
+        "format_version": BENCHMARK_RESULTS_FORMAT_VERSION,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": {package: get_package_version(package) for package in RECORDED_PACKAGES},
+        "configuration": {
+            name: os.getenv(name)
+            for name in ["SCENARIO_STORE_MAX_MB", "AEROMAPS_MAX_PROCESSES", "AEROMAPS_PROCESS_BACKEND", "SYNTHETIC_PROCESS_DELAY"]
+        }
+    }
+
+
+def get_distinct_cards_ids_lists(number_of_scenarios: int) -> List[Optional[List[str]]]:
+    """
+    Get cards selections leading to distinct scenarios (the reference scenario first), one per group.
+
+    #### Arguments :
+    - `number_of_scenarios (int)` : The number of selections.
+
+    #### Returns :
+    - `List[Optional[List[str]]]` : The identifiers of the cards of each selection (None for the reference scenario).
+    """
+    cards_ids_lists = {}
+    for cards_ids in iter_cards_combinations():
+        fingerprint, _ = get_scenario_parameters(cards_ids)
+        cards_ids_lists.setdefault(fingerprint, list(cards_ids) or None)
+        if len(cards_ids_lists) == number_of_scenarios:
+            break
+
+    return list(cards_ids_lists.values())
+
+
+def clear_charts_data_cache() -> None:
+    with _CHARTS_DATA_CACHE_LOCK:
+        _CHARTS_DATA_CACHE.clear()
+
+
+class BenchmarkSuite:
+    """
+    Benchmarks of the compute and chart hot paths, each one run for several numbers of groups (the groups choosing distinct scenarios).
+
+    #### Arguments :
+    - `numbers_of_groups (List[int])` : The numbers of groups each benchmark is run for.
+    - `repeat (int)` : The number of runs of each benchmark.
+    - `pattern (str)` : Only the benchmarks whose name matches this pattern are run (see `fnmatch`). Defaults to "*".
+    """
+    def __init__(self, numbers_of_groups: List[int], repeat: int, pattern: str = "*") -> None:
+        self.numbers_of_groups = sorted(numbers_of_groups)
+        self.repeat  = repeat
+        self.pattern = pattern
+
+        self.results: List[Dict[str, Any]] = []
+
+        # The scenarios of the groups (computed once, read from the precomputed scenarios file if it is up to date) :
+        self.process_engine = ProcessEngine()
+        self.reference_data = self.process_engine.compute(None)
+        self.cards_ids_lists = get_distinct_cards_ids_lists(max(self.numbers_of_groups) + 1)[1:]
+        self.groups_data     = [self.process_engine.compute(cards_ids) for cards_ids in self.cards_ids_lists]
+
+
+    def run_benchmark(
+            self,
+            name: str,
+            function: Callable[[], Any],
+            setup: Optional[Callable[[], None]] = None,
+            number_of_groups: Optional[int] = None,
+            repeat: Optional[int] = None
+        ) -> None:
+        if not fnmatch.fnmatch(name, self.pattern):
+            return
+
+        LOGGER.info("Running %s (%s groups)...", name, number_of_groups if number_of_groups is not None else "-")
+        self.results.append({
+            "name": name,
+            "number_of_groups": number_of_groups,
+            **measure(function, setup, repeat or self.repeat)
+        })
+
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Runs all the benchmarks.
+
+        #### Returns :
+        - `List[Dict[str, Any]]` : The result of each benchmark (see `measure`).
+        """
+        # Creation of an AeroMAPS process (independent of the number of groups, and slow, so only run twice) :
+        self.run_benchmark("create_process", create_process, repeat = min(self.repeat, 2))
+
+        for number_of_groups in self.numbers_of_groups:
+            self._run_compute_benchmarks(number_of_groups)
+            self._run_formulas_benchmarks(number_of_groups)
+            self._run_charts_benchmarks(number_of_groups)
+            self._run_graphs_benchmarks(number_of_groups)
+
+        return self.results
+
+
+    def _run_compute_benchmarks(self, number_of_groups: int) -> None:
+        cards_ids_lists = self.cards_ids_lists[:number_of_groups]
+        scenarios       = [get_scenario_parameters(cards_ids) for cards_ids in cards_ids_lists]
+        variables       = get_charts_configuration().variables
+
+        # Cold : live AeroMAPS computations (neither stored nor read from the precomputed scenarios file) :
+        def compute_cold() -> None:
+            for _, parameters in scenarios:
+                with AEROMAPS_PROCESS_POOL.borrow() as process:
+                    ScenarioResult(compute_process(process, parameters), variables)
+
+        self.run_benchmark("process_engine.compute.cold", compute_cold, number_of_groups = number_of_groups, repeat = min(self.repeat, 2))
+
+        # Warm : scenarios taken from the scenario store :
+        for cards_ids in cards_ids_lists:
+            self.process_engine.compute(cards_ids)
+        self.run_benchmark(
+            "process_engine.compute.warm",
+            lambda: [self.process_engine.compute(cards_ids) for cards_ids in cards_ids_lists],
+            number_of_groups = number_of_groups
+        )
+
+        # Copy of the computed data out of the AeroMAPS process (projection into a read-only result) :
+        with AEROMAPS_PROCESS_POOL.borrow() as process:
+            process_data = compute_process(process, scenarios[0][1])
+            self.run_benchmark(
+                "process_engine.compute.copy",
+                lambda: [ScenarioResult(process_data, variables) for _ in range(number_of_groups)],
+                number_of_groups = number_of_groups
+            )
+
+        # Transfer of the results from the worker processes (and from the precomputed scenarios file) :
+        groups_data = self.groups_data[:number_of_groups]
+        self.run_benchmark(
+            "process_engine.compute.pickle",
+            lambda: [pickle.loads(pickle.dumps(group_data, protocol = pickle.HIGHEST_PROTOCOL)) for group_data in groups_data],
+            number_of_groups = number_of_groups
+        )
+
+
+    def _run_formulas_benchmarks(self, number_of_groups: int) -> None:
+        groups_data = self.groups_data[:number_of_groups]
+
+        for formula in get_charts_formulas():
+            self.run_benchmark(
+                f"evaluate_expression_aeromaps[{formula['expression']}]",
+                lambda formula = formula: [
+                    evaluate_expression_aeromaps(group_data, formula["expression"], formula.get("year_range"))
+                    for group_data in groups_data
+                ],
+                number_of_groups = number_of_groups
+            )
+
+
+    def _run_charts_benchmarks(self, number_of_groups: int) -> None:
+        groups_data = self.groups_data[:number_of_groups]
+
+        # Shared y-scales, with the chart data prepared from scratch, and already prepared :
+        self.run_benchmark(
+            "get_prospective_scenario_y_scales.cold",
+            lambda: get_prospective_scenario_y_scales(groups_data),
+            setup = clear_charts_data_cache,
+            number_of_groups = number_of_groups
+        )
+        self.run_benchmark(
+            "get_prospective_scenario_y_scales.warm",
+            lambda: get_prospective_scenario_y_scales(groups_data),
+            number_of_groups = number_of_groups
+        )
+
+        reference_chart_data, *groups_charts_data = prepare_charts_data([self.reference_data, *groups_data])
+        self.run_benchmark(
+            "get_y_prospective_lines_groups_comparison",
+            lambda: get_y_prospective_lines_groups_comparison(
+                reference_chart_data.prospective_lines,
+                [group_chart_data.prospective_lines[1] for group_chart_data in groups_charts_data]
+            ),
+            number_of_groups = number_of_groups
+        )
+
+
+    def _run_graphs_benchmarks(self, number_of_groups: int) -> None:
+        groups_data = self.groups_data[:number_of_groups]
+        charts_data = prepare_charts_data(groups_data)
+
+        # One graph per group (the updates show the scenario of the next group, so that the data really changes) :
+        for graph_class in [ProspectiveScenarioGraph, MultidisciplinaryGraph]:
+            graphs = [graph_class("Benchmark") for _ in range(number_of_groups)]
+            self.run_benchmark(
+                f"{graph_class.__name__}.draw",
+                lambda graphs = graphs: [
+                    graph.draw(group_data, override = True, chart_data = chart_data)
+                    for graph, group_data, chart_data in zip(graphs, groups_data, charts_data)
+                ],
+                number_of_groups = number_of_groups
+            )
+
+            updates = [(groups_data[(index + 1) % number_of_groups], charts_data[(index + 1) % number_of_groups]) for index in range(number_of_groups)]
+            self.run_benchmark(
+                f"{graph_class.__name__}.update",
+                lambda graphs = graphs, updates = updates: [
+                    graph.update(group_data, chart_data)
+                    for graph, (group_data, chart_data) in zip(graphs, updates)
+                ],
+                setup = lambda graphs = graphs: [
+                    graph.update(group_data, chart_data)
+                    for graph, group_data, chart_data in zip(graphs, groups_data, charts_data)
+                ],
+                number_of_groups = number_of_groups
+            )
+
+        # A single comparison graph of all the groups :
+        graph = ProspectiveScenarioGroupComparisonGraph("Benchmark", number_of_groups)
+        self.run_benchmark(
+            "ProspectiveScenarioGroupComparisonGraph.draw",
+            lambda: graph.draw(self.reference_data, groups_data, override = True),
+            number_of_groups = number_of_groups
+        )
+        self.run_benchmark(
+            "ProspectiveScenarioGroupComparisonGraph.update",
+            lambda: graph.update(self.reference_data, groups_data[::-1]),
+            setup = lambda: graph.update(self.reference_data, groups_data),
+            number_of_groups = number_of_groups
+        )
+
+
+def compare_results(results: List[Dict[str, Any]], baseline_results: List[Dict[str, Any]]) -> List[str]:
+    """
+    Compares the median durations of two benchmark runs.
+
+    #### Arguments :
+    - `results (List[Dict[str, Any]])` : The results of the new run.
+    - `baseline_results (List[Dict[str, Any]])` : The results of the baseline run.
+
+    #### Returns :
+    - `List[str]` : One line per benchmark run in both, with both median durations and their ratio.
+    """
+    baseline_medians = {(result["name"], result["number_of_groups"]): result["median"] for result in baseline_results}
+
+    lines = []
+    for result in results:
+        baseline_median = baseline_medians.get((result["name"], result["number_of_groups"]))
+        if baseline_median is None:
+            continue
+
+        ratio = result["median"] / baseline_median if baseline_median > 0 else float("inf")
+        lines.append(f"{result['name']} ({result['number_of_groups']} groups) : {baseline_median * 1000:.3f} ms -> {result['median'] * 1000:.3f} ms (x{ratio:.2f})")
+
+    return lines
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description = "Runs the benchmarks of the compute and chart hot paths, and writes their results as JSON.")
+    parser.add_argument("-o", "--output", type = Path, metavar = "PATH", help = "The results file. Defaults to `benchmarks/results/<date>.json`.")
+    parser.add_argument("--groups", type = int, nargs = "+", default = DEFAULT_NUMBERS_OF_GROUPS, help = f"The numbers of groups each benchmark is run for. Defaults to {DEFAULT_NUMBERS_OF_GROUPS}.")
+    parser.add_argument("--repeat", type = int, default = 5, help = "The number of runs of each benchmark. Defaults to 5.")
+    parser.add_argument("--filter", default = "*", metavar = "PATTERN", help = "Only run the benchmarks whose name matches this pattern (for instance `*Graph*`).")
+    parser.add_argument("--compare", type = Path, metavar = "PATH", help = "A previous results file to compare the new results with.")
+    parsed_arguments = parser.parse_args(arguments)
+
+    if min(parsed_arguments.groups) < 1 or parsed_arguments.repeat < 1:
+        parser.error("the numbers of groups and the number of runs must be positive")
+
+    environment = get_environment_metadata()
+    results = BenchmarkSuite(parsed_arguments.groups, parsed_arguments.repeat, parsed_arguments.filter).run()
+
+    output_path = parsed_arguments.output or Path(ROOT_DIRECTORY) / "benchmarks" / "results" / f"{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    output_path.parent.mkdir(parents = True, exist_ok = True)
+    with open(output_path, "w", encoding = "utf-8") as file:
+        json.dump({"environment": environment, "results": results}, file, indent = 4)
+    LOGGER.info("%d benchmarks results written to '%s'.", len(results), output_path)
+
+    if parsed_arguments.compare:
+        with open(parsed_arguments.compare, "r", encoding = "utf-8") as file:
+            baseline = json.load(file)
+        for line in compare_results(results, baseline["results"]):
+            print(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    # Example : `python benchmarks/run_benchmarks.py --groups 1 5 --compare benchmarks/results/<previous run>.json` :
+    sys.exit(main())
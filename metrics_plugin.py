@@ -0,0 +1,33 @@
+# Load the Python Path from the .env file :
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROOT_DIRECTORY = os.path.dirname(__file__)
+SRC_DIRECTORY  = os.getenv("PYTHONPATH", os.path.join(ROOT_DIRECTORY, "src"))
+if SRC_DIRECTORY not in sys.path:
+    sys.path.append(SRC_DIRECTORY)
+
+from tornado.web import RequestHandler
+
+from core.metrics import METRICS
+
+
+
+
+class MetricsHandler(RequestHandler):
+    """
+    Serves the metrics of the server process in the Prometheus text format (see `MetricsRegistry.render`).
+    """
+    def get(self) -> None:
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.set_header("Cache-Control", "no-store")
+        self.write(METRICS.render())
+
+
+# Routes added to the Panel server (`panel serve app.py --plugins metrics_plugin`) :
+ROUTES = [
+    ("/metrics", MetricsHandler, {})
+]
@@ -2,6 +2,8 @@ from typing import Any, Dict, List, Tuple
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from bqplot import Figure
 
 
@@ -99,3 +101,21 @@ class BaseGraph(ABC):
             raise ValueError("The figure is not drawn yet. Please call the `draw()` method first.")
 
         ... # Implemented in the subclass.
+
+
+    def get_memory_size(self) -> int:
+        """
+        Get the approximate memory size of the data plotted by the figure.
+
+        #### Returns :
+        - `int` : The size of the x and y values of the marks of the figure, in bytes (0 if the figure is not drawn yet).
+        """
+        if self.figure is None:
+            return 0
+
+        return sum(
+            np.asarray(getattr(mark, name)).nbytes
+            for mark in self.figure.marks
+            for name in ("x", "y")
+            if getattr(mark, name, None) is not None
+        )
@@ -4,37 +4,29 @@ from bqplot import Figure, Bars, Axis, LinearScale, OrdinalScale
 from bqplot_figures.base_graph import BaseGraph
 
 from utils import generate_pastel_palette
-from bqplot_figures.utils.multidisciplinary_graph_utils import (
-    BARS_NAMES,
-    get_y_consumption_bars,
-    get_y_budget_bars
-)
+from bqplot_figures.utils.chart_data import ChartData, get_chart_data, prepare_charts_data, get_charts_bounds
 
 
 
 
-def get_multidisciplinary_graphs_y_scales(processes_data: List[Dict[str, Any]]) -> Tuple[float, float]:
+def get_multidisciplinary_graphs_y_scales(
+        processes_data: List[Dict[str, Any]],
+        charts_data: Optional[List[ChartData]] = None
+    ) -> Tuple[float, float]:
     """
     Get the minimal and maximal values of all the y-scales for the budget and consumption bars from multiple processes data.
 
     #### Arguments :
     - `processes_data (List[Dict[str, Any]])` : A list of processes data from AéroMAPS.
+    - `charts_data (Optional[List[ChartData]])` : The chart data of the processes data, if already prepared (see `prepare_charts_data`). Defaults to None (prepared from the processes data).
 
     #### Returns :
     - `Tuple[float]` : A tuple containing the minimal and maximal values of all the y-scales for the budget and consumption bars.
     """
-    # Get the y-values for the budget and consumption bars from all processes data :
-    all_y_lines = []
-    for process_data in processes_data:
-        # Get the y-values for the budget bars :
-        y_budget_bars = get_y_budget_bars(process_data)
-        all_y_lines.extend(y_budget_bars)
+    if charts_data is None:
+        charts_data = prepare_charts_data(processes_data)
 
-        # Get the y-values for the consumption bars :
-        y_consumption_bars = get_y_consumption_bars(process_data)
-        all_y_lines.extend(y_consumption_bars)
-
-    return (min(all_y_lines), max(all_y_lines)) if all_y_lines else (0.0, 0.0)
+    return get_charts_bounds(charts_data, "multidisciplinary")
 
 
 class MultidisciplinaryGraph(BaseGraph):
@@ -68,7 +60,8 @@ class MultidisciplinaryGraph(BaseGraph):
             process_data: Dict[str, Any],
             y_scale: LinearScale = None,
             override: bool = False,
-            display_default_legend: bool = True
+            display_default_legend: bool = True,
+            chart_data: Optional[ChartData] = None
         ) -> Figure:
         """
         create **initial** figure with the budget and consumption bars.
@@ -84,6 +77,7 @@ class MultidisciplinaryGraph(BaseGraph):
         - `y_scale (LinearScale)` : Optional scale for the y-axis. If not provided, a default scale will be created.
         - `override (bool)` : If set to `True`, the method will redraw the figure even if it is already drawn. Defaults to `False`.
         - `display_default_legend (bool)` : If set to `True`, the default legend will be displayed. Defaults to `True`.
+        - `chart_data (Optional[ChartData])` : The chart data of the process data, if already prepared (see `prepare_charts_data`). Defaults to None (prepared from the process data).
 
         #### Returns :
         - `Figure` : The created or updated figure with the budget and consumption bars.
@@ -91,6 +85,9 @@ class MultidisciplinaryGraph(BaseGraph):
         # Check is the figure is already drawn and if override is set to False :
         super().draw(process_data, override)
 
+        if chart_data is None:
+            chart_data = get_chart_data(process_data)
+
         # Create scales and axes :
         x_scale = OrdinalScale()
         y_scale = y_scale or LinearScale()
@@ -108,11 +105,11 @@ class MultidisciplinaryGraph(BaseGraph):
         )
 
         # Plot the consumptions and budgets bars :
-        y_consumption_bars = get_y_consumption_bars(process_data)
-        y_budget_bars      = get_y_budget_bars(process_data)
+        y_consumption_bars = chart_data.consumption_bars
+        y_budget_bars      = chart_data.budget_bars
 
         self._bars = Bars(
-            x = BARS_NAMES,
+            x = chart_data.charts_configuration.bars_names,
             y = [y_consumption_bars, y_budget_bars],
             type = "grouped",
             colors = [self.color_palette[1], self.color_palette[0]],
@@ -136,16 +133,35 @@ class MultidisciplinaryGraph(BaseGraph):
         return self.figure
 
 
-    def update(self, process_data: Dict[str, Any]) -> Figure:
+    def update(
+            self,
+            process_data: Dict[str, Any],
+            chart_data: Optional[ChartData] = None
+        ) -> Figure:
+        """
+        Update the bars' data only, avoiding full redraw.
+        This method updates the existing figure with new data without redrawing the entire figure.
+
+        #### Arguments :
+        - `process_data (Dict[str, Any])` : New processed data to update the figure.
+        - `chart_data (Optional[ChartData])` : The chart data of the process data, if already prepared with the other groups (see `prepare_charts_data`). Defaults to None (prepared from the process data).
+
+        #### Returns :
+        - `Figure` : The updated figure object with new data.
+        """
         # Check if the figure is already drawn :
         super().update(process_data)
 
+        if chart_data is None:
+            chart_data = get_chart_data(process_data)
+
         # Update the figure :
         with self.figure.hold_sync():
-            # Update the y-axis of the budget and consumption bars :
+            # Update the categories (which may change with the charts configuration) and the y-axis of the budget and consumption bars :
+            self._bars.x = chart_data.charts_configuration.bars_names
             self._bars.y = [
-                get_y_consumption_bars(process_data),
-                get_y_budget_bars(process_data)
+                chart_data.consumption_bars,
+                chart_data.budget_bars
             ]
 
         return self.figure
@@ -1,57 +1,41 @@
 from typing import Any, Dict, List, Tuple, Optional
 
-from pandas import concat
-
 from bqplot import Figure, Lines, Axis, LinearScale, Label
 from bqplot_figures.base_graph import BaseGraph
 
 from core.aeromaps_utils.extract_processed_data import get_years
+from core.aeromaps_utils.charts_configuration import ChartsConfiguration, get_charts_configuration
 
 from utils import generate_pastel_palette
+from bqplot_figures.utils.chart_data import ChartData, get_chart_data, prepare_charts_data, get_charts_bounds
 from bqplot_figures.utils.prospective_scenario_graph_utils import (
-    get_y_historic_line,
-    get_y_prospective_lines,
-    get_y_aspects_areas,
     get_y_prospective_lines_groups_comparison,
     get_y_final_values_lines,
     get_y_final_values_lines_group_comparison,
-    LINES_NAMES,
-    ASPECTS_NAMES,
-    NUMBER_OF_ASPECTS,
     DEFAULT_LINES_COLORS
 )
 
 
 
 
-def get_prospective_scenario_y_scales(processes_data: List[Dict[str, Any]]) -> Tuple[float, float]:
+def get_prospective_scenario_y_scales(
+        processes_data: List[Dict[str, Any]],
+        charts_data: Optional[List[ChartData]] = None
+    ) -> Tuple[float, float]:
     """
     Get the minimal and maximal values of all the y-scales for the historic line, prospective lines and aspects areas from multiple processes data.
 
     #### Arguments :
     - `processes_data (List[Dict[str, Any]])` : A list of processes data from AéroMAPS.
+    - `charts_data (Optional[List[ChartData]])` : The chart data of the processes data, if already prepared (see `prepare_charts_data`). Defaults to None (prepared from the processes data).
 
     #### Returns :
-    - `Tuple[float]` : A tuple containing the minimal and maximal values of all the y-scales for the budget and consumption bars.
+    - `Tuple[float]` : A tuple containing the minimal and maximal values of all the y-scales for the historic line, prospective lines and aspects areas.
     """
-    # Get the y-values for the historic line, prospective lines and aspects areas from all processes data :
-    all_y_lines = []
-    for process_data in processes_data:
-        # Get the y-values for the historic line :
-        y_historic_line = get_y_historic_line(process_data)
-        all_y_lines.extend(y_historic_line.tolist())
-
-        # Get the y-values for the prospective lines :
-        y_prospective_lines = get_y_prospective_lines(process_data)
-        for y_prospective_line in y_prospective_lines:
-            all_y_lines.extend(y_prospective_line.tolist())
-
-        # Get the y-values for the aspects areas :
-        y_aspects_areas = get_y_aspects_areas(process_data)
-        for y_aspect_area in y_aspects_areas:
-            all_y_lines.extend(y_aspect_area.tolist())
+    if charts_data is None:
+        charts_data = prepare_charts_data(processes_data)
 
-    return (min(all_y_lines), max(all_y_lines)) if all_y_lines else (0.0, 0.0)
+    return get_charts_bounds(charts_data, "prospective_scenario")
 
 
 class ProspectiveScenarioGraph(BaseGraph):
@@ -66,7 +50,9 @@ class ProspectiveScenarioGraph(BaseGraph):
         - Index 0 : Line "Historic", ranging from 2000 to 2019 included.
         - Index 1 : Line "Worst case scenario / No aspects considered", ranging from 2019 to 2050 incled (top line, including no aspects).
         - Index 2 : Line "Business as usual / All aspects considered", ranging from 2019 to 2050 included (bottom line, combining all aspects).
-        - Index k, k ∈ [3, n + 3] : Area of the aspect k (position k in the `ASPECTS_NAMES` list), ranging from 2019 to 2050 included.
+        - Index k, k ∈ [3, n + 3] : Area of the aspect k (position k in the aspects names of the charts configuration), ranging from 2019 to 2050 included.
+
+    When the number of aspects changes with the charts configuration, the colors of the aspects are generated again.
     """
     def __init__(
             self,
@@ -75,13 +61,18 @@ class ProspectiveScenarioGraph(BaseGraph):
         ) -> None:
         super().__init__()
 
+        number_of_aspects = get_charts_configuration().number_of_aspects
+
         self.figure_title = figure_title
         self.color_palette = (
             color_palette
-            if (color_palette and len(color_palette) == NUMBER_OF_ASPECTS + 3)
-            else DEFAULT_LINES_COLORS + generate_pastel_palette(NUMBER_OF_ASPECTS)
+            if (color_palette and len(color_palette) == number_of_aspects + 3)
+            else DEFAULT_LINES_COLORS + generate_pastel_palette(number_of_aspects)
         )
 
+        # Charts configuration of the drawn names and colors :
+        self._charts_configuration: ChartsConfiguration = None
+
         # Placeholders for marks :
         self._historic_line: Lines            = None
         self._prospective_lines: Lines        = None
@@ -95,7 +86,8 @@ class ProspectiveScenarioGraph(BaseGraph):
             process_data: Dict[str, Any],
             y_scale: LinearScale = None,
             override: bool = False,
-            display_default_legend: bool = True
+            display_default_legend: bool = True,
+            chart_data: Optional[ChartData] = None
         ) -> Figure:
         """
         Create **initial** figure with the historical, prospective, and aspects areas.
@@ -111,6 +103,7 @@ class ProspectiveScenarioGraph(BaseGraph):
         - `y_scale (LinearScale)` : Optional scale for the y-axis. If not provided, a default scale will be created.
         - `override (bool)` : If `True`, forces a redraw of the figure, even if it has already been drawn. Defaults to `False`.
         - `display_default_legend (bool)` : If `True`, the legend will be displayed. Defaults to `True`.
+        - `chart_data (Optional[ChartData])` : The chart data of the process data, if already prepared (see `prepare_charts_data`). Defaults to None (prepared from the process data).
 
         #### Returns :
         - `Figure` : The initial figure with historical, prospective, and aspects areas plotted.
@@ -118,6 +111,13 @@ class ProspectiveScenarioGraph(BaseGraph):
         # Check is the figure is already drawn and if override is set to False :
         super().draw(process_data, override)
 
+        if chart_data is None:
+            chart_data = get_chart_data(process_data)
+
+        charts_configuration = chart_data.charts_configuration
+        self._charts_configuration = charts_configuration
+        colors_aspects_areas = self._get_aspects_colors(charts_configuration.number_of_aspects)
+
         # Extract the years from the process_data :
         years: Dict[str, List[int]]   = get_years(process_data)
         full_years: List[int]         = years["full_years"]        # List of intergers ranging from 2000 to 2050 included.
@@ -141,20 +141,20 @@ class ProspectiveScenarioGraph(BaseGraph):
         )
 
         # Plot the historic line :
-        y_historic_line = get_y_historic_line(process_data)
+        y_historic_line = chart_data.historic_line
         colors_historic_line = [self.color_palette[0]]
 
         self._historic_line = Lines(
             x = historic_years,
             y = y_historic_line,
             colors = colors_historic_line,
-            labels = LINES_NAMES[0],
+            labels = charts_configuration.lines_names[0],
             display_legend = display_default_legend,
             scales = {"x": x_scale, "y": y_scale}
         )
 
         # Plot the prospective lines :
-        y_prospective_lines = get_y_prospective_lines(process_data)
+        y_prospective_lines = chart_data.prospective_lines
         colors_prospective_lines = [self.color_palette[1], self.color_palette[2]]
 
         self._prospective_lines = Lines(
@@ -162,8 +162,8 @@ class ProspectiveScenarioGraph(BaseGraph):
             y = y_prospective_lines,
             colors = colors_prospective_lines,
             labels = [
-                LINES_NAMES[1],
-                LINES_NAMES[2]
+                charts_configuration.lines_names[1],
+                charts_configuration.lines_names[2]
             ],
             display_legend = display_default_legend,
             line_style = "dashed",
@@ -171,8 +171,7 @@ class ProspectiveScenarioGraph(BaseGraph):
         )
 
         # Plot the aspects areas :
-        y_aspects_areas = get_y_aspects_areas(process_data)
-        colors_aspects_areas = [self.color_palette[index] for index in range(3, NUMBER_OF_ASPECTS + 3)]
+        y_aspects_areas = chart_data.aspects_areas
 
         self._aspects_areas = Lines(
             x = full_years,
@@ -182,7 +181,7 @@ class ProspectiveScenarioGraph(BaseGraph):
             fill = "between",
             fill_colors = colors_aspects_areas,
             fill_opacities = [0.3] * len(colors_aspects_areas),
-            labels = [*ASPECTS_NAMES, ""], # Empty label for the last area to avoid legend entry (corresponds to the "no aspects" line).
+            labels = [*charts_configuration.aspects_names, ""], # Empty label for the last area to avoid legend entry (corresponds to the "no aspects" line).
             display_legend = display_default_legend,
             scales = {"x": x_scale, "y": y_scale}
         )
@@ -205,9 +204,7 @@ class ProspectiveScenarioGraph(BaseGraph):
         # Plot the past shade area (from 2000 to 2019 / nowadays) :
         start_year = full_years[0]
         end_year = 2019 # Which you can replace by "date.today().year" (also add "from datetime import date" on top of the file) to make the gray area go up to the current year.
-        all_y_lines = concat([y_historic_line] + y_prospective_lines + y_aspects_areas) # To determine the y-axis limits of the past shade area.
-        y_min = min(all_y_lines) if not all_y_lines.empty else 0
-        y_max = max(all_y_lines) if not all_y_lines.empty else 0
+        y_min, y_max = chart_data.prospective_scenario_bounds # To determine the y-axis limits of the past shade area.
 
         self._past_shade = Lines(
             x = [start_year, end_year, end_year, start_year, start_year],
@@ -239,15 +236,37 @@ class ProspectiveScenarioGraph(BaseGraph):
         return self.figure
 
 
-    def update(self, process_data: Dict[str, Any]) -> Figure:
+    def update(
+            self,
+            process_data: Dict[str, Any],
+            chart_data: Optional[ChartData] = None
+        ) -> Figure:
+        """
+        Update lines' data only, avoiding full redraw.
+        This method updates the existing figure with new data without redrawing the entire figure.
+
+        #### Arguments :
+        - `process_data (Dict[str, Any])` : New processed data to update the figure.
+        - `chart_data (Optional[ChartData])` : The chart data of the process data, if already prepared with the other groups (see `prepare_charts_data`). Defaults to None (prepared from the process data).
+
+        #### Returns :
+        - `Figure` : The updated figure object with new data.
+        """
         # Check if the figure is already drawn :
         super().update(process_data)
 
+        if chart_data is None:
+            chart_data = get_chart_data(process_data)
+
         # Update the figure :
         with self.figure.hold_sync():
+            # Update the names and colors if the charts configuration was reloaded meanwhile :
+            if chart_data.charts_configuration is not self._charts_configuration:
+                self._update_charts_configuration(chart_data.charts_configuration)
+
             # Updating the historic line data is not necessary as it remains constant.
 
-            y_prospective_lines = get_y_prospective_lines(process_data)
+            y_prospective_lines = chart_data.prospective_lines
             y_prospective_final_values, text_prospective_final_values = get_y_final_values_lines(y_prospective_lines)
             # Update the y-axis of the prospective lines (updating the x-axis is not necessary as it remains constant) :
             self._prospective_lines.y = [y_prospective_line.tolist() for y_prospective_line in y_prospective_lines] # Use of the ".tolist()" method to force a BQPlot update of the data.
@@ -257,11 +276,47 @@ class ProspectiveScenarioGraph(BaseGraph):
             self._prospective_final_values.text = text_prospective_final_values
 
             # Update the y-axis of the aspects areas (updating the x-axis is not necessary as it remains constant) :
-            self._aspects_areas.y = [y_aspect_area.tolist() for y_aspect_area in get_y_aspects_areas(process_data)] # Use of the ".tolist()" method to force a BQPlot update of the data.
+            self._aspects_areas.y = [y_aspect_area.tolist() for y_aspect_area in chart_data.aspects_areas] # Use of the ".tolist()" method to force a BQPlot update of the data.
 
         return self.figure
 
 
+    def _get_aspects_colors(self, number_of_aspects: int) -> List[str]:
+        """
+        Get the colors of the aspects areas, generating new ones if the number of aspects does not match the color palette anymore.
+
+        #### Arguments :
+        - `number_of_aspects (int)` : The number of aspects of the charts configuration.
+
+        #### Returns :
+        - `List[str]` : The colors of the aspects areas.
+        """
+        if len(self.color_palette) != number_of_aspects + 3:
+            self.color_palette = self.color_palette[:3] + generate_pastel_palette(number_of_aspects)
+
+        return self.color_palette[3:]
+
+
+    def _update_charts_configuration(self, charts_configuration: ChartsConfiguration) -> None:
+        """
+        Update the names of the lines and the names and colors of the aspects areas from a reloaded charts configuration.
+
+        #### Arguments :
+        - `charts_configuration (ChartsConfiguration)` : The reloaded charts configuration.
+        """
+        colors_aspects_areas = self._get_aspects_colors(charts_configuration.number_of_aspects)
+
+        self._historic_line.labels     = [charts_configuration.lines_names[0]]
+        self._prospective_lines.labels = charts_configuration.lines_names[1:3]
+
+        self._aspects_areas.colors         = colors_aspects_areas
+        self._aspects_areas.fill_colors    = colors_aspects_areas
+        self._aspects_areas.fill_opacities = [0.3] * len(colors_aspects_areas)
+        self._aspects_areas.labels         = [*charts_configuration.aspects_names, ""]
+
+        self._charts_configuration = charts_configuration
+
+
     def get_legend_elements(self) -> Tuple[List[str], List[str], List[str]]:
         # Check if the figure is already drawn :
         super().get_legend_elements()
@@ -316,7 +371,8 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
             groups_process_data: List[Dict[str, Any]],
             y_scale: LinearScale = None,
             override: bool = False,
-            display_default_legend: bool = True
+            display_default_legend: bool = True,
+            scenarios_keys: Optional[List[str]] = None
         ) -> Figure:
         """
         Create **initial** figure with the historical, prospective, and aspects areas.
@@ -333,6 +389,7 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
         - `y_scale (LinearScale)` : Optional scale for the y-axis. If not provided, a default scale will be created.
         - `override (bool)` : If `True`, forces a redraw of the figure, even if it has already been drawn. Defaults to `False`.
         - `display_default_legend (bool)` : If `True`, the legend will be displayed. Defaults to `True`.
+        - `scenarios_keys (Optional[List[str]])` : The keys of the reference scenario followed by the keys of the groups scenarios (see `get_scenario_fingerprint`), used to merge the identical scenarios without comparing their lines. Defaults to None (the lines are compared).
 
         #### Returns :
         - `Figure` : The initial figure with historical, prospective, and "Business as usual / All aspects considered" from all the groups scenarios plotted.
@@ -363,22 +420,25 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
         )
 
         # Plot the historic line :
-        y_historic_line = get_y_historic_line(process_data)
+        reference_chart_data, *groups_charts_data = prepare_charts_data([process_data, *groups_process_data])
+        y_historic_line = reference_chart_data.historic_line
         colors_historic_line = [self.color_palette[0]]
 
         self._historic_line = Lines(
             x = historic_years,
             y = y_historic_line,
             colors = colors_historic_line,
-            labels = LINES_NAMES[0],
+            labels = reference_chart_data.charts_configuration.lines_names[0],
             display_legend = display_default_legend,
             scales = {"x": x_scale, "y": y_scale}
         )
 
         # Plot the prospective lines :
         y_prospective_lines, labels_prospective_lines, groups_ids = get_y_prospective_lines_groups_comparison(
-            process_data,
-            groups_process_data
+            reference_chart_data.prospective_lines,
+            [group_chart_data.prospective_lines[1] for group_chart_data in groups_charts_data],
+            reference_key = scenarios_keys[0] if scenarios_keys else None,
+            groups_keys = scenarios_keys[1:] if scenarios_keys else None
         )
         colors_prospective_lines = [
             self.color_palette[index]
@@ -433,7 +493,8 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
     def update(
             self,
             process_data: Dict[str, Any],
-            groups_process_data: List[Dict[str, Any]]
+            groups_process_data: List[Dict[str, Any]],
+            scenarios_keys: Optional[List[str]] = None
         ) -> Figure:
         """
         Update lines' data only, avoiding full redraw.
@@ -442,6 +503,7 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
         #### Arguments :
         - `process_data (Dict[str, Any])` : New processed data to update the figure from the reference scenario.
         - `groups_process_data (List[Dict[str, Any]])` : List of new processed data to update the figure from all the groups scenarios.
+        - `scenarios_keys (Optional[List[str]])` : The keys of the reference scenario followed by the keys of the groups scenarios (see `get_scenario_fingerprint`), used to merge the identical scenarios without comparing their lines. Defaults to None (the lines are compared).
 
         #### Returns :
         - `Figure` : The updated figure object with new data.
@@ -451,12 +513,16 @@ class ProspectiveScenarioGroupComparisonGraph(BaseGraph):
 
         # Update the figure :
         with self.figure.hold_sync():
-            # Updating the historic line data is not necessary as it remains constant.
+            # Updating the historic line data is not necessary as it remains constant (its name may change with the charts configuration).
 
-            # Update all the prospective lines :
+            # Update all the prospective lines (from the already prepared chart data of the scenarios) :
+            reference_chart_data, *groups_charts_data = prepare_charts_data([process_data, *groups_process_data])
+            self._historic_line.labels = [reference_chart_data.charts_configuration.lines_names[0]]
             y_prospective_lines, labels_prospective_lines, groups_ids = get_y_prospective_lines_groups_comparison(
-                process_data,
-                groups_process_data
+                reference_chart_data.prospective_lines,
+                [group_chart_data.prospective_lines[1] for group_chart_data in groups_charts_data],
+                reference_key = scenarios_keys[0] if scenarios_keys else None,
+                groups_keys = scenarios_keys[1:] if scenarios_keys else None
             )
             color_prospective_lines = [
                 self.color_palette[index]
@@ -0,0 +1,262 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pandas import Series
+
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from core.aeromaps_utils.evaluate_expression import CompiledFormula, evaluate_formulas_batch
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.aeromaps_utils.charts_configuration import ChartsConfiguration, get_charts_configuration
+from core.metrics import CACHE_REQUESTS, STAGE_DURATION
+
+
+
+
+def get_charts_compiled_formulas(charts_configuration: ChartsConfiguration) -> List[CompiledFormula]:
+    """
+    Get the formulas of all the charts, in the order expected by `ChartData.from_values`.
+
+    The "all aspects" line is evaluated once over the full years, for both its line and its area.
+    The first formula is the one of the historic line, which is shared by every scenario (see `get_historic_line`).
+
+    #### Arguments :
+    - `charts_configuration (ChartsConfiguration)` : The charts configuration.
+
+    #### Returns :
+    - `List[CompiledFormula]` : The compiled formulas of the charts.
+    """
+    return [
+        charts_configuration.lines_compiled_formulas[0],
+        charts_configuration.lines_compiled_formulas[1],
+        charts_configuration.all_aspects_area_compiled_formula,
+        *charts_configuration.aspects_compiled_formulas,
+        *charts_configuration.bars_consumption_compiled_formulas,
+        *charts_configuration.bars_budget_compiled_formulas
+    ]
+
+
+# Prepared charts data of the scenario results alive in the server (shared by every session, released with the results, and prepared again when the charts configuration changes) :
+_CHARTS_DATA_CACHE: "WeakKeyDictionary[ScenarioResult, ChartData]" = WeakKeyDictionary()
+_CHARTS_DATA_CACHE_LOCK = Lock()
+
+# Historic line of the current charts configuration (the historic years are common to every scenario, so it is evaluated once and shared by every chart data) :
+_HISTORIC_LINE: Optional[Tuple[ChartsConfiguration, Series]] = None
+
+
+def get_historic_line(charts_configuration: ChartsConfiguration, scenario_result: ScenarioResult) -> Series:
+    """
+    Get the historic line of a charts configuration, evaluating it on a scenario result if it is not evaluated yet (or was evaluated with a previous charts configuration).
+
+    #### Arguments :
+    - `charts_configuration (ChartsConfiguration)` : The charts configuration.
+    - `scenario_result (ScenarioResult)` : Any scenario result (the historic line is the same for every scenario).
+
+    #### Returns :
+    - `Series` : The y-values of the historic line, shared read-only by every chart data.
+    """
+    global _HISTORIC_LINE
+
+    with _CHARTS_DATA_CACHE_LOCK:
+        historic_line = _HISTORIC_LINE
+    if historic_line is not None and historic_line[0] is charts_configuration:
+        return historic_line[1]
+
+    historic_line = (charts_configuration, charts_configuration.lines_compiled_formulas[0].evaluate(scenario_result))
+    with _CHARTS_DATA_CACHE_LOCK:
+        _HISTORIC_LINE = historic_line
+
+    return historic_line[1]
+
+
+def get_bounds(values: Sequence[np.ndarray | Series | float]) -> Tuple[float, float]:
+    """
+    Get the minimal and maximal values of several lines or values, ignoring the NaN values.
+
+    #### Arguments :
+    - `values (Sequence[np.ndarray | Series | float])` : The lines (arrays or series) and single values.
+
+    #### Returns :
+    - `Tuple[float, float]` : The minimal and maximal values, or `(0.0, 0.0)` if there is no (non-NaN) value.
+    """
+    all_values = np.concatenate([np.ravel(np.asarray(value, dtype = np.float64)) for value in values]) if values else np.empty(0)
+    if np.isnan(all_values).all():
+        return 0.0, 0.0
+
+    return float(np.nanmin(all_values)), float(np.nanmax(all_values))
+
+
+class ChartData:
+    """
+    Prepared y-values of the charts of a scenario (prospective scenario graph and multidisciplinary graph).
+
+    The formulas of the charts are evaluated once per scenario (see `prepare_charts_data`), and the same values feed the computation of the shared y-scales and the updates of the graphs.
+
+    #### Arguments :
+    - `charts_configuration (ChartsConfiguration)` : The charts configuration the values were evaluated with (giving the names of the lines, aspects and bars).
+    - `historic_line (Series)` : The y-values of the historic line.
+    - `prospective_lines (List[Series])` : The y-values of the prospective lines (no aspect and all aspects).
+    - `aspects_areas (List[Series])` : The y-values of the aspects areas, followed by the "all aspects" line over the full years.
+    - `consumption_bars (List[float])` : The y-values of the consumption bars.
+    - `budget_bars (List[float])` : The y-values of the budget bars.
+    """
+    __slots__ = (
+        "charts_configuration",
+        "historic_line",
+        "prospective_lines",
+        "aspects_areas",
+        "consumption_bars",
+        "budget_bars",
+        "prospective_scenario_bounds",
+        "multidisciplinary_bounds"
+    )
+
+    def __init__(
+            self,
+            charts_configuration: ChartsConfiguration,
+            historic_line: Series,
+            prospective_lines: List[Series],
+            aspects_areas: List[Series],
+            consumption_bars: List[float],
+            budget_bars: List[float]
+        ) -> None:
+        self.charts_configuration = charts_configuration
+        self.historic_line     = historic_line
+        self.prospective_lines = prospective_lines
+        self.aspects_areas     = aspects_areas
+        self.consumption_bars  = consumption_bars
+        self.budget_bars       = budget_bars
+
+        # Extreme values of each chart (reduced once, to share the y-scales between the groups) :
+        self.prospective_scenario_bounds: Tuple[float, float] = get_bounds([historic_line, *prospective_lines, *aspects_areas])
+        self.multidisciplinary_bounds: Tuple[float, float]    = get_bounds([*budget_bars, *consumption_bars])
+
+
+    def get_memory_size(self) -> int:
+        """
+        Get the approximate memory size of the values of the chart data.
+
+        #### Returns :
+        - `int` : The size of the lines and bars values, in bytes (the historic line is shared by every chart data, but counted in each).
+        """
+        lines = [self.historic_line, *self.prospective_lines, *self.aspects_areas]
+        return sum(np.asarray(line).nbytes for line in lines) + 8 * (len(self.consumption_bars) + len(self.budget_bars))
+
+
+    @classmethod
+    def from_values(
+            cls,
+            charts_configuration: ChartsConfiguration,
+            scenario_result: ScenarioResult,
+            values: List[Series | float]
+        ) -> "ChartData":
+        """
+        Creates the chart data of a scenario from the values of the charts formulas (see `get_charts_compiled_formulas`).
+
+        #### Arguments :
+        - `charts_configuration (ChartsConfiguration)` : The charts configuration the formulas come from.
+        - `scenario_result (ScenarioResult)` : The scenario result the formulas were evaluated on.
+        - `values (List[Series | float])` : The calculated values of each formula of `get_charts_compiled_formulas` (in the same order).
+
+        #### Returns :
+        - `ChartData` : The chart data of the scenario.
+        """
+        number_of_aspects = charts_configuration.number_of_aspects
+        number_of_bars    = len(charts_configuration.bars_consumption_compiled_formulas)
+        historic_line, no_aspect_line, all_aspects_full_line = values[:3]
+        aspects_areas  = values[3:3 + number_of_aspects]
+        bars           = values[3 + number_of_aspects:]
+
+        # The formulas are evaluated year by year, so the prospective "all aspects" line is a part of the full years one :
+        all_aspects_line = all_aspects_full_line.loc[scenario_result.get_years("prospective_years")]
+
+        return cls(
+            charts_configuration,
+            historic_line,
+            [no_aspect_line, all_aspects_line],
+            aspects_areas + [all_aspects_full_line], # The "all aspects" line fills the bottom area of the graph (to plot `n` y-areas, you need `n + 1` lines).
+            bars[:number_of_bars],
+            bars[number_of_bars:]
+        )
+
+
+def prepare_charts_data(processes_data: Sequence[ScenarioResult | Dict[str, Any]]) -> List[ChartData]:
+    """
+    Prepares the chart data of several scenarios at once.
+
+    Each formula of the current charts configuration is evaluated once for all the scenarios whose chart data is not already prepared with it (see `evaluate_formulas_batch`),
+    and the chart data of a scenario result is kept as long as the result is alive (the groups sharing a scenario, and the sessions sharing the reference scenario, share its chart data).
+    The historic line is only evaluated once per charts configuration (see `get_historic_line`).
+
+    #### Arguments :
+    - `processes_data (Sequence[ScenarioResult | Dict[str, Any]])` : The computed data of each scenario.
+
+    #### Returns :
+    - `List[ChartData]` : The chart data of each scenario, in the same order.
+    """
+    scenarios_results = [
+        process_data if isinstance(process_data, ScenarioResult) else ScenarioResult(process_data)
+        for process_data in processes_data
+    ]
+
+    charts_configuration = get_charts_configuration()
+
+    # Find the distinct scenario results whose chart data is not prepared yet (or was prepared with a previous charts configuration) :
+    with _CHARTS_DATA_CACHE_LOCK:
+        charts_data = {id(result): _CHARTS_DATA_CACHE.get(result) for result in scenarios_results}
+    missing_results = list({
+        id(result): result
+        for result in scenarios_results
+        if charts_data[id(result)] is None or charts_data[id(result)].charts_configuration is not charts_configuration
+    }.values())
+    CACHE_REQUESTS.inc(len(scenarios_results) - len(missing_results), cache = "chart_data", result = "hit")
+    CACHE_REQUESTS.inc(len(missing_results), cache = "chart_data", result = "miss")
+
+    # Evaluate each formula once for all the missing scenario results :
+    if missing_results:
+        with STAGE_DURATION.time(stage = "evaluation"):
+            historic_line = get_historic_line(charts_configuration, missing_results[0])
+            charts_compiled_formulas = get_charts_compiled_formulas(charts_configuration)[1:]
+            for result, values in zip(missing_results, evaluate_formulas_batch(charts_compiled_formulas, missing_results)):
+                charts_data[id(result)] = ChartData.from_values(charts_configuration, result, [historic_line, *values])
+
+    with _CHARTS_DATA_CACHE_LOCK:
+        for result in missing_results:
+            _CHARTS_DATA_CACHE[result] = charts_data[id(result)]
+
+    return [charts_data[id(result)] for result in scenarios_results]
+
+
+def get_chart_data(process_data: ScenarioResult | Dict[str, Any]) -> ChartData:
+    """
+    Get the chart data of a scenario (see `prepare_charts_data`).
+
+    #### Arguments :
+    - `process_data (ScenarioResult | Dict[str, Any])` : The computed data of the scenario.
+
+    #### Returns :
+    - `ChartData` : The chart data of the scenario.
+    """
+    return prepare_charts_data([process_data])[0]
+
+
+def get_charts_bounds(charts_data: Sequence[ChartData], chart: str) -> Tuple[float, float]:
+    """
+    Get the shared bounds of a chart over several scenarios.
+
+    #### Arguments :
+    - `charts_data (Sequence[ChartData])` : The chart data of each scenario.
+    - `chart (str)` : The chart, either `prospective_scenario` or `multidisciplinary`.
+
+    #### Returns :
+    - `Tuple[float, float]` : The minimal and maximal values of the chart over all the scenarios, or `(0.0, 0.0)` if there is no scenario.
+    """
+    if chart not in ("prospective_scenario", "multidisciplinary"):
+        raise ValueError(f"Unknown chart '{chart}'.")
+    if not charts_data:
+        return 0.0, 0.0
+
+    bounds = np.array([getattr(chart_data, f"{chart}_bounds") for chart_data in charts_data])
+    return float(bounds[:, 0].min()), float(bounds[:, 1].max())
@@ -1,125 +1,62 @@
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
-from pandas import Series
-
-from crud.crud_prospective_scenario_aspects import get_aspects, get_aspects_names
+import hashlib
 
-from core.aeromaps_utils.evaluate_expression import evaluate_expression_aeromaps
+import numpy as np
 
-from utils import PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH, get_first_positive_minimal_distance
+from pandas import Series
 
+from core.aeromaps_utils.charts_configuration import get_charts_configuration
 
+from utils import spread_values
 
 
-# Load the lines (historic, no aspect and all aspect) from the JSON file :
-LINES                                       = get_aspects(PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH)
-LINES_NAMES: List[str]                      = get_aspects_names(PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH)
-LINES_OUTPUT_FORMULAS: List[Dict[str, str]] = [line["output_formula"] for line in LINES.values()]
 
-# Load the aspects from the JSON file :
-ASPECTS                                       = get_aspects()
-ASPECTS_NAMES: List[str]                      = get_aspects_names()
-ASPECTS_OUTPUT_FORMULAS: List[Dict[str, str]] = [aspect["output_formula"] for aspect in ASPECTS.values()]
-NUMBER_OF_ASPECTS: int                       = len(ASPECTS)
 
 # Initialize default colors for the lines :
 DEFAULT_LINES_COLORS: List[str] = ["#8c564b", "#000000", "#d62728"]
 
-
-def get_y_historic_line(process_data: Dict[str, Any]) -> Series:
-    """
-    Get the y-values of the historic line from the process data.
-
-    #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the historic line data.
-
-    #### Returns :
-    - `Series` : The y-values of the historic line.
-    """
-    return evaluate_expression_aeromaps(
-        process_data,
-        *LINES_OUTPUT_FORMULAS[0].values()
-    )
-
-
-def get_y_no_aspect_line(process_data: Dict[str, Any]) -> Series:
-    """
-    Get the y-values of the no aspect line from the process data.
-
-    #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the no aspect line data.
-
-    #### Returns :
-    - `Series` : The y-values of the no aspect line.
-    """
-    return evaluate_expression_aeromaps(
-        process_data,
-        *LINES_OUTPUT_FORMULAS[1].values()
-    )
-
-
-def get_y_all_aspects_line(process_data: Dict[str, Any]) -> Series:
-    """
-    Get the y-values of the all aspects line from the process data.
-
-    #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the all aspects line data.
-
-    #### Returns :
-    - `Series` : The y-values of the all aspects line.
-    """
-    return evaluate_expression_aeromaps(
-        process_data,
-        *LINES_OUTPUT_FORMULAS[2].values()
-    )
+# Number of decimals kept to fingerprint a line (lines equal up to this precision are merged in the group comparison graph) :
+LINE_FINGERPRINT_DECIMALS = 9
 
 
-def get_y_prospective_lines(process_data: Dict[str, Any]) -> List[Series]:
+def get_line_fingerprint(line: Series, decimals: int = LINE_FINGERPRINT_DECIMALS) -> bytes:
     """
-    Get the y-values of the prospective lines from the process data.
+    Get the fingerprint of a line, from its years and its values rounded to the given number of decimals.
 
     #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the prospective lines data.
+    - `line (Series)` : The y-values of the line, indexed by year.
+    - `decimals (int)` : The number of decimals of the values kept in the fingerprint. Defaults to `LINE_FINGERPRINT_DECIMALS`.
 
     #### Returns :
-    - `List[Series]` : A list of two series containing the y-values of the prospective lines (no aspects and all aspects considered).
-    """
-    return [
-        get_y_no_aspect_line(process_data),
-        get_y_all_aspects_line(process_data)
-    ]
-
-
-def get_y_aspects_areas(process_data: Dict[str, Any]) -> List[Series]:
+    - `bytes` : The fingerprint of the line (two lines with the same years and the same rounded values share the same fingerprint).
     """
-    Get the y-values of the aspects areas from the process data.
+    values = np.round(line.to_numpy(dtype = np.float64), decimals) + 0.0 # Adding 0.0 turns -0.0 into 0.0.
 
-    #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the aspects areas data.
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(np.asarray(line.index, dtype = np.int64).tobytes())
+    digest.update(values.tobytes())
 
-    #### Returns :
-    - `List[Series]` : A list containing the y-values of the aspects areas.
-    """
-    return [
-        evaluate_expression_aeromaps(process_data, *aspect_output_formula.values())
-        for aspect_output_formula in ASPECTS_OUTPUT_FORMULAS
-    ] + [
-        evaluate_expression_aeromaps(process_data, LINES_OUTPUT_FORMULAS[2]["expression"], "full_years") # Add the "all aspects" line to the aspects areas, allowing to fill the bottom area of the graph (to plot `n` y-areas, you need `n + 1` lines).
-    ]
+    return digest.digest()
 
 
 def get_y_prospective_lines_groups_comparison(
-        reference_process_data: Dict[str, Any],
-        groups_process_data: List[Dict[str, Any]]
+        reference_lines: List[Series],
+        all_groups_lines: List[Series],
+        reference_key: Optional[str] = None,
+        groups_keys: Optional[List[str]] = None
     ) -> Tuple[List[Series], List[str], List[List[int]]]:
     """
-    Get the y-values of the prospective lines for group comparison from the process data.
+    Get the y-values of the prospective lines for group comparison from the already evaluated lines (see `prepare_charts_data`).
+
+    The lines are merged in a single pass, from their fingerprints (see `get_line_fingerprint`).
+    If the scenario keys are given, the lines of the scenarios sharing the same key are merged without fingerprinting their values again.
 
     #### Arguments :
-    - `reference_process_data (Dict[str, Any])` : The process data containing the necessary information to calculate the prospective lines data from a reference scenario.
-    - `groups_process_data (List[Series])` : A list of all of the process data for each group scenario.
-    - `merge_group_equal_to_reference (bool)` : Whether to merge the group of lines that are equal to the reference scenario's "all aspects" line.
-        If `True`, the groups lines that are equal to the reference scenario's "all aspects" line will be merged into the "all aspects" line and label.
+    - `reference_lines (List[Series])` : The y-values of the prospective lines of the reference scenario (no aspect and all aspects lines, see `ChartData.prospective_lines`).
+    - `all_groups_lines (List[Series])` : The y-values of the "all aspects" prospective line of each group scenario.
+    - `reference_key (Optional[str])` : The key of the reference scenario (see `get_scenario_fingerprint`). Defaults to None.
+    - `groups_keys (Optional[List[str]])` : The key of the scenario of each group (in the same order as the lines). Defaults to None (the lines are merged from their values only).
 
     #### Returns :
     - `List[Series]` : A list containing the y-values of the prospective lines for :
@@ -129,33 +66,37 @@ def get_y_prospective_lines_groups_comparison(
     - `List[List[int]]` : A list of lists containing the group indices where each "group of lines" corresponds to the same line.
         Does not include a list of all the groups that are equal to the reference scenario's "all aspects" line.
     """
-    # Get the y-values of the prospective lines for the reference scenario :
-    reference_lines = get_y_prospective_lines(reference_process_data)
-
-    # Get the y-values of the prospective lines for each group scenario :
-    all_groups_lines = [
-        get_y_all_aspects_line(group_process_data)
-        for group_process_data in groups_process_data
-    ]
-
     """
     Lines :
     """
-    # Merge the groups lines following the exact same values :
+    # Fingerprint the lines (once per scenario key) :
+    keys_fingerprints: Dict[str, bytes] = {}
+    def get_fingerprint(line: Series, key: Optional[str]) -> bytes:
+        if key is None:
+            return get_line_fingerprint(line)
+        if key not in keys_fingerprints:
+            keys_fingerprints[key] = get_line_fingerprint(line)
+        return keys_fingerprints[key]
+
+    reference_fingerprint = get_fingerprint(reference_lines[1], reference_key)
+
+    # Merge the groups lines following the same values :
     groups_lines: List[Series]               = []
     groups_ids_equal_to_reference: List[int] = [] # List of group indices that are equal to the reference scenario's "all aspects" line.
     groups_ids: List[List[int]]              = [] # List of lists containing the group indices where each "group of lines" corresponds to the same line.
-    for index_line, group_line in enumerate(all_groups_lines):
+    unique_lines_positions: Dict[bytes, int] = {} # Position of each unique line (by fingerprint) in the `groups_lines` list.
+    for index_line, (group_line, group_key) in enumerate(zip(all_groups_lines, groups_keys or [None] * len(all_groups_lines))):
+        line_fingerprint = get_fingerprint(group_line, group_key)
+
         # Check if the line is equal to the reference scenario's "all aspects" line :
-        if group_line.equals(reference_lines[1]):
+        if line_fingerprint == reference_fingerprint:
             groups_ids_equal_to_reference.append(index_line + 1)
             continue
         # Check if the line already exists in the list :
-        for index_unique_line, group_unique_line in enumerate(groups_lines):
-            if group_line.equals(group_unique_line):
-                groups_ids[index_unique_line].append(index_line + 1)
-                break
+        if line_fingerprint in unique_lines_positions:
+            groups_ids[unique_lines_positions[line_fingerprint]].append(index_line + 1)
         else:
+            unique_lines_positions[line_fingerprint] = len(groups_lines)
             groups_lines.append(group_line)
             groups_ids.append([index_line + 1])
 
@@ -165,7 +106,7 @@ def get_y_prospective_lines_groups_comparison(
     labels: List[str] = []
 
     # Create the label for the "no_aspect" reference scenario line :
-    labels.append(LINES_NAMES[1])
+    labels.append(get_charts_configuration().lines_names[1])
 
     # Create the label for the "all_aspects" reference scenario line :
     all_aspects_label = "Émissions restantes en n'appliquant aucune carte (Scénario de référence"
@@ -178,8 +119,8 @@ def get_y_prospective_lines_groups_comparison(
 
     labels.append(all_aspects_label)
 
-    # Create the labels for the groups lines :
-    for group_line, group_ids in zip(groups_lines, groups_ids):
+    # Create the labels for the groups lines (the groups equal to the reference scenario are already included in the "all_aspects" label) :
+    for group_ids in groups_ids:
         # Application of the label depending on the number of groups :
         if len(group_ids) == 1:
             labels.append(f"Scénario du groupe {group_ids[0]}")
@@ -187,10 +128,6 @@ def get_y_prospective_lines_groups_comparison(
             remaining_groups = ", ".join(str(index) for index in group_ids[:-1])
             labels.append(f"Scénario des groupes {remaining_groups} et {group_ids[-1]}")
 
-        # Add a suffix to the label if it is the same line as the reference scenario :
-        if group_line.equals(reference_lines[1]):
-            labels[-1] += " (Identique au scénario de référence)"
-
     """
     Return the values :
     """
@@ -221,15 +158,15 @@ def get_y_final_values_lines(
         minimal_distance: float = 100
     ) -> Tuple[List[float], List[str]]:
     """
-    Get the final y-values and formatted final values of each line.
+    Get the y-positions of the final values labels and the formatted final values of each line.
 
     #### Arguments :
     - `lines (List[Series])` : A list of Series objects representing the y-values of the lines.
-    - `minimal_distance (float)` : The minimal required distance between all final y-values of the lines to display them.
-        If any two final y-values are closer than the minimal distance, no final values will not be displayed.
+    - `minimal_distance (float)` : The minimal required distance between the labels of the final values.
+        The labels closer than the minimal distance are moved apart (see `spread_values`), the other labels stay at the final y-value of their line.
 
     #### Returns :
-    - `List[float]` : A list containing the final y-values of the lines.
+    - `List[float]` : A list containing the y-positions of the labels of the final values.
     - `List[str]` : A list of **string-formatted** final values for each line.
     """
     # Get the final y-values of the lines :
@@ -237,17 +174,13 @@ def get_y_final_values_lines(
         line.iloc[-1] for line in lines
     ]
 
-    # Get the formatted final values (if any two final values are closer than the minimal distance, don't display any final values) :
-    first_positive_minimal_distance = get_first_positive_minimal_distance(final_y_values)
-    if 0 < first_positive_minimal_distance <= minimal_distance:
-        final_y_values_text = [""] * len(final_y_values)
-    else:
-        final_y_values_text = [
-            format_final_value(value)
-            for value in final_y_values
-        ]
+    # Get the formatted final values, and move the colliding labels apart :
+    final_y_values_text = [
+        format_final_value(value)
+        for value in final_y_values
+    ]
 
-    return final_y_values, final_y_values_text
+    return spread_values(final_y_values, minimal_distance), final_y_values_text
 
 
 def format_final_values_group_comparison(
@@ -317,13 +250,13 @@ def get_y_final_values_lines_group_comparison(
         groups_ids: Optional[List[List[int]]] = None
     ) -> Tuple[List[float], List[str]]:
     """
-    Get the final y-values and formatted final values of each line.
+    Get the y-positions of the final values labels and the formatted final values of each line.
     This function should only be used for the ProspectiveScenarioGroupComparison graphs.
 
     #### Arguments :
     - `lines (List[Series])` : A list of Series objects representing the y-values of the lines.
-    - `minimal_distance (float)` : The minimal required distance between all final y-values of the lines to display them.
-        If any two final y-values are closer than the minimal distance, no final values will not be displayed.
+    - `minimal_distance (float)` : The minimal required distance between the labels of the final values.
+        The labels closer than the minimal distance are moved apart (see `spread_values`), the other labels stay at the final y-value of their line.
     - `include_group_names (bool)` : Whether to include the group names in the formatted final values.
         If `True`, the group names will be included in the formatted values, following this logic :
         - Index 0 : Value of the "no aspect" line from the reference scenario.
@@ -332,7 +265,7 @@ def get_y_final_values_lines_group_comparison(
     - `groups_ids (Optional[List[List[int]]])` : A list of group indices where each "group of lines" corresponds to the same line (except for the list of groups that are equal to the reference scenario's "all aspects" line).
 
     #### Returns :
-    - `List[float]` : A list containing the final y-values of the lines.
+    - `List[float]` : A list containing the y-positions of the labels of the final values.
     - `List[str]` : A list of **string-formatted** final values for each line.
     """
     # Get the final y-values of the lines :
@@ -340,11 +273,7 @@ def get_y_final_values_lines_group_comparison(
         line.iloc[-1] for line in lines
     ]
 
-    # Get the formatted final values (if any two final values are closer than the minimal distance, don't display any final values) :
-    first_positive_minimal_distance = get_first_positive_minimal_distance(final_y_values)
-    if 0 < first_positive_minimal_distance <= minimal_distance:
-        final_y_values_text = [""] * len(final_y_values)
-    else:
-        final_y_values_text = format_final_values_group_comparison(final_y_values, include_group_names, groups_ids)
+    # Get the formatted final values, and move the colliding labels apart :
+    final_y_values_text = format_final_values_group_comparison(final_y_values, include_group_names, groups_ids)
 
-    return final_y_values, final_y_values_text
+    return spread_values(final_y_values, minimal_distance), final_y_values_text
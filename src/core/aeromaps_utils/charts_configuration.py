@@ -0,0 +1,247 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import hashlib
+import logging
+import os
+import time
+
+from pathlib import Path
+from threading import Lock
+
+from crud.crud_cards import get_cards_registry, load_cards_registry
+from crud.crud_prospective_scenario_aspects import get_aspects
+from crud.crud_multidisciplinary_bars import get_bars
+
+from core.aeromaps_utils.evaluate_expression import CompiledFormula, compile_formula
+from core.aeromaps_utils.formula_variables import CHARTS_DEFINITIONS_PATHS, get_charts_variables
+from core.aeromaps_utils.scenario_store import SCENARIO_STORE
+from core.aeromaps_utils.scenario_parameters import clear_scenario_parameters_cache
+from core.aeromaps_utils.scenario_lattice import unload_scenario_lattice
+
+from utils import (
+    GRAPHS_JSON_PATH,
+    CARDS_JSON_PATH,
+    CARDS_PARAMETERS_JSON_PATH,
+    PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH,
+    PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH
+)
+
+
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Minimal number of seconds between two checks of the configuration files (configurable from the `.env` file, `0` disables the live reload) :
+CONFIGURATION_WATCHER_INTERVAL = int(os.getenv("CONFIGURATION_WATCHER_INTERVAL", "2"))
+
+# Keys of the prospective scenario lines, in the order of `ChartsConfiguration.lines_names` and `ChartsConfiguration.lines_compiled_formulas` :
+PROSPECTIVE_SCENARIO_LINES_KEYS = ("historic_LINE", "no_aspects_LINE", "all_aspects_LINE")
+
+
+def _compile(formula: Dict[str, Any], year_range: Optional[str | int] = None) -> CompiledFormula:
+    # The compiled formulas are cached by expression, so the unchanged formulas are not compiled again on reload :
+    return compile_formula(formula["expression"], year_range if year_range is not None else formula.get("year_range"))
+
+
+class ChartsConfiguration:
+    """
+    Read-only configuration of the charts : the names and the compiled formulas of the prospective scenario lines and aspects and of the multidisciplinary bars.
+
+    A configuration is never modified : when the definitions files change, a new configuration (with a new version) replaces it (see `get_charts_configuration`).
+
+    #### Arguments :
+    - `version (int)` : The version of the configuration (incremented on each reload).
+    """
+    __slots__ = (
+        "version",
+        "lines_names",
+        "lines_compiled_formulas",
+        "all_aspects_area_compiled_formula",
+        "aspects_names",
+        "aspects_compiled_formulas",
+        "number_of_aspects",
+        "bars_names",
+        "bars_budget_compiled_formulas",
+        "bars_consumption_compiled_formulas",
+        "variables"
+    )
+
+    def __init__(self, version: int = 1) -> None:
+        self.version = version
+
+        # Load the lines (historic, no aspect and all aspect), selected by key :
+        lines = get_aspects(PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH)
+        missing_lines_keys = [key for key in PROSPECTIVE_SCENARIO_LINES_KEYS if key not in lines]
+        if missing_lines_keys:
+            raise ValueError(f"Missing prospective scenario lines in {PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH}: {', '.join(missing_lines_keys)}.")
+
+        self.lines_names: List[str]                         = [lines[key]["name"] for key in PROSPECTIVE_SCENARIO_LINES_KEYS]
+        self.lines_compiled_formulas: List[CompiledFormula] = [_compile(lines[key]["output_formula"]) for key in PROSPECTIVE_SCENARIO_LINES_KEYS]
+
+        # The "all aspects" line over the full years, closing the bottom aspect area :
+        self.all_aspects_area_compiled_formula = _compile(lines["all_aspects_LINE"]["output_formula"], "full_years")
+
+        # Load the aspects :
+        aspects = get_aspects(PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH)
+        self.aspects_names: List[str]                         = [aspect["name"] for aspect in aspects.values()]
+        self.aspects_compiled_formulas: List[CompiledFormula] = [_compile(aspect["output_formula"]) for aspect in aspects.values()]
+        self.number_of_aspects: int                           = len(aspects)
+
+        # Load the bars :
+        bars = get_bars()
+        self.bars_names: List[str]                                    = [bar["name"] for bar in bars.values()]
+        self.bars_budget_compiled_formulas: List[CompiledFormula]      = [_compile(bar["output_formula_BUDGET"]) for bar in bars.values()]
+        self.bars_consumption_compiled_formulas: List[CompiledFormula] = [_compile(bar["output_formula_CONSUMPTION"]) for bar in bars.values()]
+
+        # AeroMAPS variables the scenario results must keep for these formulas :
+        self.variables: Dict[str, Tuple[str, ...]] = get_charts_variables()
+
+
+    def __repr__(self) -> str:
+        return f"ChartsConfiguration(version={self.version})"
+
+
+class ConfigurationWatcher:
+    """
+    Watcher of the JSON configuration files of a directory, detecting the changed files by modification time and content hash.
+
+    The files are only hashed again when their modification time changes, and the directory is checked at most once every `interval` seconds.
+    The files are first scanned on the first check (not when the watcher is created, so importing this module reads no file).
+    The changes found by a check are only recorded once acknowledged (see `acknowledge`), so the changes that could not be applied are found again by the next check.
+
+    #### Arguments :
+    - `directory (Path)` : The watched directory (its JSON files are watched recursively).
+    - `interval (int)` : The minimal number of seconds between two checks (`0` disables the watcher).
+    """
+    def __init__(self, directory: Path, interval: int = CONFIGURATION_WATCHER_INTERVAL) -> None:
+        self.directory = Path(directory)
+        self.interval  = interval
+
+        self._files: Optional[Dict[Path, Tuple[int, str]]] = None # Modification time and content hash of each file (scanned on the first check).
+        self._checked_files: Optional[Dict[Path, Tuple[int, str]]] = None # The files found by the last check, recorded once acknowledged.
+        self._last_check = time.monotonic()
+
+
+    def _scan(self, known_files: Dict[Path, Tuple[int, str]]) -> Dict[Path, Tuple[int, str]]:
+        files = {}
+        for path in sorted(self.directory.rglob("*.json")):
+            try:
+                modification_time = path.stat().st_mtime_ns
+                if path in known_files and known_files[path][0] == modification_time:
+                    files[path] = known_files[path]
+                else:
+                    files[path] = (modification_time, hashlib.sha256(path.read_bytes()).hexdigest())
+            except OSError: # The file was removed (or is being replaced) meanwhile.
+                continue
+
+        return files
+
+
+    def check(self, force: bool = False) -> List[Path]:
+        """
+        Get the files added, removed or whose content changed since the last acknowledged check.
+
+        #### Arguments :
+        - `force (bool)` : If True, checks the files even if the last check is more recent than the interval. Defaults to False.
+
+        #### Returns :
+        - `List[Path]` : The changed files (an empty list if the watcher is disabled or was checked recently).
+        """
+        if self._files is None:
+            # The first check only records the files, read at the same time as the configuration :
+            self._files      = self._scan({})
+            self._last_check = time.monotonic()
+            return []
+
+        if not force and (self.interval <= 0 or time.monotonic() - self._last_check < self.interval):
+            return []
+
+        files = self._scan(self._files)
+        changed_paths = [
+            path for path in sorted(files.keys() | self._files.keys())
+            if files.get(path, (None, None))[1] != self._files.get(path, (None, None))[1]
+        ]
+
+        self._checked_files = files
+        self._last_check    = time.monotonic()
+
+        return changed_paths
+
+
+    def acknowledge(self) -> None:
+        """
+        Records the files found by the last check, once their changes are applied (they are not returned by the next checks anymore).
+        """
+        if self._checked_files is not None:
+            self._files         = self._checked_files
+            self._checked_files = None
+
+
+# Watcher of the charts and cards configuration files, and the current charts configuration (loaded on first use) :
+CONFIGURATION_WATCHER = ConfigurationWatcher(GRAPHS_JSON_PATH)
+
+_CHARTS_CONFIGURATION: Optional[ChartsConfiguration] = None
+_CHARTS_CONFIGURATION_LOCK = Lock()
+
+
+def _apply_configuration_changes(changed_paths: List[Path]) -> None:
+    """
+    Takes changed configuration files into account, invalidating only the caches depending on them (the computed scenarios are kept).
+
+    #### Arguments :
+    - `changed_paths (List[Path])` : The changed files (see `ConfigurationWatcher.check`).
+    """
+    global _CHARTS_CONFIGURATION
+
+    changed_paths = {path.resolve() for path in changed_paths}
+    LOGGER.info("Configuration files changed: %s.", ", ".join(sorted(str(path) for path in changed_paths)))
+
+    # The cards : the open sessions select the cards by their position in the cards file, so only the changes keeping the same cards are applied.
+    if Path(CARDS_JSON_PATH).resolve() in changed_paths:
+        if load_cards_registry().ids != get_cards_registry().ids:
+            LOGGER.warning("Cards added, removed or reordered in %s: the change requires a restart of the server.", CARDS_JSON_PATH)
+        else:
+            get_cards_registry.cache_clear()
+
+    # The parameters of the cards : the scenarios are stored by the fingerprint of their parameters, so they stay valid.
+    if changed_paths & {Path(CARDS_JSON_PATH).resolve(), Path(CARDS_PARAMETERS_JSON_PATH).resolve()}:
+        clear_scenario_parameters_cache()
+
+    # The formulas of the charts : only the stored scenarios missing a variable now used by the charts are computed again.
+    if changed_paths & {Path(path).resolve() for path in CHARTS_DEFINITIONS_PATHS}:
+        _CHARTS_CONFIGURATION = ChartsConfiguration(_CHARTS_CONFIGURATION.version + 1)
+
+        number_of_evicted_scenarios = SCENARIO_STORE.evict(
+            lambda scenario_result: not scenario_result.has_variables(_CHARTS_CONFIGURATION.variables)
+        )
+        LOGGER.info("Charts configuration reloaded (version %d), %d stored scenarios evicted.", _CHARTS_CONFIGURATION.version, number_of_evicted_scenarios)
+
+    # The precomputed scenarios file is checked against the new definitions on next use :
+    unload_scenario_lattice()
+
+
+def get_charts_configuration() -> ChartsConfiguration:
+    """
+    Get the current charts configuration, reloading it first if its definitions files changed (see `CONFIGURATION_WATCHER_INTERVAL`).
+
+    An invalid configuration file is logged and ignored : the previous configuration is kept until the file is fixed (the changes are applied again on each check until then).
+
+    #### Returns :
+    - `ChartsConfiguration` : The current charts configuration.
+    """
+    global _CHARTS_CONFIGURATION
+
+    with _CHARTS_CONFIGURATION_LOCK:
+        if _CHARTS_CONFIGURATION is None:
+            _CHARTS_CONFIGURATION = ChartsConfiguration()
+
+        changed_paths = CONFIGURATION_WATCHER.check()
+        if changed_paths:
+            try:
+                _apply_configuration_changes(changed_paths)
+            except Exception as exception:
+                LOGGER.error("Invalid configuration files, the previous configuration is kept: %s", exception)
+            else:
+                CONFIGURATION_WATCHER.acknowledge()
+
+        return _CHARTS_CONFIGURATION
@@ -0,0 +1,195 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from threading import Lock
+
+from core.aeromaps_utils.process_engine import ProcessEngine, compute_process
+from core.aeromaps_utils.scenario_store import SCENARIO_STORE
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.aeromaps_utils.scenario_parameters import get_scenario_parameters
+from core.aeromaps_utils.scenario_lattice import get_lattice_scenario
+from core.aeromaps_utils.process_pool import AEROMAPS_MAX_PROCESSES, AEROMAPS_PROCESS_POOL
+from core.aeromaps_utils.charts_configuration import get_charts_configuration
+
+
+
+
+# Maximal number of worker processes computing the scenarios in parallel, one per AeroMAPS process of the server (`1` disables the pool) :
+COMPUTE_POOL_MAX_WORKERS = AEROMAPS_MAX_PROCESSES
+
+# Pool of worker processes shared by every session of the server (created on first use) :
+_COMPUTE_POOL: Optional[ProcessPoolExecutor] = None
+_COMPUTE_POOL_LOCK = Lock()
+
+
+def _initialize_worker() -> None:
+    """
+    Creates the AeroMAPS process of a worker process (in the pool of AeroMAPS processes of the worker process).
+    """
+    with AEROMAPS_PROCESS_POOL.borrow():
+        pass
+
+
+def compute_in_worker(parameters: Dict[str, Any], variables: Optional[Dict[str, Tuple[str, ...]]] = None) -> ScenarioResult:
+    """
+    Computes a scenario with an AeroMAPS process of the worker process (its parameters are reset once the scenario is computed).
+
+    #### Arguments :
+    - `parameters (Dict[str, Any])` : The effective parameters of the scenario (see `get_scenario_parameters`).
+    - `variables (Optional[Dict[str, Tuple[str, ...]]])` : The variables kept by the result (the ones of the charts configuration of the server process). Defaults to None (the variables used by the charts definitions files).
+
+    #### Returns :
+    - `ScenarioResult` : The compact computed data from the AeroMAPS process (projected in the worker process, so only the variables used by the charts are sent back to the server process).
+    """
+    with AEROMAPS_PROCESS_POOL.borrow() as process:
+        return ScenarioResult(compute_process(process, parameters), variables)
+
+
+def get_compute_pool(max_workers: int = COMPUTE_POOL_MAX_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Returns the pool of worker processes shared by every session of the server, creating it on first use.
+
+    #### Arguments :
+    - `max_workers (int)` : The maximal number of worker processes. Defaults to `COMPUTE_POOL_MAX_WORKERS`.
+
+    #### Returns :
+    - `Optional[ProcessPoolExecutor]` : The pool of worker processes, or None if the pool is disabled (`max_workers <= 1`).
+    """
+    global _COMPUTE_POOL
+
+    if max_workers <= 1:
+        return None
+
+    with _COMPUTE_POOL_LOCK:
+        if _COMPUTE_POOL is None:
+            _COMPUTE_POOL = ProcessPoolExecutor(
+                max_workers = max_workers,
+                mp_context = get_context("spawn"), # Forking the (multi-threaded) Panel server is unsafe.
+                initializer = _initialize_worker
+            )
+
+        return _COMPUTE_POOL
+
+
+def compute_scenarios(
+        process_engines: List[ProcessEngine],
+        cards_ids_lists: List[Optional[List[str]]],
+        max_workers: int = COMPUTE_POOL_MAX_WORKERS
+    ) -> List[ScenarioResult]:
+    """
+    Computes the scenarios of several process engines at once.
+
+    The distinct scenarios (by effective parameters) which are neither stored nor precomputed are dispatched to the pool of worker processes, and the function returns once all of them are computed.
+    If the pool is disabled, each process engine computes its own scenario.
+
+    #### Arguments :
+    - `process_engines (List[ProcessEngine])` : The process engines (one per group).
+    - `cards_ids_lists (List[Optional[List[str]]])` : The list of cards identifiers chosen by each group (in the same order as the process engines).
+    - `max_workers (int)` : The maximal number of worker processes. Defaults to `COMPUTE_POOL_MAX_WORKERS`.
+
+    #### Returns :
+    - `List[ScenarioResult]` : The read-only computed data of each group, in the same order as the process engines (groups sharing the same scenario share the same result).
+    """
+    if len(process_engines) != len(cards_ids_lists):
+        raise ValueError("The number of process engines and the number of cards lists should be the same.")
+
+    compute_pool = get_compute_pool(max_workers)
+    if compute_pool is None:
+        return [
+            process_engine.compute(cards_ids)
+            for process_engine, cards_ids in zip(process_engines, cards_ids_lists)
+        ]
+
+    # Deduplicate the scenarios (groups choosing cards leading to the same effective parameters share the same scenario) :
+    variables = get_charts_configuration().variables
+    is_valid  = lambda scenario_result: scenario_result.has_variables(variables) # A result kept by a previous charts configuration may miss a variable.
+    scenarios_parameters = [get_scenario_parameters(cards_ids) for cards_ids in cards_ids_lists]
+    distinct_scenarios_parameters = dict(scenarios_parameters)
+    fingerprints = [fingerprint for fingerprint, _ in scenarios_parameters]
+
+    # Dispatch the scenarios which are neither stored nor precomputed to the pool of worker processes :
+    scenarios_data: Dict[str, ScenarioResult] = {}
+    futures: Dict[str, Future] = {}
+    for fingerprint, parameters in distinct_scenarios_parameters.items():
+        if fingerprint in SCENARIO_STORE:
+            continue
+
+        scenario_result = get_lattice_scenario(fingerprint)
+        if scenario_result is not None and is_valid(scenario_result):
+            scenarios_data[fingerprint] = scenario_result
+        else:
+            futures[fingerprint] = compute_pool.submit(compute_in_worker, parameters, variables)
+
+    # Collect all the scenarios through the scenario store (a scenario computed meanwhile by another session is not waited for twice) :
+    for fingerprint, parameters in distinct_scenarios_parameters.items():
+        if fingerprint in futures:
+            compute = futures[fingerprint].result
+        elif fingerprint in scenarios_data:
+            compute = lambda fingerprint = fingerprint: scenarios_data[fingerprint]
+        else:
+            compute = lambda parameters = parameters: compute_pool.submit(compute_in_worker, parameters, variables).result() # Evicted from the store (or outdated) in the meantime.
+
+        scenarios_data[fingerprint] = SCENARIO_STORE.get_or_compute(fingerprint, compute, is_valid)
+
+    return [scenarios_data[fingerprint] for fingerprint in fingerprints]
+
+
+def iter_computed_scenarios(
+        cards_ids_lists: List[Optional[List[str]]],
+        max_workers: int = COMPUTE_POOL_MAX_WORKERS
+    ) -> Iterator[Tuple[List[int], str, ScenarioResult]]:
+    """
+    Computes the distinct scenarios of several cards selections, yielding each scenario as soon as it is computed (headless use, see `batch.py`).
+
+    The stored and precomputed scenarios are yielded first, then the other ones in their order of completion in the pool of worker processes.
+    The results are not kept in the scenario store, so that computing many scenarios does not evict the ones of the interface.
+    If the pool is disabled, the scenarios are computed one after the other in the current process.
+
+    #### Arguments :
+    - `cards_ids_lists (List[Optional[List[str]]])` : The list of cards identifiers of each selection.
+    - `max_workers (int)` : The maximal number of worker processes. Defaults to `COMPUTE_POOL_MAX_WORKERS`.
+
+    #### Returns :
+    - `Iterator[Tuple[List[int], str, ScenarioResult]]` : For each distinct scenario, the indices of the selections leading to it, its fingerprint and its read-only computed data.
+    """
+    variables = get_charts_configuration().variables
+
+    # Deduplicate the scenarios (selections leading to the same effective parameters share the same scenario) :
+    selections_indices: Dict[str, List[int]] = {}
+    distinct_scenarios_parameters: Dict[str, Dict[str, Any]] = {}
+    for index, cards_ids in enumerate(cards_ids_lists):
+        fingerprint, parameters = get_scenario_parameters(cards_ids)
+        selections_indices.setdefault(fingerprint, []).append(index)
+        distinct_scenarios_parameters.setdefault(fingerprint, parameters)
+
+    # Yield the scenarios already stored or precomputed :
+    missing_scenarios_parameters: Dict[str, Dict[str, Any]] = {}
+    for fingerprint, parameters in distinct_scenarios_parameters.items():
+        scenario_result = SCENARIO_STORE.get(fingerprint)
+        if scenario_result is None:
+            scenario_result = get_lattice_scenario(fingerprint)
+
+        if scenario_result is not None and scenario_result.has_variables(variables):
+            yield selections_indices[fingerprint], fingerprint, scenario_result
+        else:
+            missing_scenarios_parameters[fingerprint] = parameters
+
+    compute_pool = get_compute_pool(max_workers)
+    if compute_pool is None:
+        for fingerprint, parameters in missing_scenarios_parameters.items():
+            yield selections_indices[fingerprint], fingerprint, compute_in_worker(parameters, variables)
+        return
+
+    # Dispatch the other scenarios to the pool of worker processes, and yield them in their order of completion :
+    futures: Dict[Future, str] = {
+        compute_pool.submit(compute_in_worker, parameters, variables): fingerprint
+        for fingerprint, parameters in missing_scenarios_parameters.items()
+    }
+    try:
+        for future in as_completed(futures):
+            fingerprint = futures.pop(future) # Release the result once yielded.
+            yield selections_indices[fingerprint], fingerprint, future.result()
+    finally:
+        for future in futures: # The iteration was stopped early (or a scenario failed) : the pending scenarios are not computed.
+            future.cancel()
@@ -1,10 +1,17 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
+import ast
 import builtins
+import operator
 
-from pandas import DataFrame, Series
+from functools import lru_cache
 
-from core.aeromaps_utils.extract_processed_data import get_years, get_dataframe_vector_outputs, get_dataframe_climate_outputs
+import numpy as np
+
+from pandas import Index, Series
+
+from core.aeromaps_utils.formula_variables import FLOAT_VARIABLES_TYPES, VECTOR_VARIABLES_TYPES, group_variables_by_type
+from core.aeromaps_utils.scenario_result import ScenarioBatch, ScenarioResult
 
 
 
@@ -16,94 +23,291 @@ ALLOWED_YEAR_RANGES = [
     2050                 # The last studied year.
 ]
 
+# Operators allowed in the formulas :
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
 
-def evaluate_expression_aeromaps(
-        process_data: Dict[str, Any],
-        equation: str,
-        year_range: Optional[str | int] = None
-    ) -> Series | float:
+
+def _maximum(a: Series | np.ndarray | float, b: Series | np.ndarray | float) -> Series | np.ndarray | float:
     """
-    Takes a formatted equation (using AeroMAPS variables) and returns the calculated Pandas Series using the Ptython `eval` function.
-    The equation is formatted the same way as Python expressions. Ony the AeroMAPS expressions are written differently (using the format `variable_type(variable_name)` where `variable_type` is either `vector_outputs` or `climate_outputs`).
+    Max function, accepting two parameters and adapted to the series and arrays.
+    """
+    if isinstance(a, (Series, np.ndarray)) or isinstance(b, (Series, np.ndarray)):
+        return np.maximum(a, b)
+    return builtins.max(a, b)
 
-    If the expression is invalid (operators back to back, inexistant AeroMaps variable, ext...), this function will raise an error.
+
+def _minimum(a: Series | np.ndarray | float, b: Series | np.ndarray | float) -> Series | np.ndarray | float:
+    """
+    Min function, accepting two parameters and adapted to the series and arrays.
+    """
+    if isinstance(a, (Series, np.ndarray)) or isinstance(b, (Series, np.ndarray)):
+        return np.minimum(a, b)
+    return builtins.min(a, b)
+
+
+# Functions allowed in the formulas (besides the AeroMAPS variables) :
+FUNCTIONS = {
+    "max": _maximum,
+    "min": _minimum
+}
+
+# A compiled node of a formula, evaluated from the scenario result (or batch of scenario results) and the selected years :
+Evaluator = Callable[[ScenarioResult | ScenarioBatch, Optional[int | Sequence[int]]], Series | np.ndarray | float]
+
+
+class CompiledFormula:
+    """
+    Formula using AeroMAPS variables, parsed and validated once, and evaluated on any number of scenario results.
+
+    The formula is written the same way as a Python expression, the AeroMAPS variables being written with the format `variable_type(variable_name)`
+    where `variable_type` is either `float_inputs`, `float_outputs`, `vector_outputs` or `climate_outputs`.
+    Only numbers, the `+`, `-`, `*`, `/` and `**` operators and the `max` and `min` functions (with two parameters) are allowed : the formula is run by a restricted interpreter, not by `eval`.
 
     #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data, computed from an AeroMAPS process.
-    - `equation (str)` : The equation to calculate.
-    - `year_range (Optional[str | int])` : The series year range, described in the `_ALLOWED_YEAR_RANGES` list. Default to None.
+    - `expression (str)` : The formula to compile.
+    - `year_range (Optional[str | int])` : The year range of the vector variables, described in the `ALLOWED_YEAR_RANGES` list. Defaults to None (the formula can only use float variables).
 
-    #### Returns :
-    - `Series | float` : A pandas Series containing the calculated values for the equation, indexed by the year_range or a float if the equation is a scalar value.
+    #### Attributes :
+    - `dependencies (FrozenSet[Tuple[str, str]])` : The `(variable_type, variable_name)` couples used by the formula.
     """
-    # Check if the year_range is valid and extract the corresponding years :
-    if year_range != None and year_range not in ALLOWED_YEAR_RANGES:
-        raise ValueError(f"Invalid year range: {year_range}. Allowed values are: {ALLOWED_YEAR_RANGES} or None.")
-
-    if year_range != None:
-        if isinstance(year_range, int):
-            selected_year_range = year_range
-        else:
-            selected_year_range = get_years(process_data)[year_range]
-    else:
-        selected_year_range = None
-
-    # If no year_range is provided, check there is no call to the `vector_outputs` or `climate_outputs` functions in the equation :
-    if selected_year_range is None and ("vector_outputs" in equation or "climate_outputs" in equation):
-        raise ValueError("No year range provided, but the equation contains calls to `vector_outputs` or `climate_outputs`. Please provide a valid year range.")
-
-    # Extract the vector and climate outputs dataframes :
-    DF_vector_outputs: DataFrame  = get_dataframe_vector_outputs(process_data)
-    DF_climate_outputs: DataFrame = get_dataframe_climate_outputs(process_data)
-
-    # Create wrappers to access the AeroMAPS inputs and outputs :
-    def float_inputs(variable_name: str) -> float:
+    __slots__ = ("expression", "year_range", "dependencies", "_evaluator", "_uses_vectors")
+
+    def __init__(
+            self,
+            expression: str,
+            year_range: Optional[str | int] = None
+        ) -> None:
+        # Check if the year_range is valid :
+        if year_range is not None and year_range not in ALLOWED_YEAR_RANGES:
+            raise ValueError(f"Invalid year range: {year_range}. Allowed values are: {ALLOWED_YEAR_RANGES} or None.")
+
+        self.expression = expression
+        self.year_range = year_range
+
+        try:
+            tree = ast.parse(expression, mode = "eval")
+        except SyntaxError as exception:
+            raise ValueError(f"Invalid expression '{expression}': {exception}")
+
+        dependencies = set()
+        self._evaluator: Evaluator = self._compile_node(tree.body, dependencies)
+        self.dependencies: FrozenSet[Tuple[str, str]] = frozenset(dependencies)
+
+        # A formula without vector variables evaluates to a float, whatever its year range :
+        self._uses_vectors = any(variable_type in VECTOR_VARIABLES_TYPES for variable_type, _ in self.dependencies)
+
+        # If no year_range is provided, check there is no call to the `vector_outputs` or `climate_outputs` functions in the expression :
+        if year_range is None and self._uses_vectors:
+            raise ValueError(f"No year range provided, but the expression '{expression}' contains calls to `vector_outputs` or `climate_outputs`. Please provide a valid year range.")
+
+
+    @classmethod
+    def from_definition(
+            cls,
+            formula: Dict[str, Any],
+            year_range: Optional[str | int] = None
+        ) -> "CompiledFormula":
         """
-        Wrapper to access the float inputs from the process data.
+        Compiles a formula from its JSON definition.
+
+        #### Arguments :
+        - `formula (Dict[str, Any])` : The formula definition, containing an `expression` key and an optional `year_range` key.
+        - `year_range (Optional[str | int])` : The year range overriding the one of the definition. Defaults to None (the year range of the definition).
+
+        #### Returns :
+        - `CompiledFormula` : The compiled formula.
         """
-        if variable_name not in process_data["float_inputs"]:
-            raise ValueError(f"Variable '{variable_name}' not found in float inputs.")
-        return float(process_data["float_inputs"][variable_name])
+        return cls(formula["expression"], year_range if year_range is not None else formula.get("year_range"))
+
 
-    def float_outputs(variable_name: str) -> float:
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.expression!r}, {self.year_range!r})"
+
+
+    def evaluate(self, process_data: ScenarioResult | Dict[str, Any]) -> Series | float:
         """
-        Wrapper to access the float outputs from the process data.
+        Evaluates the formula on a scenario.
+
+        #### Arguments :
+        - `process_data (ScenarioResult | Dict[str, Any])` : The process data, computed from an AeroMAPS process (either a `ScenarioResult` or the raw process data).
+
+        #### Returns :
+        - `Series | float` : A pandas Series containing the calculated values for the formula, indexed by the year range or a float if the formula is a scalar value.
         """
-        if variable_name not in process_data["float_outputs"]:
-            raise ValueError(f"Variable '{variable_name}' not found in float outputs.")
-        return float(process_data["float_outputs"][variable_name])
+        # Project the raw process data on the variables of the formula :
+        if not isinstance(process_data, ScenarioResult):
+            process_data = ScenarioResult(process_data, group_variables_by_type(self.dependencies))
+
+        try:
+            if isinstance(self.year_range, str):
+                selected_year_range = process_data.years[self.year_range]
+            else:
+                selected_year_range = self.year_range
+
+            return self._evaluator(process_data, selected_year_range)
+        except Exception as exception:
+            raise ValueError(f"Error evaluating expression '{self.expression}': {exception}")
 
-    def vector_outputs(variable_name: str) -> Series:
+
+    def evaluate_batch(self, processes_data: ScenarioBatch | Sequence[ScenarioResult]) -> List[Series | float]:
         """
-        Wrapper to access the vector outputs DataFrame.
+        Evaluates the formula on several scenarios at once.
+
+        The variables of all the scenarios are stacked into 2-D arrays (scenarios × years), so the formula is evaluated only once with vectorized operations, whatever the number of scenarios.
+
+        #### Arguments :
+        - `processes_data (ScenarioBatch | Sequence[ScenarioResult])` : The batch of scenario results (prefer building one `ScenarioBatch` to evaluate several formulas, so the stacked variables are shared).
+
+        #### Returns :
+        - `List[Series | float]` : The calculated values for each scenario (in the same order as the scenarios), as in `evaluate`.
         """
-        if variable_name not in DF_vector_outputs.columns:
-            raise ValueError(f"Variable '{variable_name}' not found in vector outputs.")
-        return DF_vector_outputs.loc[selected_year_range, variable_name].astype(float)
+        batch = processes_data if isinstance(processes_data, ScenarioBatch) else ScenarioBatch(processes_data)
+        returns_series = isinstance(self.year_range, str) and self._uses_vectors
+
+        try:
+            if isinstance(self.year_range, str):
+                selected_year_range = batch.years[self.year_range]
+            else:
+                selected_year_range = self.year_range
+            number_of_columns = len(selected_year_range) if returns_series else 1
+
+            values = np.broadcast_to(self._evaluator(batch, selected_year_range), (len(batch), number_of_columns)) # Constant formulas are broadcasted to all the scenarios.
+        except Exception as exception:
+            raise ValueError(f"Error evaluating expression '{self.expression}': {exception}")
+
+        if returns_series:
+            index = Index(selected_year_range) # Shared by the Series of all the scenarios.
+            return [Series(row, index = index, copy = False) for row in values]
+
+        return [float(row[0]) for row in values]
+
 
-    def climate_outputs(variable_name: str) -> Series:
+    def _compile_node(self, node: ast.AST, dependencies: set) -> Evaluator:
         """
-        Wrapper to access the climate outputs DataFrame.
+        Compiles a node of the formula syntax tree into an evaluator, and records the AeroMAPS variables it uses.
+
+        #### Arguments :
+        - `node (ast.AST)` : The node to compile.
+        - `dependencies (set)` : The set of the `(variable_type, variable_name)` couples, completed with the variables used by the node.
+
+        #### Returns :
+        - `Evaluator` : The function evaluating the node from the scenario result and the selected years.
         """
-        if variable_name not in DF_climate_outputs.columns:
-            raise ValueError(f"Variable '{variable_name}' not found in climate outputs.")
-        return DF_climate_outputs.loc[selected_year_range, variable_name].astype(float)
-
-    # Create a safe restrained environment for eval :
-    safe_globals = {"__builtins__": None}
-    safe_locals = {
-        "max": lambda a, b: a.combine(b, builtins.max) if hasattr(a, "combine") or hasattr(b, "combine") else builtins.max(a, b), # Max function, accepting two parameters and adapted to the series.
-        "min": lambda a, b: a.combine(b, builtins.min) if hasattr(a, "combine") or hasattr(b, "combine") else builtins.min(a, b), # Min function, accepting two parameters and adapted to the series.
-        "float_inputs": float_inputs,
-        "float_outputs": float_outputs,
-        "vector_outputs": vector_outputs,
-        "climate_outputs": climate_outputs
-    }
-
-    # Evaluate the expression in a safe environment :
-    try:
-        result = eval(equation, safe_globals, safe_locals)
-    except Exception as exception:
-        raise ValueError(f"Error evaluating expression '{equation}': {exception}")
-
-    return result
+        # Numbers :
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = node.value
+            return lambda process_data, years: value
+
+        # Operators :
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            binary_operator = BINARY_OPERATORS[type(node.op)]
+            left  = self._compile_node(node.left, dependencies)
+            right = self._compile_node(node.right, dependencies)
+            return lambda process_data, years: binary_operator(left(process_data, years), right(process_data, years))
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            unary_operator = UNARY_OPERATORS[type(node.op)]
+            operand = self._compile_node(node.operand, dependencies)
+            return lambda process_data, years: unary_operator(operand(process_data, years))
+
+        # Functions and AeroMAPS variables :
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            function_name = node.func.id
+
+            if function_name in FLOAT_VARIABLES_TYPES + VECTOR_VARIABLES_TYPES:
+                if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+                    raise ValueError(f"Invalid expression '{self.expression}': `{function_name}` expects a single variable name.")
+
+                variable_name = node.args[0].value
+                dependencies.add((function_name, variable_name))
+
+                if function_name in FLOAT_VARIABLES_TYPES:
+                    return lambda process_data, years: process_data.get_float(function_name, variable_name)
+                return lambda process_data, years: process_data.get_vector(function_name, variable_name, years)
+
+            if function_name in FUNCTIONS:
+                if len(node.args) != 2:
+                    raise ValueError(f"Invalid expression '{self.expression}': `{function_name}` expects two parameters.")
+
+                function = FUNCTIONS[function_name]
+                first  = self._compile_node(node.args[0], dependencies)
+                second = self._compile_node(node.args[1], dependencies)
+                return lambda process_data, years: function(first(process_data, years), second(process_data, years))
+
+            raise ValueError(f"Invalid expression '{self.expression}': unknown function `{function_name}`.")
+
+        raise ValueError(f"Invalid expression '{self.expression}': `{ast.unparse(node)}` is not allowed.")
+
+
+def evaluate_formulas_batch(
+        formulas: Sequence[CompiledFormula],
+        processes_data: Sequence[ScenarioResult]
+    ) -> List[List[Series | float]]:
+    """
+    Evaluates several formulas on several scenarios at once (each formula is evaluated once for all the scenarios, see `CompiledFormula.evaluate_batch`).
+
+    #### Arguments :
+    - `formulas (Sequence[CompiledFormula])` : The compiled formulas.
+    - `processes_data (Sequence[ScenarioResult])` : The scenario results.
+
+    #### Returns :
+    - `List[List[Series | float]]` : For each scenario (in the same order as the scenarios), the calculated values of each formula (in the same order as the formulas).
+    """
+    if not processes_data:
+        return []
+
+    batch = ScenarioBatch(processes_data)
+    formulas_values = [formula.evaluate_batch(batch) for formula in formulas]
+
+    return [list(scenario_values) for scenario_values in zip(*formulas_values)] if formulas_values else [[] for _ in processes_data]
+
+
+@lru_cache(maxsize = 256)
+def compile_formula(
+        expression: str,
+        year_range: Optional[str | int] = None
+    ) -> CompiledFormula:
+    """
+    Compiles a formula (cached for each expression and year range).
+
+    #### Arguments :
+    - `expression (str)` : The formula to compile.
+    - `year_range (Optional[str | int])` : The year range of the vector variables, described in the `ALLOWED_YEAR_RANGES` list. Defaults to None.
+
+    #### Returns :
+    - `CompiledFormula` : The compiled formula.
+    """
+    return CompiledFormula(expression, year_range)
+
+
+def evaluate_expression_aeromaps(
+        process_data: ScenarioResult | Dict[str, Any],
+        equation: str,
+        year_range: Optional[str | int] = None
+    ) -> Series | float:
+    """
+    Takes a formatted equation (using AeroMAPS variables) and returns the calculated Pandas Series.
+    The equation is formatted the same way as Python expressions. Ony the AeroMAPS expressions are written differently (using the format `variable_type(variable_name)` where `variable_type` is either `vector_outputs` or `climate_outputs`).
+
+    The equation is compiled once (see `CompiledFormula`) : prefer compiling the formulas at load time and calling `CompiledFormula.evaluate` directly.
+    If the expression is invalid (operators back to back, inexistant AeroMaps variable, ext...), this function will raise an error.
+
+    #### Arguments :
+    - `process_data (ScenarioResult | Dict[str, Any])` : The process data, computed from an AeroMAPS process (either a `ScenarioResult` or the raw process data).
+    - `equation (str)` : The equation to calculate.
+    - `year_range (Optional[str | int])` : The series year range, described in the `ALLOWED_YEAR_RANGES` list. Default to None.
+
+    #### Returns :
+    - `Series | float` : A pandas Series containing the calculated values for the equation, indexed by the year_range or a float if the equation is a scalar value.
+    """
+    return compile_formula(equation, year_range).evaluate(process_data)
@@ -2,15 +2,17 @@ from typing import Any, Dict, List
 
 from pandas import DataFrame
 
+from core.aeromaps_utils.scenario_result import ScenarioResult
 
 
 
-def get_years(process_data: Dict[str, Any]) -> Dict[str, List[int]]:
+
+def get_years(process_data: ScenarioResult | Dict[str, Any]) -> Dict[str, List[int]]:
     """
     Extract the lists of "full_years", "historic_years" and "prospective_years" from the process data (a computed data from an AeroMAPS process).
 
     #### Arguments :
-    - `process_data (Dict[str, Any])` : The process data, computed from an AeroMAPS process, which contains the three lists of years mentioned above.
+    - `process_data (ScenarioResult | Dict[str, Any])` : The process data, computed from an AeroMAPS process, which contains the three lists of years mentioned above.
 
     #### Returns :
     - `Dict[str, List[int]]` : A dictionary containing the three lists of years, with respective keys of "full_years", "historic_years" and "prospective_years".
@@ -18,16 +20,19 @@ def get_years(process_data: Dict[str, Any]) -> Dict[str, List[int]]:
     list_keys = ["full_years", "historic_years", "prospective_years"]
     years_data = {}
 
+    if isinstance(process_data, ScenarioResult):
+        return {key: process_data.get_years(key) for key in list_keys}
+
     for key in list_keys:
         if key not in process_data["years"]:
             raise ValueError(f"Process data does not contain the '{key}' key.")
 
         years = process_data["years"][key]
 
-        if not isinstance(years, list) or not all(isinstance(year, int) for year in years):
+        if not isinstance(years, (list, tuple)) or not all(isinstance(year, int) for year in years):
             raise TypeError(f"'{key}' should be a list of integers. {type(years)}, {type(years[0])} found.")
 
-        years_data[key] = years
+        years_data[key] = list(years)
 
     return years_data
 
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+import ast
+
+from crud.crud_prospective_scenario_aspects import get_aspects
+from crud.crud_multidisciplinary_bars import get_bars
+
+from utils import (
+    PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH,
+    PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH,
+    MULTIDISCIPLINARY_BARS_JSON_PATH
+)
+
+
+
+
+# Types of the AeroMAPS variables which can be used in the formulas (`variable_type(variable_name)`) :
+FLOAT_VARIABLES_TYPES  = ("float_inputs", "float_outputs")
+VECTOR_VARIABLES_TYPES = ("vector_outputs", "climate_outputs")
+VARIABLES_TYPES        = FLOAT_VARIABLES_TYPES + VECTOR_VARIABLES_TYPES
+
+# Files containing the formulas of the charts :
+CHARTS_DEFINITIONS_PATHS = [
+    PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH,
+    PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH,
+    MULTIDISCIPLINARY_BARS_JSON_PATH
+]
+
+
+def get_formula_variables(expression: str) -> Set[Tuple[str, str]]:
+    """
+    Get the AeroMAPS variables used in a formula.
+
+    #### Arguments :
+    - `expression (str)` : The formula, using the AeroMAPS variables with the format `variable_type(variable_name)`.
+
+    #### Returns :
+    - `Set[Tuple[str, str]]` : The set of the `(variable_type, variable_name)` couples used in the formula.
+    """
+    try:
+        tree = ast.parse(expression, mode = "eval")
+    except SyntaxError as exception:
+        raise ValueError(f"Invalid expression '{expression}': {exception}")
+
+    variables = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in VARIABLES_TYPES
+            and len(node.args) == 1 and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)
+        ):
+            variables.add((node.func.id, node.args[0].value))
+
+    return variables
+
+
+def group_variables_by_type(variables: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Group AeroMAPS variables by variable type.
+
+    #### Arguments :
+    - `variables (Iterable[Tuple[str, str]])` : The `(variable_type, variable_name)` couples (see `get_formula_variables`).
+
+    #### Returns :
+    - `Dict[str, Tuple[str, ...]]` : A dictionary where each key is a variable type (see `VARIABLES_TYPES`) and the associated value is the sorted tuple of the names of the variables of this type.
+    """
+    variables = set(variables)
+    return {
+        variable_type: tuple(sorted(name for used_type, name in variables if used_type == variable_type))
+        for variable_type in VARIABLES_TYPES
+    }
+
+
+def get_charts_formulas() -> List[Dict[str, str]]:
+    """
+    Get the formulas of all the charts (prospective scenario lines and areas, multidisciplinary bars).
+
+    #### Returns :
+    - `List[Dict[str, str]]` : The list of the formulas, each one being a dictionary with an `expression` key and an optional `year_range` key.
+    """
+    formulas = [
+        aspect["output_formula"]
+        for path in [PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH, PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH]
+        for aspect in get_aspects(path).values()
+    ]
+    for bar in get_bars().values():
+        formulas.extend([bar["output_formula_BUDGET"], bar["output_formula_CONSUMPTION"]])
+
+    return formulas
+
+
+def get_charts_variables() -> Dict[str, Tuple[str, ...]]:
+    """
+    Get the AeroMAPS variables used by the formulas of all the charts.
+
+    #### Returns :
+    - `Dict[str, Tuple[str, ...]]` : A dictionary where each key is a variable type (see `VARIABLES_TYPES`) and the associated value is the sorted tuple of the names of the variables of this type.
+    """
+    variables = set()
+    for formula in get_charts_formulas():
+        variables |= get_formula_variables(formula["expression"])
+
+    return group_variables_by_type(variables)
@@ -1,27 +1,40 @@
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import copy
+from weakref import WeakSet
 
-from functools import lru_cache
+from core.aeromaps_utils.scenario_store import SCENARIO_STORE
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.aeromaps_utils.scenario_parameters import get_scenario_parameters
+from core.aeromaps_utils.scenario_lattice import get_lattice_scenario
+from core.aeromaps_utils.process_pool import AEROMAPS_PROCESS_POOL
+from core.aeromaps_utils.charts_configuration import get_charts_configuration
+from core.metrics import METRICS, STAGE_DURATION, Gauge
 
-from aeromaps import create_process
-from aeromaps.core.process import AeroMAPSProcess
-from aeromaps.models.parameters import Parameters
+if TYPE_CHECKING: # AeroMAPS is only imported when the first process is created (see `create_process`) :
+    from aeromaps.core.process import AeroMAPSProcess
+    from aeromaps.models.parameters import Parameters
 
-from crud.crud_cards import get_cards_ids
 
 
 
+# Live process engines of the server (one per group of each session) :
+_LIVE_PROCESS_ENGINES: "WeakSet[ProcessEngine]" = WeakSet()
+
+METRICS.register(Gauge(
+    "fresque_process_engines",
+    "Number of live process engines (one per group of each session).",
+    function = lambda: len(_LIVE_PROCESS_ENGINES)
+))
+
 
-@lru_cache(maxsize = None)
 def compute_process(
-        process: AeroMAPSProcess,
-        cards_ids: Optional[List[str]] = None
+        process: "AeroMAPSProcess",
+        parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
     """
-    Initialize the AeroMAPS process with default parameters and compute the results.
+    Set the parameters of the AeroMAPS process and compute the results.
 
-    This function sets the parameters for the AeroMAPS process, including :
+    The parameters are the effective parameters of a scenario (see `get_effective_parameters`), including :
     - Air traffic evolution,
     - Aircraft fleet and operation evolution,
     - Aircraft energy,
@@ -31,131 +44,15 @@ def compute_process(
     - And various environmental settings.
 
     #### Arguments :
-    - `cards_ids (list[str], optional)` : List of cards ids to apply to the process. Defaults to None (no cards are applied <=> reference scenario).
+    - `process (AeroMAPSProcess)` : The AeroMAPS process, with its parameters reset to their baseline values (see `AeroMAPSProcessPool`).
+    - `parameters (Dict[str, Any])` : A dictionary where each key is an AeroMAPS parameter name and the associated value is its value in the scenario.
 
     #### Returns :
     - `dict [str, Any]` : The computed data from the AeroMAPS process.
     """
-    # Check if all the cards_ids are valid :
-    if cards_ids and not all(card_id in get_cards_ids() for card_id in cards_ids):
-        raise ValueError("Invalid card IDs provided. Please check the available cards.")
-
-    # Initialize the AeroMAPS process :
-    parameters: Parameters = process.parameters
-
-    # Air traffic evolution :
-        # Growth rate by category :
-    parameters.cagr_passenger_short_range_reference_periods        = [2020, 2030, 2040, 2050]
-    parameters.cagr_passenger_short_range_reference_periods_values = [3.0, 3.0, 3.0]
-
-    # Aircraft fleet and operation evolution - Aircraft efficiency using the top-down approach :
-    parameters.fleet_renewal_duration = 20.0
-        # Drop-in aircraft :
-    parameters.energy_per_ask_short_range_dropin_fuel_gain_reference_years_values  = [0.5]
-    parameters.energy_per_ask_medium_range_dropin_fuel_gain_reference_years_values = [0.5]
-    parameters.energy_per_ask_long_range_dropin_fuel_gain_reference_years_values   = [0.5]
-
-    # Aircraft fleet and operation evolution - Operations :
-        # Values for setting the logistic function :
-    parameters.operations_final_gain = 5.0
-    parameters.operations_start_year = 2025
-    parameters.operations_duration   = 25.0
-
-    # Aircraft energy - Introduction of alternative drop-in fuels :
-        # Share of alternative fuels in the drop-in fuel mix (the rest being supplemented by kerosene) :
-    parameters.biofuel_share_reference_years            = [2020, 2030, 2040, 2050]
-    parameters.biofuel_share_reference_years_values     = [0.0, 0.0, 0.0, 0.0]
-    parameters.electrofuel_share_reference_years        = [2020, 2030, 2040, 2050]
-    parameters.electrofuel_share_reference_years_values = [0.0, 0.0, 0.0, 0.0]
-
-    # Carbon offset :
-    parameters.carbon_offset_baseline_level_vs_2019_reference_periods        = [2020, 2024, 2050]
-    parameters.carbon_offset_baseline_level_vs_2019_reference_periods_values = [500.0, 500.0]
-    parameters.residual_carbon_offset_share_reference_years                  = [2020, 2030, 2040, 2050]
-    parameters.residual_carbon_offset_share_reference_years_values           = [0.0, 0.0, 0.0, 0.0]
-
-    # Environmental limits :
-        # Carbon budgets and Carbon Dioxide Removal :
-    parameters.net_carbon_budget           = 850.0
-    parameters.carbon_dioxyde_removal_2100 = 280.0
-        # Available energy resources in 2050 :
-    parameters.available_electricity = 250.0
-
-    # Allocation settings :
-        # Aviation share of the global energy resources (biomass and electricity) :
-    parameters.aviation_biomass_allocated_share     = 5.0
-    parameters.aviation_electricity_allocated_share = 5.0
-
-    # Various environmental settings :
-        # Share of biofuel production pathways (the rest being completed by AtJ processes) :
-    parameters.biofuel_hefa_fog_share_reference_years           = [2020, 2030, 2040, 2050]
-    parameters.biofuel_hefa_fog_share_reference_years_values    = [100, 100, 0.7, 0.7]
-    parameters.biofuel_hefa_others_share_reference_years        = [2020, 2030, 2040, 2050]
-    parameters.biofuel_hefa_others_share_reference_years_values = [0.0, 0.0, 3.8, 3.8]
-    parameters.biofuel_ft_others_share_reference_years          = [2020, 2030, 2040, 2050]
-    parameters.biofuel_ft_others_share_reference_years_values   = [0.0, 0.0, 76.3, 76.3]
-    parameters.biofuel_ft_msw_share_reference_years             = [2020, 2030, 2040, 2050]
-    parameters.biofuel_ft_msw_share_reference_years_values      = [0.0, 0.0, 7.4, 7.4]
-        # Emission factors for electricity (2019 value: 429 gCO₂/kWh) :
-    parameters.electricity_emission_factor_reference_years        = [2020, 2030, 2040, 2050]
-    parameters.electricity_emission_factor_reference_years_values = [429.0, 200.0, 100.0, 30.0]
-        # Share of hydrogen production pathways (the rest being completed by production via coal without CCS, distribution in 2019: Gas without CCS (71%), Coal without CCS (27%), Electrolysis (2%), Others with CCS (0%), Co-products not taken into account) :
-    parameters.hydrogen_electrolysis_share_reference_years        = [2020, 2030, 2040, 2050]
-    parameters.hydrogen_electrolysis_share_reference_years_values = [2, 100, 100, 100]
-    parameters.hydrogen_gas_ccs_share_reference_years             = [2020, 2030, 2040, 2050]
-    parameters.hydrogen_gas_ccs_share_reference_years_values      = [0, 0, 0, 0]
-    parameters.hydrogen_coal_ccs_share_reference_years            = [2020, 2030, 2040, 2050]
-    parameters.hydrogen_coal_ccs_share_reference_years_values     = [0, 0, 0, 0]
-    parameters.hydrogen_gas_share_reference_years                 = [2020, 2030, 2040, 2050]
-    parameters.hydrogen_gas_share_reference_years_values          = [71, 0, 0, 0]
-
-    # Apply cards if provided :
-    if cards_ids:
-        # Sobriété :
-        if "sobriety" in cards_ids:
-            parameters.cagr_passenger_short_range_reference_periods_values  = [1.5, 1.5, 1.5]
-            parameters.cagr_passenger_medium_range_reference_periods_values = [1.5]
-            parameters.cagr_passenger_long_range_reference_periods_values   = [1.5]
-            parameters.cagr_freight_reference_periods_values                = [1.5]
-
-        # Compensation des émissions :
-        if "emmissions_compensation" in cards_ids:
-            parameters.residual_carbon_offset_share_reference_years_values = [0.0, 0.0, 10.0, 10.0]
-
-        # Nouveaux vecteurs énergétiques :
-        if "new_energies" in cards_ids:
-            parameters.biofuel_share_reference_years_values     = [0.0, 4.8, 24.0, 35.0]
-            parameters.electrofuel_share_reference_years_values = [0.0, 1.2, 10.0, 35.0]
-
-        # Report modal :
-        if "modal_shift" in cards_ids:
-            if "sobriety" in cards_ids:
-                parameters.cagr_passenger_short_range_reference_periods_values = [0.0, 0.0, 0.0]
-            else:
-                parameters.cagr_passenger_short_range_reference_periods_values = [1.0, 1.0, 1.0]
-
-        # Efficacité des opérations :
-        if "operations_efficiency" in cards_ids:
-            parameters.load_factor_end_year  = 90.0
-            parameters.operations_final_gain = 10.0
-
-        # Technologie :
-        if "technology" in cards_ids:
-            parameters.energy_per_ask_short_range_dropin_fuel_gain_reference_years_values  = [1.0]
-            parameters.energy_per_ask_medium_range_dropin_fuel_gain_reference_years_values = [1.0]
-            parameters.energy_per_ask_long_range_dropin_fuel_gain_reference_years_values   = [1.0]
-
-        # Budget carbone :
-        if "carbon_budget" in cards_ids:
-            ... # TODO: After implementing this card, remove the "[NI] " tag from the card name in the database and the markdown "explanation file".
-
-        # Réglementations et mesures économiques :
-        if "reglementations_and_economical_measures" in cards_ids:
-            ... # TODO: After implementing this card, remove the "[NI] " tag from the card name in the database and the markdown "explanation file".
-
-        # Sensibiliser & Éduquer :
-        if "awareness_and_education" in cards_ids:
-            ... # TODO: After implementing this card, remove the "[NI] " tag from the card name in the database and the markdown "explanation file".
+    process_parameters: "Parameters" = process.parameters
+    for parameter_name, parameter_value in parameters.items():
+        setattr(process_parameters, parameter_name, parameter_value)
 
     process.compute()
     return process.data
@@ -164,39 +61,77 @@ def compute_process(
 class ProcessEngine:
     """
     Engine for running an AeroMAPS simulation process from a reference scenario and chosen cards.
+
+    Each scenario is identified by the fingerprint of its effective parameters (the baseline parameters merged with the parameters deltas of its cards).
+    The computed scenarios are shared with every other engine of the server through the `SCENARIO_STORE`, and the AeroMAPS processes through the `AEROMAPS_PROCESS_POOL`.
+    When the precomputed scenarios file is up to date, the scenarios are read from it instead of being computed.
     """
     def __init__(self) -> None:
         """
         Initialize the process engine with the given configuration.
+
+        The engine does not own an AeroMAPS process : each live computation is sent to the pool of worker processes, or borrows the AeroMAPS process of the `AEROMAPS_PROCESS_POOL` if this pool is disabled.
         """
-        self.process: AeroMAPSProcess = create_process()
+        _LIVE_PROCESS_ENGINES.add(self)
 
 
-    @lru_cache(maxsize = None)
-    def get_process(self) -> AeroMAPSProcess:
+    def compute(
+            self,
+            cards_ids: Optional[List[int]] = None
+        ) -> ScenarioResult:
         """
-        Get the AeroMAPS process instance.
+        Compute the AeroMAPS process with the given cards (each card affect one or more aspects of the process).
+        If a scenario with the same effective parameters (for instance, the same cards in any order) has already been computed by any engine, the scenario is taken from the `SCENARIO_STORE` instead.
+        Otherwise, it is read from the precomputed scenarios file, or computed live if this file is missing or stale.
+
+        The returned result is shared with the `SCENARIO_STORE` (it is read-only, so it is not copied).
+
+        #### Arguments :
+        - `cards_ids (list[int], optional)` : List of cards IDs to apply to the process. Defaults to None (no cards are applied <=> reference scenario).
 
         #### Returns :
-        - `AeroMAPSProcess` : The AeroMAPS process instance.
+        - `ScenarioResult` : The compact and read-only computed data from the AeroMAPS process.
         """
-        return self.process
+        with STAGE_DURATION.time(stage = "compute"):
+            fingerprint, parameters = get_scenario_parameters(cards_ids)
+            variables = get_charts_configuration().variables
 
+            return SCENARIO_STORE.get_or_compute(
+                fingerprint,
+                lambda: self._compute_scenario(fingerprint, parameters, variables),
+                lambda scenario_result: scenario_result.has_variables(variables) # A result kept by a previous charts configuration may miss a variable.
+            )
 
-    @lru_cache(maxsize = None)
-    def compute(
+
+    def _compute_scenario(
             self,
-            cards_ids: Optional[List[int]] = None
-        ) -> Dict[str, Any]:
+            fingerprint: str,
+            parameters: Dict[str, Any],
+            variables: Optional[Dict[str, Tuple[str, ...]]] = None
+        ) -> ScenarioResult:
         """
-        Compute the AeroMAPS process with the given cards (each card affect one or more aspects of the process).
+        Get a scenario from the precomputed scenarios file, or compute it live with a borrowed AeroMAPS process if it is not available.
 
         #### Arguments :
-        - `cards_ids (list[int], optional)` : List of cards IDs to apply to the process. Defaults to None (no cards are applied <=> reference scenario).
+        - `fingerprint (str)` : The fingerprint of the effective parameters of the scenario (see `get_scenario_parameters`).
+        - `parameters (Dict[str, Any])` : The effective parameters of the scenario.
+        - `variables (Optional[Dict[str, Tuple[str, ...]]])` : The variables kept by the result (see `ChartsConfiguration.variables`). Defaults to None (the variables used by the charts definitions files).
 
         #### Returns :
-        - `dict [str, Any]` : The computed data from the AeroMAPS process.
+        - `ScenarioResult` : The compact and read-only computed data from the AeroMAPS process.
         """
-        process_data = compute_process(self.process, tuple(cards_ids) if cards_ids else None) # Converted to tuple for LRU cache compatibility.
+        scenario_result = get_lattice_scenario(fingerprint)
+        if scenario_result is not None and (variables is None or scenario_result.has_variables(variables)):
+            return scenario_result
+
+        # When the pool of worker processes is enabled, the AeroMAPS processes only live in the worker processes (see `AEROMAPS_MAX_PROCESSES`) :
+        from core.aeromaps_utils.compute_pool import compute_in_worker, get_compute_pool
+
+        compute_pool = get_compute_pool()
+        with STAGE_DURATION.time(stage = "aeromaps_compute"):
+            if compute_pool is not None:
+                return compute_pool.submit(compute_in_worker, parameters, variables).result()
 
-        return copy.deepcopy(process_data)
+            # The computed data is projected into the result (and copied), as the AeroMAPS process overwrites it on its next computation :
+            with AEROMAPS_PROCESS_POOL.borrow() as process:
+                return ScenarioResult(compute_process(process, parameters), variables)
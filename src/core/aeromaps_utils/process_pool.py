@@ -0,0 +1,161 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
+
+import copy
+import os
+
+from contextlib import contextmanager
+from threading import Condition
+
+from core.aeromaps_utils.synthetic_process import SyntheticProcess
+from core.metrics import METRICS, Gauge
+
+if TYPE_CHECKING: # AeroMAPS is only imported when the first process is created (see `create_process`) :
+    from aeromaps.core.process import AeroMAPSProcess
+
+
+
+
+# Maximal number of AeroMAPS processes of the server, in the server process and its worker processes together (configurable from the `.env` file) :
+# - `1` : A single AeroMAPS process, in the server process (the pool of worker processes is disabled, see `compute_pool.py`).
+# - More : One worker process per AeroMAPS process, each with its own AeroMAPS process (the server process does not create any).
+AEROMAPS_MAX_PROCESSES = int(os.getenv("AEROMAPS_MAX_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Maximal number of AeroMAPS processes of each process (the server process when the pool of worker processes is disabled, or each worker process) :
+AEROMAPS_PROCESS_POOL_MAX_SIZE = 1
+
+# Kind of the processes computing the scenarios (configurable from the `.env` file) :
+# - "aeromaps" : Real AeroMAPS processes.
+# - "synthetic" : Synthetic processes, without AeroMAPS (see `SyntheticProcess`), to measure the application alone.
+AEROMAPS_PROCESS_BACKENDS = ("aeromaps", "synthetic")
+AEROMAPS_PROCESS_BACKEND  = os.getenv("AEROMAPS_PROCESS_BACKEND", "aeromaps")
+
+
+def create_process(backend: str = AEROMAPS_PROCESS_BACKEND) -> "AeroMAPSProcess":
+    """
+    Creates a process computing the scenarios.
+
+    #### Arguments :
+    - `backend (str)` : The kind of process (see `AEROMAPS_PROCESS_BACKENDS`). Defaults to `AEROMAPS_PROCESS_BACKEND`.
+
+    #### Returns :
+    - `AeroMAPSProcess` : A new AeroMAPS process, or a `SyntheticProcess` with the same interface.
+    """
+    if backend not in AEROMAPS_PROCESS_BACKENDS:
+        raise ValueError(f"Invalid process backend: {backend}. Allowed values are: {AEROMAPS_PROCESS_BACKENDS}.")
+
+    if backend == "synthetic":
+        return SyntheticProcess()
+
+    from aeromaps import create_process as create_aeromaps_process
+    return create_aeromaps_process()
+
+
+class AeroMAPSProcessPool:
+    """
+    Bounded pool of reusable AeroMAPS processes, shared by every `ProcessEngine` of a process (the server process, or a worker process of the compute pool).
+
+    The processes are created on demand (up to `max_size` processes) and kept for the next borrowers.
+    When a process is given back to the pool, its parameters are reset to their values at the creation of the process, so no parameter leaks from one borrower to the next.
+    If all the processes are borrowed and the pool is full, the borrower waits until a process is given back.
+
+    #### Arguments :
+    - `max_size (int)` : The maximal number of AeroMAPS processes. Defaults to `AEROMAPS_PROCESS_POOL_MAX_SIZE`.
+    """
+    def __init__(self, max_size: int = AEROMAPS_PROCESS_POOL_MAX_SIZE) -> None:
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError(f"Invalid maximal pool size: {max_size}. It should be a positive integer.")
+
+        self.max_size = max_size
+
+        self._size: int = 0 # Number of created processes (borrowed or available).
+        self._available_processes: List[Tuple["AeroMAPSProcess", Dict[str, Any]]] = [] # Available processes, with their baseline parameters.
+        self._condition = Condition()
+
+
+    @contextmanager
+    def borrow(self) -> Iterator["AeroMAPSProcess"]:
+        """
+        Borrow an AeroMAPS process from the pool, for the duration of a `with` block.
+
+        #### Example :
+        >>> with AEROMAPS_PROCESS_POOL.borrow() as process:
+        >>>     process.compute()
+
+        #### Returns :
+        - `Iterator[AeroMAPSProcess]` : The borrowed AeroMAPS process, given back to the pool at the end of the `with` block.
+        """
+        process, baseline_parameters = self._acquire()
+        try:
+            yield process
+        finally:
+            self._release(process, baseline_parameters)
+
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get the statistics of the pool.
+
+        #### Returns :
+        - `Dict[str, int]` : A dictionary containing the number of created processes (`size`), the number of `available` processes and the maximal number of processes (`max_size`).
+        """
+        with self._condition:
+            return {
+                "size": self._size,
+                "available": len(self._available_processes),
+                "max_size": self.max_size
+            }
+
+
+    def _acquire(self) -> Tuple["AeroMAPSProcess", Dict[str, Any]]:
+        with self._condition:
+            # Wait for an available process, or for the permission to create a new one :
+            while not self._available_processes and self._size >= self.max_size:
+                self._condition.wait()
+
+            # Reuse the most recently given back process :
+            if self._available_processes:
+                return self._available_processes.pop()
+
+            self._size += 1
+
+        # Create a new process (outside of the lock, as it is slow) :
+        try:
+            process = create_process()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        return process, copy.deepcopy(vars(process.parameters))
+
+
+    def _release(self, process: "AeroMAPSProcess", baseline_parameters: Dict[str, Any]) -> None:
+        # Reset the process parameters to their baseline values :
+        parameters = vars(process.parameters)
+        parameters.clear()
+        parameters.update(copy.deepcopy(baseline_parameters))
+
+        with self._condition:
+            self._available_processes.append((process, baseline_parameters))
+            self._condition.notify()
+
+
+# Pool of AeroMAPS processes shared by every process engine of the current process :
+AEROMAPS_PROCESS_POOL = AeroMAPSProcessPool()
+
+
+def _get_aeromaps_processes_by_state() -> Dict[Tuple[str, ...], float]:
+    statistics = AEROMAPS_PROCESS_POOL.get_statistics()
+    return {
+        ("available",): statistics["available"],
+        ("borrowed",): statistics["size"] - statistics["available"]
+    }
+
+
+METRICS.register(Gauge(
+    "fresque_aeromaps_processes",
+    "AeroMAPS processes of the pool of the server process, by state (available or borrowed).",
+    ["state"],
+    function = _get_aeromaps_processes_by_state
+))
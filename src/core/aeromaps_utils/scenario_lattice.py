@@ -0,0 +1,282 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import hashlib
+import json
+import logging
+import pickle
+import zlib
+
+from itertools import combinations
+from importlib.metadata import distribution, PackageNotFoundError
+from pathlib import Path
+from threading import Lock
+
+from crud.crud_cards_parameters import get_implemented_cards_ids
+
+from core.aeromaps_utils.scenario_parameters import get_scenario_parameters
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.aeromaps_utils.formula_variables import CHARTS_DEFINITIONS_PATHS
+from core.aeromaps_utils.process_pool import AEROMAPS_PROCESS_BACKEND
+from core.memory_budget import MEMORY_BUDGET
+from core.metrics import CACHE_REQUESTS
+
+from utils import CARDS_JSON_PATH, CARDS_PARAMETERS_JSON_PATH, SCENARIO_LATTICE_PATH
+
+
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Files defining the cards, the parameters they change and the variables kept by the results (any change to these files makes the precomputed scenarios stale) :
+SCENARIO_DEFINITIONS_PATHS = [
+    CARDS_JSON_PATH,
+    CARDS_PARAMETERS_JSON_PATH,
+    *CHARTS_DEFINITIONS_PATHS
+]
+
+# Version of the precomputed scenarios file format :
+SCENARIO_LATTICE_FORMAT_VERSION = 3
+
+# Cache of the loaded precomputed scenarios file (loaded once per server process) :
+_LOADED_SCENARIO_LATTICE: Dict[str, Optional[Dict[str, bytes]]] = {}
+_LOADED_SCENARIO_LATTICE_LOCK = Lock()
+
+
+def get_aeromaps_version() -> str:
+    """
+    Returns the version of the installed AeroMAPS package, with the build it was installed from.
+
+    AeroMAPS is installed from its git repository (see `requirements.txt`), whose version string does not change between commits :
+    the installed commit (recorded by pip for the installations from a repository) is added to the version, or a hash of the installed files if it is not recorded.
+
+    #### Returns :
+    - `str` : The AeroMAPS version and build (for instance `1.2.0+git.<commit>` or `1.2.0+record.<hash>`), "synthetic" if the scenarios are computed by synthetic processes (see `AEROMAPS_PROCESS_BACKEND`), or "unknown" if it cannot be determined.
+    """
+    if AEROMAPS_PROCESS_BACKEND == "synthetic":
+        return "synthetic"
+
+    try:
+        aeromaps_distribution = distribution("aeromaps")
+    except PackageNotFoundError:
+        return "unknown"
+
+    # Installation from a git repository (PEP 610) :
+    direct_url = json.loads(aeromaps_distribution.read_text("direct_url.json") or "{}")
+    commit_id = direct_url.get("vcs_info", {}).get("commit_id")
+    if commit_id:
+        return f"{aeromaps_distribution.version}+git.{commit_id}"
+
+    # Other installations : the installed files and their hashes :
+    record = aeromaps_distribution.read_text("RECORD")
+    if record:
+        return f"{aeromaps_distribution.version}+record.{hashlib.sha256(record.encode('utf-8')).hexdigest()[:16]}"
+
+    return aeromaps_distribution.version
+
+
+def get_definitions_hash() -> str:
+    """
+    Returns a hash of the cards and parameters definitions.
+
+    #### Returns :
+    - `str` : The SHA-256 hexadecimal digest of the files listed in `SCENARIO_DEFINITIONS_PATHS`.
+    """
+    definitions_hash = hashlib.sha256()
+    for definitions_path in SCENARIO_DEFINITIONS_PATHS:
+        definitions_hash.update(Path(definitions_path).read_bytes())
+
+    return definitions_hash.hexdigest()
+
+
+def get_scenario_lattice_tag() -> Dict[str, Any]:
+    """
+    Returns the tag identifying the precomputed scenarios matching the current installation.
+
+    #### Returns :
+    - `Dict[str, Any]` : A dictionary containing the file format version, the AeroMAPS version and build (see `get_aeromaps_version`) and the hash of the cards and parameters definitions.
+    """
+    return {
+        "format_version": SCENARIO_LATTICE_FORMAT_VERSION,
+        "aeromaps_version": get_aeromaps_version(),
+        "definitions_hash": get_definitions_hash()
+    }
+
+
+def iter_cards_combinations() -> Iterator[Tuple[str, ...]]:
+    """
+    Iterates over every combination of the implemented cards, from the reference scenario (no card) to the scenario with all of them.
+
+    #### Returns :
+    - `Iterator[Tuple[str, ...]]` : The sorted identifiers of the cards of each combination.
+    """
+    implemented_cards_ids = sorted(get_implemented_cards_ids())
+    for number_of_cards in range(len(implemented_cards_ids) + 1):
+        yield from combinations(implemented_cards_ids, number_of_cards)
+
+
+def compress_scenario_result(scenario_result: ScenarioResult) -> bytes:
+    """
+    Compresses a scenario result to be written in the precomputed scenarios file (see `write_scenario_lattice`).
+
+    #### Arguments :
+    - `scenario_result (ScenarioResult)` : The scenario result.
+
+    #### Returns :
+    - `bytes` : The pickled and compressed scenario result.
+    """
+    return zlib.compress(pickle.dumps(scenario_result, protocol = pickle.HIGHEST_PROTOCOL))
+
+
+def write_scenario_lattice(scenarios: Dict[str, bytes], path: str = SCENARIO_LATTICE_PATH) -> None:
+    """
+    Writes the precomputed scenarios file, tagged with the current installation (see `get_scenario_lattice_tag`).
+
+    The file may only contain some of the scenarios : the missing ones are computed live.
+
+    #### Arguments :
+    - `scenarios (Dict[str, bytes])` : The compressed scenario results (see `compress_scenario_result`) by fingerprint.
+    - `path (str)` : The path of the precomputed scenarios file. Defaults to `SCENARIO_LATTICE_PATH`.
+    """
+    with open(path, "wb") as file:
+        pickle.dump(
+            {
+                "tag": get_scenario_lattice_tag(),
+                "scenarios": scenarios
+            },
+            file,
+            protocol = pickle.HIGHEST_PROTOCOL
+        )
+
+
+def build_scenario_lattice(path: str = SCENARIO_LATTICE_PATH) -> int:
+    """
+    Computes every combination of the implemented cards and writes the results to the precomputed scenarios file.
+
+    The scenarios are identified by the fingerprint of their effective parameters (see `get_scenario_parameters`), so combinations leading to the same parameters are only computed once.
+    Each scenario is stored as a compact `ScenarioResult`, pickled and compressed separately, so that only the requested scenarios are decompressed at runtime.
+
+    #### Arguments :
+    - `path (str)` : The path of the precomputed scenarios file. Defaults to `SCENARIO_LATTICE_PATH`.
+
+    #### Returns :
+    - `int` : The number of precomputed scenarios.
+    """
+    # Imported here to avoid a circular import (the process engine reads the precomputed scenarios) :
+    from core.aeromaps_utils.process_engine import compute_process
+    from core.aeromaps_utils.process_pool import AEROMAPS_PROCESS_POOL
+
+    scenarios: Dict[str, bytes] = {}
+    for cards_ids in iter_cards_combinations():
+        fingerprint, parameters = get_scenario_parameters(cards_ids)
+        if fingerprint in scenarios:
+            continue
+
+        LOGGER.info("Computing the scenario %d : %s", len(scenarios) + 1, cards_ids or "reference")
+        with AEROMAPS_PROCESS_POOL.borrow() as process: # Each scenario starts from the baseline parameters.
+            scenarios[fingerprint] = compress_scenario_result(ScenarioResult(compute_process(process, parameters)))
+
+    write_scenario_lattice(scenarios, path)
+
+    return len(scenarios)
+
+
+def load_scenario_lattice(path: str = SCENARIO_LATTICE_PATH) -> Optional[Dict[str, bytes]]:
+    """
+    Loads the precomputed scenarios file (only once per server process).
+
+    #### Arguments :
+    - `path (str)` : The path of the precomputed scenarios file. Defaults to `SCENARIO_LATTICE_PATH`.
+
+    #### Returns :
+    - `Optional[Dict[str, bytes]]` : The compressed precomputed scenarios by fingerprint, or None if the file is missing, unreadable or stale.
+    """
+    path = str(path)
+
+    with _LOADED_SCENARIO_LATTICE_LOCK:
+        if path in _LOADED_SCENARIO_LATTICE:
+            return _LOADED_SCENARIO_LATTICE[path]
+
+        scenarios = None
+        try:
+            with open(path, "rb") as file:
+                scenario_lattice = pickle.load(file)
+
+            if scenario_lattice["tag"] == get_scenario_lattice_tag():
+                scenarios = scenario_lattice["scenarios"]
+            else:
+                LOGGER.warning("The precomputed scenarios file '%s' is stale, the scenarios will be computed live.", path)
+        except FileNotFoundError:
+            LOGGER.info("No precomputed scenarios file found at '%s', the scenarios will be computed live.", path)
+        except Exception as exception:
+            LOGGER.warning("Unable to read the precomputed scenarios file '%s' (%s), the scenarios will be computed live.", path, exception)
+
+        _LOADED_SCENARIO_LATTICE[path] = scenarios
+
+        return scenarios
+
+
+def unload_scenario_lattice() -> int:
+    """
+    Forgets the loaded precomputed scenarios files, so they are loaded (and checked against the current definitions) again on next use.
+
+    #### Returns :
+    - `int` : The number of forgotten files.
+    """
+    with _LOADED_SCENARIO_LATTICE_LOCK:
+        number_of_files = len(_LOADED_SCENARIO_LATTICE)
+        _LOADED_SCENARIO_LATTICE.clear()
+
+    return number_of_files
+
+
+def get_scenario_lattice_size() -> int:
+    """
+    Get the memory size of the loaded precomputed scenarios files.
+
+    #### Returns :
+    - `int` : The size of the compressed scenarios, in bytes.
+    """
+    with _LOADED_SCENARIO_LATTICE_LOCK:
+        return sum(
+            len(compressed_scenario)
+            for scenarios in _LOADED_SCENARIO_LATTICE.values() if scenarios is not None
+            for compressed_scenario in scenarios.values()
+        )
+
+
+# The loaded files are forgotten when the memory budget of the server is exceeded :
+MEMORY_BUDGET.register_cache("scenario_lattice", unload_scenario_lattice, get_scenario_lattice_size)
+
+
+def get_lattice_scenario(
+        fingerprint: str,
+        path: str = SCENARIO_LATTICE_PATH
+    ) -> Optional[ScenarioResult]:
+    """
+    Get a scenario from the precomputed scenarios file.
+
+    #### Arguments :
+    - `fingerprint (str)` : The fingerprint of the effective parameters of the scenario (see `get_scenario_parameters`).
+    - `path (str)` : The path of the precomputed scenarios file. Defaults to `SCENARIO_LATTICE_PATH`.
+
+    #### Returns :
+    - `Optional[ScenarioResult]` : The precomputed scenario result, or None if it is not available (the scenario must then be computed live).
+    """
+    scenarios = load_scenario_lattice(path)
+    if scenarios is None:
+        return None
+
+    compressed_process_data = scenarios.get(fingerprint)
+    CACHE_REQUESTS.inc(cache = "scenario_lattice", result = "miss" if compressed_process_data is None else "hit")
+    if compressed_process_data is None:
+        return None
+
+    return pickle.loads(zlib.decompress(compressed_process_data))
+
+
+if __name__ == "__main__":
+    # Build the precomputed scenarios file (`PYTHONPATH=./src python -m core.aeromaps_utils.scenario_lattice`) :
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+
+    number_of_scenarios = build_scenario_lattice()
+    LOGGER.info("%d scenarios written to '%s'.", number_of_scenarios, SCENARIO_LATTICE_PATH)
@@ -0,0 +1,104 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import copy
+import hashlib
+import json
+
+from functools import lru_cache
+
+from crud.crud_cards import get_cards_registry
+from crud.crud_cards_parameters import get_baseline_parameters, get_cards_parameters
+
+from core.aeromaps_utils.scenario_store import get_scenario_key
+
+
+
+
+def get_effective_parameters(cards_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Get the effective AeroMAPS parameters of a scenario, by merging the baseline parameters with the parameters deltas of the chosen cards.
+
+    The cards are applied in the order of the cards parameters file, each card being followed by its combinations with the other chosen cards.
+    The result does not depend on the order of the given cards.
+
+    #### Arguments :
+    - `cards_ids (Optional[Iterable[str]])` : The cards identifiers of the scenario. Defaults to None (no cards are applied <=> reference scenario).
+
+    #### Returns :
+    - `Dict[str, Any]` : A dictionary where each key is an AeroMAPS parameter name and the associated value is its value in the scenario.
+    """
+    scenario_key = get_scenario_key(cards_ids)
+
+    # Check if all the cards_ids are valid :
+    if not get_cards_registry().are_valid_cards_ids(scenario_key):
+        raise ValueError("Invalid card IDs provided. Please check the available cards.")
+
+    # Apply the cards parameters deltas on top of the baseline parameters :
+    effective_parameters = get_baseline_parameters()
+    for card_id, card_parameters in get_cards_parameters().items():
+        if card_id not in scenario_key:
+            continue
+
+        effective_parameters.update(card_parameters["parameters"])
+        for combination in card_parameters["combinations"]:
+            if all(other_card_id in scenario_key for other_card_id in combination["with"]):
+                effective_parameters.update(combination["parameters"])
+
+    return effective_parameters
+
+
+def get_parameters_fingerprint(parameters: Dict[str, Any]) -> str:
+    """
+    Get the fingerprint of a set of AeroMAPS parameters.
+
+    #### Arguments :
+    - `parameters (Dict[str, Any])` : A dictionary where each key is an AeroMAPS parameter name and the associated value is its value.
+
+    #### Returns :
+    - `str` : The SHA-256 hexadecimal digest of the canonical JSON representation of the parameters.
+    """
+    canonical_parameters = json.dumps(parameters, sort_keys = True, separators = (",", ":"))
+    return hashlib.sha256(canonical_parameters.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize = None)
+def _get_scenario_parameters(scenario_key: Tuple[str, ...]) -> Tuple[str, Dict[str, Any]]:
+    effective_parameters = get_effective_parameters(scenario_key)
+    return get_parameters_fingerprint(effective_parameters), effective_parameters
+
+
+def clear_scenario_parameters_cache() -> None:
+    """
+    Clears the cached effective parameters of the scenarios (to take a change of the cards or parameters files into account).
+    """
+    _get_scenario_parameters.cache_clear()
+
+
+def get_scenario_parameters(cards_ids: Optional[Iterable[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Get the fingerprint and the effective AeroMAPS parameters of a scenario (cached for each set of cards).
+
+    Two sets of cards leading to the same effective parameters (for instance, sets differing only by a not implemented card) share the same fingerprint.
+
+    #### Arguments :
+    - `cards_ids (Optional[Iterable[str]])` : The cards identifiers of the scenario. Defaults to None (no cards are applied <=> reference scenario).
+
+    #### Returns :
+    - `str` : The fingerprint of the effective parameters.
+    - `Dict[str, Any]` : A copy of the effective parameters.
+    """
+    fingerprint, effective_parameters = _get_scenario_parameters(get_scenario_key(cards_ids))
+    return fingerprint, copy.deepcopy(effective_parameters)
+
+
+def get_scenario_fingerprint(cards_ids: Optional[Iterable[str]] = None) -> str:
+    """
+    Get the fingerprint of the effective AeroMAPS parameters of a scenario (cached for each set of cards).
+
+    #### Arguments :
+    - `cards_ids (Optional[Iterable[str]])` : The cards identifiers of the scenario. Defaults to None (no cards are applied <=> reference scenario).
+
+    #### Returns :
+    - `str` : The fingerprint of the effective parameters.
+    """
+    return _get_scenario_parameters(get_scenario_key(cards_ids))[0]
@@ -0,0 +1,349 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pandas import DataFrame, Series
+
+from core.aeromaps_utils.formula_variables import FLOAT_VARIABLES_TYPES, VECTOR_VARIABLES_TYPES, get_charts_variables
+
+
+
+
+# Names of the years ranges of the process data :
+YEARS_RANGES = ("full_years", "historic_years", "prospective_years")
+
+
+class VectorTable:
+    """
+    Read-only columnar table of AeroMAPS vector variables (one contiguous row of floats per variable), indexed by year.
+
+    #### Arguments :
+    - `years (Sequence[int])` : The years of the table, in the order of the values.
+    - `names (Sequence[str])` : The names of the variables, in the order of the values.
+    - `values (np.ndarray)` : The values of the variables, of shape `(len(names), len(years))`.
+    """
+    __slots__ = ("years", "names", "values", "_years_positions", "_names_positions", "_ranges_positions")
+
+    def __init__(
+            self,
+            years: Sequence[int],
+            names: Sequence[str],
+            values: np.ndarray
+        ) -> None:
+        self.years: Tuple[int, ...] = tuple(int(year) for year in years)
+        self.names: Tuple[str, ...] = tuple(names)
+        self.values: np.ndarray     = np.ascontiguousarray(values, dtype = np.float64).reshape(len(self.names), len(self.years))
+        self.values.flags.writeable = False
+
+        self._years_positions: Dict[int, int] = {year: position for position, year in enumerate(self.years)}
+        self._names_positions: Dict[str, int] = {name: position for position, name in enumerate(self.names)}
+        self._ranges_positions: Dict[Tuple[int, ...], slice | List[int]] = {} # Positions of the already requested ranges of years.
+
+
+    @classmethod
+    def from_dataframe(cls, dataframe: DataFrame, names: Sequence[str]) -> "VectorTable":
+        """
+        Projects a DataFrame of AeroMAPS vector variables (indexed by year) on the given variables.
+
+        #### Arguments :
+        - `dataframe (DataFrame)` : The DataFrame of the AeroMAPS vector variables.
+        - `names (Sequence[str])` : The names of the variables to keep (the names missing from the DataFrame are ignored).
+
+        #### Returns :
+        - `VectorTable` : The table of the kept variables.
+        """
+        kept_names = [name for name in names if name in dataframe.columns]
+        values = dataframe.loc[:, kept_names].to_numpy(dtype = np.float64).T
+
+        return cls(dataframe.index, kept_names, values)
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names_positions
+
+
+    def __getstate__(self) -> Tuple[Tuple[int, ...], Tuple[str, ...], np.ndarray]:
+        return self.years, self.names, np.array(self.values)
+
+
+    def __setstate__(self, state: Tuple[Tuple[int, ...], Tuple[str, ...], np.ndarray]) -> None:
+        self.__init__(*state)
+
+
+    def get(self, name: str, year_range: int | Sequence[int]) -> Series | float:
+        """
+        Get the values of a variable over a range of years.
+
+        #### Arguments :
+        - `name (str)` : The name of the variable.
+        - `year_range (int | Sequence[int])` : A single year, or the list of years to select.
+
+        #### Returns :
+        - `Series | float` : The value of the variable for a single year, or a read-only Series of its values indexed by the selected years.
+        """
+        if isinstance(year_range, (int, np.integer)):
+            return float(self.get_values(name, year_range)[0])
+
+        return Series(self.get_values(name, year_range), index = list(year_range), name = name, copy = False)
+
+
+    def get_values(self, name: str, year_range: int | Sequence[int]) -> np.ndarray:
+        """
+        Get the raw values of a variable over a range of years.
+
+        #### Arguments :
+        - `name (str)` : The name of the variable.
+        - `year_range (int | Sequence[int])` : A single year, or the list of years to select.
+
+        #### Returns :
+        - `np.ndarray` : The read-only values of the variable for the selected years (a single value for a single year).
+        """
+        row = self.values[self._names_positions[name]]
+
+        if isinstance(year_range, (int, np.integer)):
+            position = self._years_positions[int(year_range)]
+            return row[position:position + 1]
+
+        positions = self._get_range_positions(year_range)
+        if isinstance(positions, slice):
+            return row[positions] # Contiguous years : a view on the table.
+
+        values = row[positions]
+        values.flags.writeable = False
+        return values
+
+
+    def _get_range_positions(self, year_range: Sequence[int]) -> slice | List[int]:
+        year_range = tuple(year_range)
+        if year_range not in self._ranges_positions:
+            positions = [self._years_positions[year] for year in year_range]
+            if positions and positions == list(range(positions[0], positions[0] + len(positions))):
+                positions = slice(positions[0], positions[0] + len(positions))
+
+            self._ranges_positions[year_range] = positions
+
+        return self._ranges_positions[year_range]
+
+
+class ScenarioResult:
+    """
+    Compact and read-only result of a computed AeroMAPS scenario, shared by every `ProcessEngine` and every Panel session without being copied.
+
+    The result only keeps the AeroMAPS variables used by the formulas of the charts (see `get_charts_variables`) :
+    - The float variables (`float_inputs` and `float_outputs`) as floats,
+    - The vector variables (`vector_outputs` and `climate_outputs`) as contiguous float arrays with a precomputed year-to-position index (see `VectorTable`).
+
+    #### Arguments :
+    - `process_data (Mapping[str, Any])` : The computed data from an AeroMAPS process.
+    - `variables (Optional[Mapping[str, Sequence[str]]])` : The names of the variables to keep for each variable type. Defaults to None (the variables used by the charts).
+    """
+    __slots__ = ("years", "float_variables", "vector_tables", "__weakref__") # Weakly referenceable, so data derived from the result can be cached for its lifetime.
+
+    def __init__(
+            self,
+            process_data: Mapping[str, Any],
+            variables: Optional[Mapping[str, Sequence[str]]] = None
+        ) -> None:
+        if variables is None:
+            variables = get_charts_variables()
+
+        self.years: Dict[str, Tuple[int, ...]] = {
+            years_range: tuple(process_data["years"][years_range])
+            for years_range in YEARS_RANGES
+            if years_range in process_data["years"]
+        }
+
+        self.float_variables: Dict[str, Dict[str, float]] = {
+            variable_type: {
+                name: float(process_data[variable_type][name])
+                for name in variables.get(variable_type, ())
+                if name in process_data[variable_type]
+            }
+            for variable_type in FLOAT_VARIABLES_TYPES
+        }
+
+        self.vector_tables: Dict[str, VectorTable] = {
+            variable_type: VectorTable.from_dataframe(process_data[variable_type], variables.get(variable_type, ()))
+            for variable_type in VECTOR_VARIABLES_TYPES
+        }
+
+
+    def __getstate__(self) -> Tuple[Dict[str, Tuple[int, ...]], Dict[str, Dict[str, float]], Dict[str, VectorTable]]:
+        return self.years, self.float_variables, self.vector_tables
+
+
+    def __setstate__(self, state: Tuple[Dict[str, Tuple[int, ...]], Dict[str, Dict[str, float]], Dict[str, VectorTable]]) -> None:
+        self.years, self.float_variables, self.vector_tables = state
+
+
+    def __repr__(self) -> str:
+        variables = {variable_type: list(values) for variable_type, values in self.float_variables.items()}
+        variables.update({variable_type: list(table.names) for variable_type, table in self.vector_tables.items()})
+        return f"ScenarioResult({variables})"
+
+
+    def has_variables(self, variables: Mapping[str, Sequence[str]]) -> bool:
+        """
+        Checks that the result kept all the given variables (for instance, the variables used by the current formulas of the charts).
+
+        #### Arguments :
+        - `variables (Mapping[str, Sequence[str]])` : The names of the variables for each variable type.
+
+        #### Returns :
+        - `bool` : True if all the variables are in the result, False otherwise.
+        """
+        for variable_type, names in variables.items():
+            kept_names = self.vector_tables[variable_type] if variable_type in VECTOR_VARIABLES_TYPES else self.float_variables[variable_type]
+            if not all(name in kept_names for name in names):
+                return False
+
+        return True
+
+
+    def get_years(self, years_range: str) -> List[int]:
+        """
+        Get a range of years of the scenario.
+
+        #### Arguments :
+        - `years_range (str)` : The name of the range of years (see `YEARS_RANGES`).
+
+        #### Returns :
+        - `List[int]` : The years of the range.
+        """
+        if years_range not in self.years:
+            raise ValueError(f"Process data does not contain the '{years_range}' key.")
+
+        return list(self.years[years_range])
+
+
+    def get_float(self, variable_type: str, name: str) -> float:
+        """
+        Get the value of a float variable (`float_inputs` or `float_outputs`).
+
+        #### Arguments :
+        - `variable_type (str)` : The type of the variable (see `FLOAT_VARIABLES_TYPES`).
+        - `name (str)` : The name of the variable.
+
+        #### Returns :
+        - `float` : The value of the variable.
+        """
+        values = self.float_variables[variable_type]
+        if name not in values:
+            raise ValueError(f"Variable '{name}' not found in {variable_type.replace('_', ' ')}.")
+
+        return values[name]
+
+
+    def get_vector(self, variable_type: str, name: str, year_range: int | Sequence[int]) -> Series | float:
+        """
+        Get the values of a vector variable (`vector_outputs` or `climate_outputs`) over a range of years.
+
+        #### Arguments :
+        - `variable_type (str)` : The type of the variable (see `VECTOR_VARIABLES_TYPES`).
+        - `name (str)` : The name of the variable.
+        - `year_range (int | Sequence[int])` : A single year, or the list of years to select.
+
+        #### Returns :
+        - `Series | float` : The value of the variable for a single year, or a read-only Series of its values indexed by the selected years.
+        """
+        return self._get_vector_table(variable_type, name).get(name, year_range)
+
+
+    def get_vector_values(self, variable_type: str, name: str, year_range: int | Sequence[int]) -> np.ndarray:
+        """
+        Get the raw values of a vector variable (`vector_outputs` or `climate_outputs`) over a range of years.
+
+        #### Arguments :
+        - `variable_type (str)` : The type of the variable (see `VECTOR_VARIABLES_TYPES`).
+        - `name (str)` : The name of the variable.
+        - `year_range (int | Sequence[int])` : A single year, or the list of years to select.
+
+        #### Returns :
+        - `np.ndarray` : The read-only values of the variable for the selected years (a single value for a single year).
+        """
+        return self._get_vector_table(variable_type, name).get_values(name, year_range)
+
+
+    def _get_vector_table(self, variable_type: str, name: str) -> VectorTable:
+        table = self.vector_tables[variable_type]
+        if name not in table:
+            raise ValueError(f"Variable '{name}' not found in {variable_type.replace('_', ' ')}.")
+
+        return table
+
+
+    def get_memory_size(self) -> int:
+        """
+        Get the approximate memory size of the values of the scenario.
+
+        #### Returns :
+        - `int` : The size of the float values, in bytes.
+        """
+        number_of_floats = sum(len(values) for values in self.float_variables.values())
+        return 8 * number_of_floats + sum(table.values.nbytes for table in self.vector_tables.values())
+
+
+class ScenarioBatch:
+    """
+    Batch of scenario results, giving access to the AeroMAPS variables of all the scenarios at once (one row per scenario).
+
+    The batch has the same accessors as a `ScenarioResult`, but they return 2-D arrays of shape `(number of scenarios, number of years)`
+    (or `(number of scenarios, 1)` for the float variables and single years), so a formula can be evaluated on all the scenarios with vectorized operations.
+    The stacked variables are cached for the lifetime of the batch.
+
+    #### Arguments :
+    - `results (Sequence[ScenarioResult])` : The scenario results, sharing the same years.
+    """
+    __slots__ = ("results", "years", "_cache")
+
+    def __init__(self, results: Sequence[ScenarioResult]) -> None:
+        if not results:
+            raise ValueError("A scenario batch should contain at least one scenario result.")
+        if any(result.years != results[0].years for result in results[1:]):
+            raise ValueError("The scenario results of a batch should share the same years.")
+
+        self.results: Tuple[ScenarioResult, ...] = tuple(results)
+        self.years: Dict[str, Tuple[int, ...]]   = results[0].years
+
+        self._cache: Dict[Tuple[Any, ...], np.ndarray] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+
+    def get_float(self, variable_type: str, name: str) -> np.ndarray:
+        """
+        Get the values of a float variable (`float_inputs` or `float_outputs`) for all the scenarios.
+
+        #### Arguments :
+        - `variable_type (str)` : The type of the variable (see `FLOAT_VARIABLES_TYPES`).
+        - `name (str)` : The name of the variable.
+
+        #### Returns :
+        - `np.ndarray` : The values of the variable, of shape `(number of scenarios, 1)`.
+        """
+        key = (variable_type, name)
+        if key not in self._cache:
+            self._cache[key] = np.array([[result.get_float(variable_type, name)] for result in self.results])
+
+        return self._cache[key]
+
+
+    def get_vector(self, variable_type: str, name: str, year_range: int | Sequence[int]) -> np.ndarray:
+        """
+        Get the values of a vector variable (`vector_outputs` or `climate_outputs`) for all the scenarios over a range of years.
+
+        #### Arguments :
+        - `variable_type (str)` : The type of the variable (see `VECTOR_VARIABLES_TYPES`).
+        - `name (str)` : The name of the variable.
+        - `year_range (int | Sequence[int])` : A single year, or the list of years to select.
+
+        #### Returns :
+        - `np.ndarray` : The values of the variable, of shape `(number of scenarios, number of selected years)`.
+        """
+        key = (variable_type, name, year_range if isinstance(year_range, int) else tuple(year_range))
+        if key not in self._cache:
+            self._cache[key] = np.stack([result.get_vector_values(variable_type, name, year_range) for result in self.results])
+
+        return self._cache[key]
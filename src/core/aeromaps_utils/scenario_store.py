@@ -0,0 +1,331 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import os
+
+from collections import OrderedDict
+from threading import Event, Lock
+from weakref import WeakValueDictionary
+
+from core.memory_budget import MEMORY_BUDGET
+from core.metrics import METRICS, Counter, Gauge
+
+
+
+
+# Maximal memory size of the scenarios kept by the shared scenario store, in MiB (configurable from the `.env` file) :
+SCENARIO_STORE_MAX_MB = int(os.getenv("SCENARIO_STORE_MAX_MB", "64"))
+
+
+def get_scenario_key(cards_ids: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """
+    Get the canonical key of a scenario from its cards identifiers.
+
+    The key does not depend on the order of the cards or on duplicated cards : two groups choosing the same cards share the same key.
+
+    #### Arguments :
+    - `cards_ids (Optional[Iterable[str]])` : The cards identifiers of the scenario. Defaults to None (no cards are applied <=> reference scenario).
+
+    #### Returns :
+    - `Tuple[str, ...]` : The sorted tuple of the unique cards identifiers (an empty tuple for the reference scenario).
+    """
+    return tuple(sorted(set(cards_ids))) if cards_ids else ()
+
+
+def _get_scenario_size(scenario_result: Any) -> int:
+    return scenario_result.get_memory_size()
+
+
+class ScenarioStore:
+    """
+    Process-wide store of the computed AeroMAPS scenarios, shared by every `ProcessEngine` and every Panel session.
+
+    The store keeps scenarios up to `max_bytes` and evicts the least recently used ones when it is full (the latest stored scenario is always kept).
+    It is thread-safe, and a scenario requested by several callers at the same time is only computed once.
+
+    The scenarios evicted because the store is full or released (see `release`) are still referenced weakly : as long as a session keeps one alive, it is stored again on its next request instead of being computed again.
+
+    #### Arguments :
+    - `max_bytes (int)` : The maximal memory size of the stored scenarios, in bytes. Defaults to `SCENARIO_STORE_MAX_MB` MiB.
+    - `get_size (Callable[[Any], int])` : The function returning the memory size of a scenario, in bytes. Defaults to `ScenarioResult.get_memory_size`.
+
+    #### Attributes :
+    - `size (int)` : The memory size of the stored scenarios, in bytes.
+    - `hits (int)` : The number of requests served from the store.
+    - `misses (int)` : The number of requests that needed a computation.
+    - `evictions (int)` : The number of scenarios evicted from the store.
+    """
+    def __init__(
+            self,
+            max_bytes: int = SCENARIO_STORE_MAX_MB * 1024 * 1024,
+            get_size: Callable[[Any], int] = _get_scenario_size
+        ) -> None:
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError(f"Invalid maximal memory size: {max_bytes}. It should be a positive integer.")
+
+        self.max_bytes = max_bytes
+        self.get_size  = get_size
+
+        self.size: int      = 0
+        self.hits: int      = 0
+        self.misses: int    = 0
+        self.evictions: int = 0
+
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: Dict[Hashable, int]          = {} # Memory size of each stored scenario.
+        self._released: WeakValueDictionary       = WeakValueDictionary() # Scenarios evicted or released while possibly still used elsewhere.
+        self._pending: Dict[Hashable, Event]      = {} # Scenarios currently being computed, with the event set once they are available.
+        self._lock = Lock()
+
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            self._adopt(key)
+            return key in self._entries
+
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a scenario from the store, without computing it.
+
+        #### Arguments :
+        - `key (Hashable)` : The key of the scenario.
+
+        #### Returns :
+        - `Optional[Any]` : The stored scenario, or None if the scenario is not in the store.
+        """
+        with self._lock:
+            self._adopt(key)
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Add (or replace) a scenario in the store, evicting the least recently used scenarios if the store is full.
+
+        #### Arguments :
+        - `key (Hashable)` : The key of the scenario.
+        - `value (Any)` : The scenario to store.
+        """
+        with self._lock:
+            self._put(key, value)
+
+
+    def get_or_compute(
+            self,
+            key: Hashable,
+            compute: Callable[[], Any],
+            is_valid: Optional[Callable[[Any], bool]] = None
+        ) -> Any:
+        """
+        Get a scenario from the store, computing (and storing) it if it is not available yet.
+
+        If the same scenario is already being computed by another caller, this method waits for its result instead of computing it again.
+
+        #### Arguments :
+        - `key (Hashable)` : The key of the scenario.
+        - `compute (Callable[[], Any])` : The function computing the scenario if it is not in the store.
+        - `is_valid (Optional[Callable[[Any], bool]])` : A function checking that a stored scenario is still usable (an invalid scenario is removed and computed again). Defaults to None (every stored scenario is valid).
+
+        #### Returns :
+        - `Any` : The stored or computed scenario.
+        """
+        while True:
+            with self._lock:
+                self._adopt(key)
+
+                # The stored scenario is outdated :
+                if key in self._entries and is_valid is not None and not is_valid(self._entries[key]):
+                    self._remove(key)
+                    self.evictions += 1
+
+                # The scenario is already available :
+                if key in self._entries:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+
+                # The scenario is not being computed, this caller computes it :
+                if key not in self._pending:
+                    self.misses += 1
+                    pending_event = self._pending[key] = Event()
+                    break
+
+                # The scenario is being computed by another caller :
+                other_pending_event = self._pending[key]
+
+            # Wait for the other caller, then look the scenario up again (it is computed again if the other caller failed) :
+            other_pending_event.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                self._put(key, value)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending_event.set()
+
+        return value
+
+
+    def evict(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Remove the scenarios matching a predicate from the store (for instance, the scenarios missing variables needed by the charts).
+
+        #### Arguments :
+        - `predicate (Callable[[Any], bool])` : The function returning True for the scenarios to remove.
+
+        #### Returns :
+        - `int` : The number of removed scenarios.
+        """
+        with self._lock:
+            evicted_keys = [key for key, value in self._entries.items() if predicate(value)]
+            for key in evicted_keys:
+                self._remove(key)
+
+            # The scenarios still used elsewhere are not stored again either :
+            for key, value in list(self._released.items()):
+                if predicate(value):
+                    self._released.pop(key, None)
+
+            self.evictions += len(evicted_keys)
+            return len(evicted_keys)
+
+
+    def release(self) -> int:
+        """
+        Remove all the scenarios from the store, keeping the statistics (for instance, when the memory budget of the server is exceeded).
+
+        The scenarios still used elsewhere (for instance, displayed by a session) stay alive, and are stored again on their next request instead of being computed again.
+
+        #### Returns :
+        - `int` : The number of released scenarios.
+        """
+        with self._lock:
+            released_keys = list(self._entries.keys())
+            for key in released_keys:
+                self._remove(key, keep_reference = True)
+
+            self.evictions += len(released_keys)
+            return len(released_keys)
+
+
+    def clear(self) -> None:
+        """
+        Remove all the scenarios from the store, including the released ones still referenced elsewhere.
+
+        The statistics are kept, since they are exported as monotonic counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._released.clear()
+            self.size = 0
+
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get the statistics of the store.
+
+        #### Returns :
+        - `Dict[str, int]` : A dictionary containing the number of stored scenarios (`entries`), their memory size (`bytes`), the maximal memory size (`max_bytes`) and the number of `hits`, `misses` and `evictions`.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        # Must be called with the lock acquired :
+        if key in self._entries:
+            self._remove(key)
+        self._released.pop(key, None)
+
+        self._entries[key] = value
+        self._sizes[key] = self.get_size(value)
+        self.size += self._sizes[key]
+
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)), keep_reference = True)
+            self.evictions += 1
+
+
+    def _remove(self, key: Hashable, keep_reference: bool = False) -> None:
+        # Must be called with the lock acquired :
+        value = self._entries.pop(key)
+        self.size -= self._sizes.pop(key)
+
+        if keep_reference:
+            try:
+                self._released[key] = value
+            except TypeError: # The value is not weakly referenceable.
+                pass
+
+
+    def _adopt(self, key: Hashable) -> None:
+        # Must be called with the lock acquired, stores again a released scenario still alive :
+        if key not in self._entries:
+            value = self._released.pop(key, None)
+            if value is not None:
+                self._put(key, value)
+
+
+# Scenario store shared by every process engine of the server :
+SCENARIO_STORE = ScenarioStore()
+
+
+def _release_scenario_store() -> int:
+    # The scenarios still displayed by a session stay alive, and are stored again (not computed again) on their next request :
+    return SCENARIO_STORE.release()
+
+
+# The stored scenarios are released when the memory budget of the server is exceeded :
+MEMORY_BUDGET.register_cache("scenario_store", _release_scenario_store, lambda: SCENARIO_STORE.get_statistics()["bytes"])
+
+
+def _get_scenario_store_requests_by_result() -> Dict[Tuple[str, ...], float]:
+    statistics = SCENARIO_STORE.get_statistics()
+    return {
+        ("hit",): statistics["hits"],
+        ("miss",): statistics["misses"]
+    }
+
+
+METRICS.register(Gauge(
+    "fresque_scenario_store_entries",
+    "Number of scenarios kept in the scenario store.",
+    function = lambda: SCENARIO_STORE.get_statistics()["entries"]
+))
+METRICS.register(Gauge(
+    "fresque_scenario_store_bytes",
+    "Memory size of the scenarios kept in the scenario store, in bytes.",
+    function = lambda: SCENARIO_STORE.get_statistics()["bytes"]
+))
+METRICS.register(Counter(
+    "fresque_scenario_store_requests_total",
+    "Requests to the scenario store, by result (hit or miss, a miss needing a computation).",
+    ["result"],
+    function = _get_scenario_store_requests_by_result
+))
+METRICS.register(Counter(
+    "fresque_scenario_store_evictions_total",
+    "Scenarios evicted from the scenario store.",
+    function = lambda: SCENARIO_STORE.get_statistics()["evictions"]
+))
@@ -0,0 +1,93 @@
+from typing import Any, Dict, List
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from pandas import DataFrame
+
+from core.aeromaps_utils.formula_variables import get_charts_variables
+
+
+
+
+# Artificial duration of a synthetic computation, in milliseconds (configurable from the `.env` file) :
+SYNTHETIC_PROCESS_DELAY = int(os.getenv("SYNTHETIC_PROCESS_DELAY", "0"))
+
+# Years of the synthetic process data (the same ranges as the AeroMAPS process data) :
+SYNTHETIC_FULL_YEARS: List[int]        = list(range(2000, 2051))
+SYNTHETIC_HISTORIC_YEARS: List[int]    = list(range(2000, 2020))
+SYNTHETIC_PROSPECTIVE_YEARS: List[int] = list(range(2019, 2051))
+
+
+def _get_seed(*values: Any) -> int:
+    # Stable between runs and processes (unlike `hash`) :
+    return int.from_bytes(hashlib.blake2b(repr(values).encode("utf-8"), digest_size = 8).digest(), "big")
+
+
+class SyntheticParameters:
+    """
+    Parameters of a synthetic process : any parameter can be set, like on the AeroMAPS parameters.
+    """
+
+
+class SyntheticProcess:
+    """
+    Stand-in for an AeroMAPS process, producing process data with the same shape as the AeroMAPS one without any AeroMAPS computation (see `AEROMAPS_PROCESS_BACKEND`).
+
+    The data contains every variable used by the formulas of the charts.
+    It only depends on the parameters of the process, so the same parameters always produce the same data, and different parameters (different cards) produce different data.
+    Each computation lasts at least `delay` milliseconds, to mimic the cost of an AeroMAPS computation.
+
+    #### Arguments :
+    - `delay (int)` : The artificial duration of a computation, in milliseconds. Defaults to `SYNTHETIC_PROCESS_DELAY`.
+    """
+    def __init__(self, delay: int = SYNTHETIC_PROCESS_DELAY) -> None:
+        self.delay = delay
+
+        self.parameters = SyntheticParameters()
+        self.data: Dict[str, Any] = {}
+
+
+    def compute(self) -> None:
+        """
+        Computes the synthetic process data from the current parameters (available in `self.data`).
+        """
+        start = time.perf_counter()
+
+        parameters_seed = _get_seed(sorted(vars(self.parameters).items()))
+        variables = get_charts_variables()
+
+        full_years = np.array(SYNTHETIC_FULL_YEARS)
+        progress   = np.clip((full_years - SYNTHETIC_PROSPECTIVE_YEARS[0]) / (full_years[-1] - SYNTHETIC_PROSPECTIVE_YEARS[0]), 0.0, 1.0) # 0 until 2019, then up to 1 in 2050.
+
+        def get_vector_values(name: str) -> np.ndarray:
+            # A historic trend common to every scenario, then a prospective trend depending on the parameters :
+            level  = 100 + _get_seed(name) % 900
+            growth = 1 + (_get_seed(name, "growth") % 40) / 1000
+            target = 0.2 + (_get_seed(parameters_seed, name) % 1000) / 1000 * 1.3 # Between 20% and 150% of the 2019 value in 2050.
+            historic_trend = level * growth ** (np.minimum(full_years, SYNTHETIC_PROSPECTIVE_YEARS[0]) - full_years[0])
+
+            return historic_trend * (1 + (target - 1) * progress)
+
+        def get_float_value(name: str) -> float:
+            return 1 + (_get_seed(parameters_seed, name) % 100000) / 100
+
+        self.data = {
+            "years": {
+                "full_years": list(SYNTHETIC_FULL_YEARS),
+                "historic_years": list(SYNTHETIC_HISTORIC_YEARS),
+                "prospective_years": list(SYNTHETIC_PROSPECTIVE_YEARS)
+            },
+            "float_inputs": {name: get_float_value(name) for name in variables["float_inputs"]},
+            "float_outputs": {name: get_float_value(name) for name in variables["float_outputs"]},
+            "vector_outputs": DataFrame({name: get_vector_values(name) for name in variables["vector_outputs"]}, index = SYNTHETIC_FULL_YEARS),
+            "climate_outputs": DataFrame({name: get_vector_values(name) for name in variables["climate_outputs"]}, index = SYNTHETIC_FULL_YEARS)
+        }
+
+        # Wait for the rest of the artificial duration :
+        remaining_delay = self.delay / 1000 - (time.perf_counter() - start)
+        if remaining_delay > 0:
+            time.sleep(remaining_delay)
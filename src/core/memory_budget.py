@@ -0,0 +1,362 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+import gc
+import logging
+import math
+import os
+import time
+
+from threading import Lock
+
+from core.metrics import METRICS, Counter, Gauge, get_children_resident_memory, get_process_resident_memory
+
+
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Resident memory of the server processes (the server and its compute workers) above which the shared caches are released and the new sessions wait, in MiB (configurable from the `.env` file, `0` disables the budget) :
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "0"))
+
+# Maximal waiting time of a new session for the memory to go back under the budget, in seconds (the session is refused afterwards) :
+SESSION_QUEUE_TIMEOUT = int(os.getenv("SESSION_QUEUE_TIMEOUT", "60"))
+
+# Minimal number of seconds between two releases of the shared caches (the sessions waiting for the memory budget retry meanwhile) :
+MEMORY_BUDGET_RELEASE_INTERVAL = 10
+
+# Memory usage of a session : the sizes of its data (keys ending with `_bytes`, in bytes) and its numbers of objects (other keys) :
+MemoryUsage = Dict[str, int]
+
+
+class MemoryBudget:
+    """
+    Memory budget of the server processes (the server and its compute workers), with the memory accounting of its sessions and shared caches.
+
+    Each session registers a function returning its memory usage (see `register_session`), exposed in the metrics and logged when the budget is exceeded.
+    Each shared cache registers a function releasing its entries (see `register_cache`), called when the estimated memory usage of the processes exceeds the budget,
+    before a new session is admitted (see `admit_session`).
+
+    The resident memory of the server process rarely goes down once the caches are released or the sessions closed (the freed memory is kept by the allocator for the next objects),
+    so the sessions are admitted based on the estimated memory usage (see `get_memory_usage`).
+
+    #### Arguments :
+    - `budget (int)` : The maximal resident memory of the server processes, in bytes (`0` disables the budget).
+    """
+    def __init__(self, budget: int = MEMORY_BUDGET_MB * 1024 * 1024) -> None:
+        if not isinstance(budget, int) or budget < 0:
+            raise ValueError(f"Invalid memory budget: {budget}. It should be a positive integer (or 0 to disable the budget).")
+
+        self.budget = budget
+
+        self.releases: int          = 0 # Number of times the shared caches were released.
+        self.refused_sessions: int  = 0
+        self.queued_sessions: int   = 0 # Number of sessions currently waiting to be admitted.
+
+        self._sessions: Dict[str, Callable[[], MemoryUsage]]                       = {}
+        self._caches: Dict[str, Tuple[Callable[[], int], Optional[Callable[[], int]]]] = {} # Release and size functions of each cache.
+        self._unaccounted_memory: Optional[float] = None # Resident memory of the server process not accounted to the sessions and caches, measured once.
+        self._last_release = -math.inf
+        self._lock = Lock()
+
+
+    def register_session(self, session_id: str, get_memory_usage: Callable[[], MemoryUsage]) -> None:
+        """
+        Registers a session in the memory accounting.
+
+        #### Arguments :
+        - `session_id (str)` : The identifier of the session.
+        - `get_memory_usage (Callable[[], MemoryUsage])` : A function returning the current memory usage of the session.
+        """
+        with self._lock:
+            self._sessions[session_id] = get_memory_usage
+
+
+    def unregister_session(self, session_id: str) -> None:
+        """
+        Removes a session from the memory accounting (once it is destroyed).
+
+        #### Arguments :
+        - `session_id (str)` : The identifier of the session.
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+    def register_cache(self, name: str, release: Callable[[], int], get_size: Optional[Callable[[], int]] = None) -> None:
+        """
+        Registers a shared cache released when the budget is exceeded.
+
+        #### Arguments :
+        - `name (str)` : The name of the cache.
+        - `release (Callable[[], int])` : A function removing the entries of the cache (the entries still used by a session stay alive), and returning the number of removed entries.
+        - `get_size (Optional[Callable[[], int]])` : A function returning the memory size of the entries of the cache, in bytes. Defaults to None (the cache is not accounted).
+        """
+        with self._lock:
+            self._caches[name] = (release, get_size)
+
+
+    def get_sessions_memory_usage(self) -> Dict[str, MemoryUsage]:
+        """
+        Get the memory usage of each registered session.
+
+        #### Returns :
+        - `Dict[str, MemoryUsage]` : The memory usage of each session, by session identifier (a session whose usage cannot be read is skipped).
+        """
+        with self._lock:
+            sessions = list(self._sessions.items())
+
+        sessions_memory_usage = {}
+        for session_id, get_memory_usage in sessions:
+            try:
+                sessions_memory_usage[session_id] = get_memory_usage()
+            except Exception as exception: # The session may be destroyed meanwhile.
+                LOGGER.debug("Memory usage of the session %s not available: %s", session_id, exception)
+
+        return sessions_memory_usage
+
+
+    def get_caches_size(self) -> int:
+        """
+        Get the memory size of the entries of the shared caches (the caches registered without a size function are not counted).
+
+        #### Returns :
+        - `int` : The total size of the entries of the caches, in bytes.
+        """
+        with self._lock:
+            caches_sizes = [get_size for _release, get_size in self._caches.values() if get_size is not None]
+
+        return sum(get_size() for get_size in caches_sizes)
+
+
+    def get_accounted_memory(self) -> int:
+        """
+        Get the memory accounted to the sessions and the shared caches.
+
+        #### Returns :
+        - `int` : The total size of the data of the sessions and of the entries of the caches, in bytes.
+        """
+        sessions_memory = sum(get_memory_usage_total(memory_usage) for memory_usage in self.get_sessions_memory_usage().values())
+        return sessions_memory + self.get_caches_size()
+
+
+    def get_memory_usage(self) -> Optional[float]:
+        """
+        Get the estimated memory usage of the server processes.
+
+        Once the budget was exceeded, the usage of the server process is its unaccounted memory (measured once, the first time the budget was exceeded) plus the memory accounted now,
+        so it goes down when the sessions are closed or the caches released, even if the resident memory does not. The child processes (the compute workers) are counted with their resident memory.
+
+        #### Returns :
+        - `Optional[float]` : The estimated memory usage, in bytes, or None if the resident memory cannot be read.
+        """
+        resident_memory = get_resident_memory()
+        if resident_memory is None or self._unaccounted_memory is None:
+            return resident_memory
+
+        estimated_memory = self._unaccounted_memory + self.get_accounted_memory() + (get_children_resident_memory() or 0.0)
+        return min(resident_memory, estimated_memory)
+
+
+    def is_exceeded(self) -> bool:
+        """
+        Checks whether the resident memory of the server processes exceeds the budget.
+
+        #### Returns :
+        - `bool` : True if the budget is enabled and exceeded, False otherwise (or if the resident memory cannot be read).
+        """
+        if self.budget <= 0:
+            return False
+
+        memory = get_resident_memory()
+        return memory is not None and memory > self.budget
+
+
+    def release_caches(self) -> Dict[str, int]:
+        """
+        Releases the entries of all the registered shared caches, and logs the memory usage of the sessions.
+
+        #### Returns :
+        - `Dict[str, int]` : The number of removed entries of each cache.
+        """
+        with self._lock:
+            caches = list(self._caches.items())
+            self.releases += 1
+            self._last_release = time.monotonic()
+
+        resident_memory = get_resident_memory()
+        released_entries = {name: release() for name, (release, _get_size) in caches}
+        gc.collect()
+
+        LOGGER.warning(
+            "Memory budget exceeded (%.0f MiB resident, %.0f MiB used, %.0f MiB allowed), shared caches released: %s. Sessions memory usage: %s",
+            (resident_memory or 0.0) / 2 ** 20,
+            (self.get_memory_usage() or 0.0) / 2 ** 20,
+            self.budget / 2 ** 20,
+            released_entries,
+            format_sessions_memory_usage(self.get_sessions_memory_usage())
+        )
+
+        return released_entries
+
+
+    def admit_session(self) -> bool:
+        """
+        Checks whether a new session can be created, based on the estimated memory usage once the resident memory exceeds the budget (see `get_memory_usage`).
+
+        If the estimated memory usage exceeds the budget, the shared caches are released first : at most once every `MEMORY_BUDGET_RELEASE_INTERVAL` seconds, and only if they hold entries to free.
+
+        #### Returns :
+        - `bool` : True if the memory is under the budget (or the budget is disabled), False if the session should wait (or be refused).
+        """
+        if not self.is_exceeded():
+            return True
+
+        # The memory not accounted to the sessions and caches (interpreter, AeroMAPS models), measured the first time the budget is exceeded :
+        if self._unaccounted_memory is None:
+            self._measure_unaccounted_memory()
+
+        memory_usage = self.get_memory_usage()
+        if memory_usage is None or memory_usage <= self.budget:
+            return True
+
+        if time.monotonic() - self._last_release >= MEMORY_BUDGET_RELEASE_INTERVAL and self.get_caches_size() > 0:
+            self.release_caches()
+            memory_usage = self.get_memory_usage()
+
+        return memory_usage is None or memory_usage <= self.budget
+
+
+    def _measure_unaccounted_memory(self) -> None:
+        process_memory = get_process_resident_memory()
+        if process_memory is not None:
+            self._unaccounted_memory = max(0.0, process_memory - self.get_accounted_memory())
+
+
+    def queue_session(self) -> None:
+        """
+        Counts a new session waiting to be admitted (see `admit_session`).
+        """
+        with self._lock:
+            self.queued_sessions += 1
+
+
+    def unqueue_session(self, refused: bool = False) -> None:
+        """
+        Counts a waiting session as admitted or refused.
+
+        #### Arguments :
+        - `refused (bool)` : If True, the session is refused (the memory stayed over the budget). Defaults to False.
+        """
+        with self._lock:
+            self.queued_sessions -= 1
+            self.refused_sessions += refused
+
+
+def get_resident_memory() -> Optional[float]:
+    """
+    Get the resident memory of the server processes : the server process and its child processes (the compute workers).
+
+    #### Returns :
+    - `Optional[float]` : The resident memory, in bytes, or None if it cannot be read.
+    """
+    process_memory = get_process_resident_memory()
+    if process_memory is None:
+        return None
+
+    return process_memory + (get_children_resident_memory() or 0.0)
+
+
+def get_memory_usage_total(memory_usage: MemoryUsage) -> int:
+    """
+    Get the total size of the data of a memory usage.
+
+    #### Arguments :
+    - `memory_usage (MemoryUsage)` : The memory usage of a session.
+
+    #### Returns :
+    - `int` : The sum of the sizes (the values of the keys ending with `_bytes`), in bytes.
+    """
+    return sum(value for key, value in memory_usage.items() if key.endswith("_bytes"))
+
+
+def format_sessions_memory_usage(sessions_memory_usage: Dict[str, MemoryUsage]) -> str:
+    """
+    Formats the memory usage of several sessions for the logs, the largest sessions first.
+
+    #### Arguments :
+    - `sessions_memory_usage (Dict[str, MemoryUsage])` : The memory usage of each session, by session identifier.
+
+    #### Returns :
+    - `str` : One `identifier: total (details)` entry per session.
+    """
+    sorted_sessions: List[Tuple[str, MemoryUsage]] = sorted(sessions_memory_usage.items(), key = lambda item: -get_memory_usage_total(item[1]))
+
+    return "; ".join(
+        f"{session_id}: {get_memory_usage_total(memory_usage) / 2 ** 20:.1f} MiB ({', '.join(f'{key}={value}' for key, value in memory_usage.items())})"
+        for session_id, memory_usage in sorted_sessions
+    ) or "no session"
+
+
+# Memory budget of the server process, shared by every session :
+MEMORY_BUDGET = MemoryBudget()
+
+
+def _get_sessions_memory_bytes() -> Dict[Tuple[str, ...], float]:
+    return {
+        (session_id, key.removesuffix("_bytes")): value
+        for session_id, memory_usage in MEMORY_BUDGET.get_sessions_memory_usage().items()
+        for key, value in memory_usage.items()
+        if key.endswith("_bytes")
+    }
+
+
+def _get_sessions_objects() -> Dict[Tuple[str, ...], float]:
+    return {
+        (session_id, key): value
+        for session_id, memory_usage in MEMORY_BUDGET.get_sessions_memory_usage().items()
+        for key, value in memory_usage.items()
+        if not key.endswith("_bytes")
+    }
+
+
+def _get_memory_budget() -> Optional[float]:
+    return MEMORY_BUDGET.budget or None
+
+
+METRICS.register(Gauge(
+    "fresque_session_memory_bytes",
+    "Estimated memory used by each live session, by part (widgets, scenarios data, charts data, figures data).",
+    ["session", "part"],
+    function = _get_sessions_memory_bytes
+))
+METRICS.register(Gauge(
+    "fresque_session_objects",
+    "Number of objects owned by each live session, by kind (process engines, widgets).",
+    ["session", "kind"],
+    function = _get_sessions_objects
+))
+METRICS.register(Gauge(
+    "fresque_memory_usage_bytes",
+    "Estimated memory usage of the server processes in bytes, compared to the memory budget (the resident memory, less the memory freed by the last release of the shared caches).",
+    function = MEMORY_BUDGET.get_memory_usage
+))
+METRICS.register(Gauge(
+    "fresque_memory_budget_bytes",
+    "Memory budget of the server processes in bytes (absent if the budget is disabled).",
+    function = _get_memory_budget
+))
+METRICS.register(Counter(
+    "fresque_memory_budget_releases_total",
+    "Number of times the shared caches were released because the memory budget was exceeded.",
+    function = lambda: MEMORY_BUDGET.releases
+))
+METRICS.register(Gauge(
+    "fresque_queued_sessions",
+    "Number of new sessions waiting for the memory to go back under the budget.",
+    function = lambda: MEMORY_BUDGET.queued_sessions
+))
+METRICS.register(Counter(
+    "fresque_refused_sessions_total",
+    "Number of new sessions refused because the memory budget stayed exceeded.",
+    function = lambda: MEMORY_BUDGET.refused_sessions
+))
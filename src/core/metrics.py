@@ -0,0 +1,303 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import math
+import os
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+
+
+
+
+# Upper bounds of the buckets of the latency histograms, in seconds (from a chart update to a live AeroMAPS computation) :
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Samples of a metric : the suffix of the sample name, the labels and the value :
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    escaped_values = {name: str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for name, value in labels.items()}
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped_values.items()) + "}"
+
+
+class Metric:
+    """
+    Base class of the metrics exposed in the Prometheus text format (see `MetricsRegistry.render`).
+
+    The values of a metric are either recorded by the application, or read from a function when the metrics are rendered (for the values already counted elsewhere, like the statistics of the scenario store).
+
+    #### Arguments :
+    - `name (str)` : The name of the metric.
+    - `documentation (str)` : The description of the metric.
+    - `labels_names (Sequence[str])` : The names of the labels of the metric. Defaults to no label.
+    - `function (Optional[Callable[[], float | Dict[Tuple[str, ...], float] | None]])` : A function returning the current value of the metric (or its value by labels values, or None if it is not available). Defaults to None (recorded values).
+    """
+    type = "untyped"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels_names: Sequence[str] = (),
+            function: Optional[Callable[[], float | Dict[Tuple[str, ...], float] | None]] = None
+        ) -> None:
+        self.name          = name
+        self.documentation = documentation
+        self.labels_names  = tuple(labels_names)
+        self.function      = function
+
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+
+    def _get_key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels_names):
+            raise ValueError(f"Invalid labels for the metric '{self.name}': {sorted(labels)}. Expected labels are: {list(self.labels_names)}.")
+
+        return tuple(str(labels[name]) for name in self.labels_names)
+
+
+    def get_samples(self) -> List[Sample]:
+        """
+        Get the current samples of the metric.
+
+        #### Returns :
+        - `List[Sample]` : The samples, as tuples of the suffix of the sample name, the labels and the value.
+        """
+        if self.function is None:
+            with self._lock:
+                values = dict(self._values)
+        else:
+            values = self.function()
+            if values is None:
+                return []
+            if not isinstance(values, dict):
+                values = {(): values}
+
+        return [("", dict(zip(self.labels_names, key)), value) for key, value in sorted(values.items())]
+
+
+class Counter(Metric):
+    """
+    Metric whose value only increases (for instance, a number of requests).
+    """
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    Metric whose value goes up and down (for instance, a number of live sessions).
+    """
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Metric counting observed values (for instance, durations) in cumulative buckets.
+
+    #### Arguments :
+    - `name (str)` : The name of the metric.
+    - `documentation (str)` : The description of the metric.
+    - `labels_names (Sequence[str])` : The names of the labels of the metric. Defaults to no label.
+    - `buckets (Sequence[float])` : The upper bounds of the buckets. Defaults to `DEFAULT_LATENCY_BUCKETS`.
+    """
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels_names: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+        ) -> None:
+        super().__init__(name, documentation, labels_names)
+
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {} # Count of each bucket (and of the values above the last bucket), and the sum of the values.
+
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            counts, total = self._histograms.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observes the duration of a `with` block, in seconds (even if it raises an exception).
+
+        #### Example :
+        >>> with STAGE_DURATION.time(stage = "compute"):
+        >>>     process.compute()
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+    def get_samples(self) -> List[Sample]:
+        with self._lock:
+            histograms = {key: (list(counts), total[0]) for key, (counts, total) in self._histograms.items()}
+
+        samples = []
+        for key, (counts, total) in sorted(histograms.items()):
+            labels = dict(zip(self.labels_names, key))
+
+            cumulative_count = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative_count += count
+                samples.append(("_bucket", {**labels, "le": _format_value(upper_bound)}, cumulative_count))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative_count))
+
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of the metrics of the server, rendered in the Prometheus text format.
+    """
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = Lock()
+
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Registers a metric.
+
+        #### Arguments :
+        - `metric (Metric)` : The metric to register.
+
+        #### Returns :
+        - `Metric` : The registered metric.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"A metric named '{metric.name}' is already registered.")
+            self._metrics[metric.name] = metric
+
+        return metric
+
+
+    def render(self) -> str:
+        """
+        Renders the current values of all the metrics in the Prometheus text format (version 0.0.4).
+
+        #### Returns :
+        - `str` : The text exposition of the metrics.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.get_samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def get_process_resident_memory(pid: int | str = "self") -> Optional[float]:
+    """
+    Get the resident memory of a process (Linux only).
+
+    #### Arguments :
+    - `pid (int | str)` : The identifier of the process. Defaults to `"self"` (the current process).
+
+    #### Returns :
+    - `Optional[float]` : The resident memory, in bytes, or None if it cannot be read.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", "r") as file:
+            return float(int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_children_resident_memory() -> Optional[float]:
+    """
+    Get the total resident memory of the child processes of the current process, such as the compute workers (Linux only).
+
+    #### Returns :
+    - `Optional[float]` : The resident memory of the child processes, in bytes, or None if they cannot be listed.
+    """
+    try:
+        children_ids = {int(pid) for path in Path("/proc/self/task").glob("*/children") for pid in path.read_text().split()}
+    except (OSError, ValueError):
+        return None
+
+    # A child process may exit meanwhile :
+    return sum(get_process_resident_memory(pid) or 0.0 for pid in children_ids)
+
+
+# Metrics of the server (the metrics of the other modules are registered next to the code they measure) :
+METRICS = MetricsRegistry()
+
+STAGE_DURATION: Histogram = METRICS.register(Histogram(
+    "fresque_stage_duration_seconds",
+    "Duration of each stage of a figures update (scenarios computation, formulas evaluation, figures drawing and rendering).",
+    ["stage"]
+))
+CACHE_REQUESTS: Counter = METRICS.register(Counter(
+    "fresque_cache_requests_total",
+    "Requests to the caches of the server, by cache and result (hit or miss).",
+    ["cache", "result"]
+))
+LIVE_SESSIONS: Gauge = METRICS.register(Gauge(
+    "fresque_live_sessions",
+    "Number of live sessions of the application."
+))
+METRICS.register(Gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size of the server process in bytes.",
+    function = get_process_resident_memory
+))
+METRICS.register(Gauge(
+    "process_children_resident_memory_bytes",
+    "Resident memory size of the child processes of the server (compute workers) in bytes.",
+    function = get_children_resident_memory
+))
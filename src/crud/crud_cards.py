@@ -1,9 +1,11 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 from utils import CARDS_JSON_PATH
 
 import json
 
+from functools import lru_cache
+
 
 
 
@@ -12,6 +14,97 @@ def _load_cards(path: str = CARDS_JSON_PATH) -> Dict[str, Dict[str, str]]:
         return json.load(file)
 
 
+class CardsRegistry:
+    """
+    Read-only registry of the cards, loaded once from the cards file and indexed by name and by identifier.
+
+    #### Arguments :
+    - `cards (Dict[str, Dict[str, str]])` : The cards, as loaded from the cards file (each card having a `name` and an `id`).
+    """
+    __slots__ = ("names", "ids", "_ids_by_name", "_indices_by_id")
+
+    def __init__(self, cards: Dict[str, Dict[str, str]]) -> None:
+        self.names: Tuple[str, ...] = tuple(card["name"] for card in cards.values())
+        self.ids: Tuple[str, ...]   = tuple(card["id"] for card in cards.values())
+
+        self._ids_by_name: Dict[str, str]   = dict(zip(self.names, self.ids))
+        self._indices_by_id: Dict[str, int] = {card_id: index for index, card_id in enumerate(self.ids)}
+
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._indices_by_id
+
+
+    def get_card_id_by_name(self, card_name: str) -> str:
+        """
+        Returns the identifier of a card given its name.
+
+        #### Arguments :
+        - `card_name (str)` : The name of the card.
+
+        #### Returns :
+        - `str` : The identifier of the card.
+        """
+        if card_name not in self._ids_by_name:
+            raise ValueError(f"Card with name '{card_name}' not found.")
+
+        return self._ids_by_name[card_name]
+
+
+    def get_card_index(self, card_id: str) -> int:
+        """
+        Returns the position of a card in the cards file.
+
+        #### Arguments :
+        - `card_id (str)` : The identifier of the card.
+
+        #### Returns :
+        - `int` : The index of the card (the same index in `names` and `ids`).
+        """
+        if card_id not in self._indices_by_id:
+            raise ValueError(f"Card with identifier '{card_id}' not found.")
+
+        return self._indices_by_id[card_id]
+
+
+    def are_valid_cards_ids(self, cards_ids: Iterable[str]) -> bool:
+        """
+        Checks that all the given identifiers are identifiers of cards.
+
+        #### Arguments :
+        - `cards_ids (Iterable[str])` : The cards identifiers to check.
+
+        #### Returns :
+        - `bool` : True if all the identifiers are known, False otherwise.
+        """
+        return all(card_id in self._indices_by_id for card_id in cards_ids)
+
+
+def load_cards_registry(path: str = CARDS_JSON_PATH) -> CardsRegistry:
+    """
+    Reads the cards file into a new registry of the cards (unlike `get_cards_registry`, the file is read on each call).
+
+    #### Returns :
+    - `CardsRegistry` : The registry of the cards.
+    """
+    return CardsRegistry(_load_cards(path))
+
+
+@lru_cache(maxsize = None)
+def get_cards_registry(path: str = CARDS_JSON_PATH) -> CardsRegistry:
+    """
+    Returns the registry of the cards (the cards file is read once).
+
+    #### Returns :
+    - `CardsRegistry` : The registry of the cards.
+    """
+    return load_cards_registry(path)
+
+
 def get_cards_name(path: str = CARDS_JSON_PATH) -> List[str]:
     """
     Returns the list of cards names.
@@ -19,8 +112,7 @@ def get_cards_name(path: str = CARDS_JSON_PATH) -> List[str]:
     #### Returns :
     - `list[str]` : A list of all the cards names.
     """
-    cards: Dict[str, str] = _load_cards(path)
-    return [card["name"] for card in cards.values()]
+    return list(get_cards_registry(path).names)
 
 
 def get_cards_ids(path: str = CARDS_JSON_PATH) -> List[str]:
@@ -30,8 +122,7 @@ def get_cards_ids(path: str = CARDS_JSON_PATH) -> List[str]:
     #### Returns :
     - `list[str]` : A list of all the cards identifiers.
     """
-    cards: Dict[str, str] = _load_cards(path)
-    return [card["id"] for card in cards.values()]
+    return list(get_cards_registry(path).ids)
 
 
 def get_card_id_by_name(card_name: str, path: str = CARDS_JSON_PATH) -> str:
@@ -44,10 +135,4 @@ def get_card_id_by_name(card_name: str, path: str = CARDS_JSON_PATH) -> str:
     #### Returns :
     - `str` : The identifier of the card.
     """
-    cards: Dict[str, str] = _load_cards(path)
-
-    for card in cards.values():
-        if card["name"] == card_name:
-            return card["id"]
-
-    raise ValueError(f"Card with name '{card_name}' not found.")
+    return get_cards_registry(path).get_card_id_by_name(card_name)
@@ -0,0 +1,61 @@
+from typing import Any, Dict, List
+
+from utils import CARDS_PARAMETERS_JSON_PATH
+
+import json
+
+
+
+
+def _load_cards_parameters(path: str = CARDS_PARAMETERS_JSON_PATH) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding = "utf-8") as file:
+        return json.load(file)
+
+
+def get_baseline_parameters(path: str = CARDS_PARAMETERS_JSON_PATH) -> Dict[str, Any]:
+    """
+    Returns the baseline parameters of the AeroMAPS process (the parameters of the reference scenario).
+
+    #### Returns :
+    - `Dict[str, Any]` : A dictionary where each key is an AeroMAPS parameter name and the associated value is its baseline value.
+    """
+    cards_parameters: Dict = _load_cards_parameters(path)
+
+    baseline_parameters = {}
+    for parameters_section in cards_parameters["baseline"].values():
+        baseline_parameters.update(parameters_section["parameters"])
+
+    return baseline_parameters
+
+
+def get_cards_parameters(path: str = CARDS_PARAMETERS_JSON_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the parameters deltas of each card, in the order they are applied.
+
+    #### Returns :
+    - `Dict[str, Dict[str, Any]]` : A dictionary where each key is a card identifier and the associated value is another dictionnary containing :
+        - `parameters` : The AeroMAPS parameters changed by the card.
+        - `combinations` : A list of dictionnaries containing the AeroMAPS `parameters` changed by the card when it is played `with` all of the given other cards (applied after the card own parameters).
+    """
+    cards_parameters: Dict = _load_cards_parameters(path)
+    return {
+        card["id"]: {
+            "parameters": card.get("parameters", {}),
+            "combinations": card.get("combinations", [])
+        }
+        for card in cards_parameters["cards"].values()
+    }
+
+
+def get_implemented_cards_ids(path: str = CARDS_PARAMETERS_JSON_PATH) -> List[str]:
+    """
+    Returns the list of the identifiers of the implemented cards (the cards changing at least one AeroMAPS parameter).
+
+    #### Returns :
+    - `List[str]` : A list of the implemented cards identifiers.
+    """
+    cards_parameters = get_cards_parameters(path)
+    return [
+        card_id for card_id, card_parameters in cards_parameters.items()
+        if card_parameters["parameters"] or card_parameters["combinations"]
+    ]
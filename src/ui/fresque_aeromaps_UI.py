@@ -1,14 +1,26 @@
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from bqplot import LinearScale
-from bqplot_figures.prospective_scenario_graph import ProspectiveScenarioGraph, get_prospective_scenario_y_scales
+from bqplot_figures.base_graph import BaseGraph
+from bqplot_figures.prospective_scenario_graph import get_prospective_scenario_y_scales
 from bqplot_figures.multidisciplinary_graph import MultidisciplinaryGraph, get_multidisciplinary_graphs_y_scales
+from bqplot_figures.utils.chart_data import prepare_charts_data
 
-from ipywidgets import Box, VBox, Layout, Checkbox, Button
+from core.aeromaps_utils.charts_configuration import ChartsConfiguration, get_charts_configuration
+from core.aeromaps_utils.process_engine import ProcessEngine
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.metrics import STAGE_DURATION
+
+from crud.crud_cards import get_cards_registry
+
+from ipywidgets import Box, VBox, Layout, Checkbox, Button, Widget
 
 from ui.utils.fresque_aeromaps_UI_constants import (
-    CARDS_NAMES,
     DEFAULT_NUMBER_OF_GROUPS,
+    PROSPECTIVE_SCENARIO_SECTION_EXPANDED,
+    PROSPECTIVE_SCENARIO_GROUPS_SECTION_EXPANDED,
+    MULTIDISCIPLINARY_SECTION_EXPANDED,
+    WIDGET_MEMORY_SIZE,
     BUTTON_BOX_LAYOUT,
     PROSPECTIVE_SCENARIO_BOX_LAYOUT,
     MULTIDISCIPLINARY_BOX_LAYOUT,
@@ -23,10 +35,19 @@ from ui.utils.fresque_aeromaps_UI_widgets import (
     draw_checkboxes_grid_title,
     draw_prospective_scenario_graphs_title,
     draw_multidisciplinary_graphs_title,
-    draw_update_button
+    draw_section_accordion,
+    draw_update_button,
+    set_update_button_busy,
+    get_widgets_tree,
+    close_widgets
 )
 from ui.utils.fresque_aeromaps_UI_figures import (
-    compute_process_engine,
+    get_reference_scenario,
+    compute_process_engines,
+    get_selected_cards_ids_lists,
+    get_cards_ids_lists_fingerprints,
+    get_changed_groups_indices,
+    set_shared_y_scale,
     initialize_process_engine,
     initialize_prospective_scenario_graph,
     initialize_prospective_scenario_group_comparison_graph,
@@ -35,28 +56,11 @@ from ui.utils.fresque_aeromaps_UI_figures import (
     draw_prospective_scenario_group_comparison_graph,
     draw_multidisciplinary_graph
 )
+from ui.utils.fresque_aeromaps_UI_updater import LatestUpdateRunner
 
 
 
 
-def create_prospective_scenarios_boxes(prospective_scenarios_figures: List[ProspectiveScenarioGraph]) -> VBox:
-    """
-    Creates a list of boxes containing the prospective scenario figures.
-
-    #### Parameters :
-    - `prospective_scenarios_figures (List[ProspectiveScenarioGraph])` : A list of prospective scenario figures to be displayed in boxes.
-
-    #### Returns :
-    - `VBox` : A vertical box containing all the prospective scenario figures.
-    """
-    return VBox(
-        [
-            figure for figure in prospective_scenarios_figures
-        ],
-        layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT)
-    )
-
-
 def create_multidisciplinary_boxes(
         number_of_groups: int,
         reference_multidisciplinary_figure: MultidisciplinaryGraph,
@@ -107,7 +111,8 @@ def create_multidisciplinary_boxes(
 class FresqueAeroMapsUI:
     def __init__(
             self,
-            default_number_of_groups: int = DEFAULT_NUMBER_OF_GROUPS
+            default_number_of_groups: int = DEFAULT_NUMBER_OF_GROUPS,
+            dispatch: Optional[Callable[[Callable[[], None]], None]] = None
             ) -> None:
         """
         Initializes the Fresque-AeroMaps application main interface.
@@ -115,12 +120,19 @@ class FresqueAeroMapsUI:
 
         #### Arguments :
         - `default_number_of_groups` : The default number of groups to display in the interface. Default to `DEFAULT_NUMBER_OF_GROUPS`.
+        - `dispatch` : A function scheduling a callback on the event loop of the interface, used to update the figures once they are computed in the background (for instance, `Document.add_next_tick_callback` in a Panel server). Defaults to None (the figures are updated from the background thread).
         """
         # Check if the default number of groups is valid :
         if not isinstance(default_number_of_groups, int) or not (1 <= default_number_of_groups <= 10):
             raise ValueError("Le nombre de groupes doit être un entier entre 1 et 10.")
         self.number_of_groups = default_number_of_groups
 
+        # Initialize the runner of the figures updates (computed in the background, only the latest update is displayed) :
+        self.update_runner = LatestUpdateRunner(
+            dispatch,
+            lambda busy: set_update_button_busy(self.update_button, busy)
+        )
+
         # Initialize the interface components :
         self._initialize_checkboxes_lists()
         self._initialize_process_engines()
@@ -140,18 +152,37 @@ class FresqueAeroMapsUI:
         Computes the process engines data for each group based on the selected checkboxes.
 
         #### Arguments :
-        - `compute_reference_process` : If True, computes the reference process engine data. Default to False.
+        - `compute_reference_process` : If True, gets the reference process engine data (the reference scenario shared by the server, see `get_reference_scenario`). Default to False.
         """
-        # Compute the reference process engine data (if asked) :
+        # Keep track of the charts configuration the scenarios are computed for :
+        self.charts_configuration = get_charts_configuration()
+
+        # Get the reference scenario data, shared by every session of the server (if asked) :
         if compute_reference_process:
-            self.reference_process_engine_data = compute_process_engine(self.reference_process_engine)
+            self.reference_process_engine_data, self.reference_process_engine_fingerprint = get_reference_scenario()
 
-        # Compute each process based on the selected widgets :
-        self.process_engines_data = []
-        for process_engine, checkboxes in zip(self.process_engines, self.checkboxes_lists):
-            self.process_engines_data.append(
-                compute_process_engine(process_engine, checkboxes)
-            )
+        # Compute each process based on the selected widgets (the distinct scenarios are computed in parallel) :
+        cards_ids_lists = get_selected_cards_ids_lists(self.checkboxes_lists)
+        self.process_engines_data = compute_process_engines(self.process_engines, cards_ids_lists)
+
+        # Keep track of the displayed scenarios, and prepare the chart data of all the groups :
+        self.process_engines_fingerprints = get_cards_ids_lists_fingerprints(cards_ids_lists)
+        self._prepare_groups_charts_data()
+
+
+    def _prepare_groups_charts_data(self, groups_indices: Optional[List[int]] = None) -> None:
+        """
+        Prepares the chart data of the given groups (each formula of the figures is evaluated once for all of them), shared by the y-scales and the figures updates.
+
+        #### Arguments :
+        - `groups_indices` : The indices of the groups to prepare. Defaults to None (all the groups are prepared).
+        """
+        if groups_indices is None:
+            self.charts_data = prepare_charts_data(self.process_engines_data)
+            return
+
+        for index, chart_data in zip(groups_indices, prepare_charts_data([self.process_engines_data[index] for index in groups_indices])):
+            self.charts_data[index] = chart_data
 
 
     def _initialize_checkboxes_lists(self) -> None:
@@ -162,7 +193,7 @@ class FresqueAeroMapsUI:
         for _ in range(self.number_of_groups):
             self.checkboxes_lists.append(
                 [
-                    Checkbox(value = False) for _ in range(len(CARDS_NAMES)) # We don't set the visual elements here (indent and layout), they will be set in the `self._build_checkboxes_grid_section` function.
+                    Checkbox(value = False) for _ in range(len(get_cards_registry().names)) # We don't set the visual elements here (indent and layout), they will be set in the `self._build_checkboxes_grid_section` function.
                 ]
             )
 
@@ -184,7 +215,7 @@ class FresqueAeroMapsUI:
             for _ in range(self.number_of_groups - old_number_of_groups):
                 self.checkboxes_lists.append(
                     [
-                        Checkbox(value = False) for _ in range(len(CARDS_NAMES))
+                        Checkbox(value = False) for _ in range(len(get_cards_registry().names))
                     ]
                 )
         else:
@@ -199,16 +230,13 @@ class FresqueAeroMapsUI:
         #### Preconditions :
         - The `self._initialize_checkboxes_lists` function must be called before this function.
         """
-        # Initialize the reference process engine :
-        self.reference_process_engine = initialize_process_engine()
-
         # Initialize the process engines for each group :
         self.process_engines = [
             initialize_process_engine() for _ in range(self.number_of_groups)
         ]
 
-        # Compute the reference process engine data and the process engines data for each group :
-        self._compute_process_engines(True) # The reference scenario only needs to be computed once.
+        # Get the reference scenario data and compute the process engines data for each group :
+        self._compute_process_engines(True) # The reference scenario is computed once per server, by the first session.
 
 
     def _update_process_engines(self, old_number_of_groups: int) -> None:
@@ -227,12 +255,23 @@ class FresqueAeroMapsUI:
             # Add new process engines for the new groups :
             for _ in range(self.number_of_groups - old_number_of_groups):
                 self.process_engines.append(initialize_process_engine())
-        else:
-            # Remove process engines for the removed groups :
-            self.process_engines = self.process_engines[:self.number_of_groups]
 
-        # Compute the process engines data for each group (even the old ones) based on the selected checkboxes :
-        self._compute_process_engines()
+            # Compute the process engines data of the new groups only (the figures of the old groups keep their displayed scenarios) :
+            new_groups_indices = list(range(old_number_of_groups, self.number_of_groups))
+            cards_ids_lists = get_selected_cards_ids_lists([self.checkboxes_lists[index] for index in new_groups_indices])
+
+            self.process_engines_data.extend(
+                compute_process_engines([self.process_engines[index] for index in new_groups_indices], cards_ids_lists)
+            )
+            self.process_engines_fingerprints.extend(get_cards_ids_lists_fingerprints(cards_ids_lists))
+            self.charts_data.extend([None] * len(new_groups_indices))
+            self._prepare_groups_charts_data(new_groups_indices)
+        else:
+            # Remove process engines (and their data) for the removed groups :
+            self.process_engines               = self.process_engines[:self.number_of_groups]
+            self.process_engines_data          = self.process_engines_data[:self.number_of_groups]
+            self.process_engines_fingerprints  = self.process_engines_fingerprints[:self.number_of_groups]
+            self.charts_data                   = self.charts_data[:self.number_of_groups]
 
 
     def _initialize_prospective_scenario_graphs(self) -> None:
@@ -243,9 +282,22 @@ class FresqueAeroMapsUI:
         - The `self._initialize_process_engines` function must be called before this function.
         """
         # Initialize a shared y-axis for all prospective scenario graphs (make them all share the same scale) :
-        min_y, max_y = get_prospective_scenario_y_scales(self.process_engines_data)
+        min_y, max_y = get_prospective_scenario_y_scales(self.process_engines_data, self.charts_data)
         self.prospective_scenario_graphs_shared_y_scale = LinearScale(min = min_y, max = max_y)
 
+        # The graphs are only drawn when their section is first expanded (see `self._draw_prospective_scenario_graphs`),
+        # and the graphs of the groups when their own sub-section is first expanded (see `self._draw_groups_prospective_scenario_graphs`) :
+        self.prospective_scenario_graphs_drawn        = False
+        self.groups_prospective_scenario_graphs_drawn = False
+
+
+    def _draw_prospective_scenario_graphs(self) -> None:
+        """
+        Draws the reference and group comparison prospective scenario graphs from the current process engines data (their number does not depend on the number of groups).
+
+        #### Preconditions :
+        - The `self._initialize_prospective_scenario_graphs` function must be called before this function.
+        """
         # Initialize the reference prospective scenario graph :
         self.reference_prospective_scenario_graph = initialize_prospective_scenario_graph("Scénario de référence")
         self.reference_prospective_scenario_figure = draw_prospective_scenario_graph(
@@ -254,6 +306,26 @@ class FresqueAeroMapsUI:
             self.prospective_scenario_graphs_shared_y_scale
         )
 
+        # Initialize the group comparison prospective scenario graph :
+        self.group_comparison_prospective_scenario_graph = initialize_prospective_scenario_group_comparison_graph(self.number_of_groups)
+        self.group_comparison_prospective_scenario_figure = draw_prospective_scenario_group_comparison_graph(
+            self.group_comparison_prospective_scenario_graph,
+            self.reference_process_engine_data,
+            self.process_engines_data,
+            self.prospective_scenario_graphs_shared_y_scale,
+            [self.reference_process_engine_fingerprint] + self.process_engines_fingerprints
+        )
+
+        self.prospective_scenario_graphs_drawn = True
+
+
+    def _draw_groups_prospective_scenario_graphs(self) -> None:
+        """
+        Draws the prospective scenario graph of each group from the current process engines data.
+
+        #### Preconditions :
+        - The `self._initialize_prospective_scenario_graphs` function must be called before this function.
+        """
         # Initialize the prospective scenario graph for each group :
         self.prospective_scenarios_graphs = [
             initialize_prospective_scenario_graph(f"Scénario du groupe {index + 1}")
@@ -269,14 +341,7 @@ class FresqueAeroMapsUI:
                 )
             )
 
-        # Initialize the group comparison prospective scenario graph :
-        self.group_comparison_prospective_scenario_graph = initialize_prospective_scenario_group_comparison_graph(self.number_of_groups)
-        self.group_comparison_prospective_scenario_figure = draw_prospective_scenario_group_comparison_graph(
-            self.group_comparison_prospective_scenario_graph,
-            self.reference_process_engine_data,
-            self.process_engines_data,
-            self.prospective_scenario_graphs_shared_y_scale
-        )
+        self.groups_prospective_scenario_graphs_drawn = True
 
 
     def _update_prospective_scenario_graphs(self, old_number_of_groups: int) -> None:
@@ -294,25 +359,33 @@ class FresqueAeroMapsUI:
             return
 
         # Update the shared y-axis scale for the prospective scenario graphs :
-        self.prospective_scenario_graphs_shared_y_scale.min, self.prospective_scenario_graphs_shared_y_scale.max = get_prospective_scenario_y_scales(self.process_engines_data)
+        set_shared_y_scale(
+            self.prospective_scenario_graphs_shared_y_scale,
+            get_prospective_scenario_y_scales(self.process_engines_data, self.charts_data)
+        )
 
-        # Update the prospective scenario graphs list based on the new number of groups :
-        if self.number_of_groups > old_number_of_groups:
-            # Add new prospective scenario graphs for the new groups :
-            for index in range(self.number_of_groups - old_number_of_groups):
-                new_prospective_scenarios_graph = initialize_prospective_scenario_graph(f"Scénario du groupe {old_number_of_groups + index + 1}")
-                self.prospective_scenarios_graphs.append(new_prospective_scenarios_graph)
-                self.prospective_scenarios_figures.append(
-                    draw_prospective_scenario_graph(
-                        new_prospective_scenarios_graph,
-                        self.process_engines_data[old_number_of_groups + index],
-                        self.prospective_scenario_graphs_shared_y_scale
+        # The graphs not drawn yet will be drawn for the new number of groups :
+        if not self.prospective_scenario_graphs_drawn:
+            return
+
+        # Update the prospective scenario graphs of the groups based on the new number of groups (if they are drawn) :
+        if self.groups_prospective_scenario_graphs_drawn:
+            if self.number_of_groups > old_number_of_groups:
+                # Add new prospective scenario graphs for the new groups :
+                for index in range(self.number_of_groups - old_number_of_groups):
+                    new_prospective_scenarios_graph = initialize_prospective_scenario_graph(f"Scénario du groupe {old_number_of_groups + index + 1}")
+                    self.prospective_scenarios_graphs.append(new_prospective_scenarios_graph)
+                    self.prospective_scenarios_figures.append(
+                        draw_prospective_scenario_graph(
+                            new_prospective_scenarios_graph,
+                            self.process_engines_data[old_number_of_groups + index],
+                            self.prospective_scenario_graphs_shared_y_scale
+                        )
                     )
-                )
-        else:
-            # Remove prospective scenario graphs for the removed groups :
-            self.prospective_scenarios_graphs = self.prospective_scenarios_graphs[:self.number_of_groups]
-            self.prospective_scenarios_figures = self.prospective_scenarios_figures[:self.number_of_groups]
+            else:
+                # Remove prospective scenario graphs for the removed groups :
+                self.prospective_scenarios_graphs = self.prospective_scenarios_graphs[:self.number_of_groups]
+                self.prospective_scenarios_figures = self.prospective_scenarios_figures[:self.number_of_groups]
 
         # Update the group comparison prospective scenario graph :
         self.group_comparison_prospective_scenario_graph = initialize_prospective_scenario_group_comparison_graph(self.number_of_groups)
@@ -320,7 +393,8 @@ class FresqueAeroMapsUI:
             self.group_comparison_prospective_scenario_graph,
             self.reference_process_engine_data,
             self.process_engines_data,
-            self.prospective_scenario_graphs_shared_y_scale
+            self.prospective_scenario_graphs_shared_y_scale,
+            [self.reference_process_engine_fingerprint] + self.process_engines_fingerprints
         )
 
 
@@ -332,9 +406,20 @@ class FresqueAeroMapsUI:
         - The `self._initialize_process_engines` function must be called before this function.
         """
         # Initialize a shared y-axis for all multidisciplinary graphs (make them all share the same scale) :
-        min_y, max_y = get_multidisciplinary_graphs_y_scales(self.process_engines_data)
+        min_y, max_y = get_multidisciplinary_graphs_y_scales(self.process_engines_data, self.charts_data)
         self.multidisciplinary_graphs_shared_y_scale = LinearScale(min = min_y, max = max_y)
 
+        # The graphs are only drawn when their section is first expanded (see `self._draw_multidisciplinary_graphs`) :
+        self.multidisciplinary_graphs_drawn = False
+
+
+    def _draw_multidisciplinary_graphs(self) -> None:
+        """
+        Draws the multidisciplinary graphs from the current process engines data.
+
+        #### Preconditions :
+        - The `self._initialize_multidisciplinary_graphs` function must be called before this function.
+        """
         # Initialize the reference multidisciplinary graph :
         self.reference_multidisciplinary_graph = initialize_multidisciplinary_graph("Scénario de référence")
         self.reference_multidisciplinary_figure = draw_multidisciplinary_graph(
@@ -358,6 +443,8 @@ class FresqueAeroMapsUI:
                 )
             )
 
+        self.multidisciplinary_graphs_drawn = True
+
 
     def _update_multidisciplinary_graphs(self, old_number_of_groups: int) -> None:
         """
@@ -374,7 +461,14 @@ class FresqueAeroMapsUI:
             return
 
         # Update the shared y-axis scale for the multidisciplinary graphs :
-        self.multidisciplinary_graphs_shared_y_scale.min, self.multidisciplinary_graphs_shared_y_scale.max = get_multidisciplinary_graphs_y_scales(self.process_engines_data)
+        set_shared_y_scale(
+            self.multidisciplinary_graphs_shared_y_scale,
+            get_multidisciplinary_graphs_y_scales(self.process_engines_data, self.charts_data)
+        )
+
+        # The graphs not drawn yet will be drawn for the new number of groups :
+        if not self.multidisciplinary_graphs_drawn:
+            return
 
         # Update the multidisciplinary graphs list based on the new number of groups :
         if self.number_of_groups > old_number_of_groups:
@@ -454,7 +548,7 @@ class FresqueAeroMapsUI:
 
         # Create the update button to update all the figures :
         self.update_button = draw_update_button()
-        self.update_button.on_click(lambda button: self._update_figures())
+        self.update_button.on_click(lambda button: self._request_figures_update())
 
         self.update_button_box = Box(
             [self.update_button],
@@ -499,61 +593,99 @@ class FresqueAeroMapsUI:
         - The `self.initialize_prospective_scenario_graphs` function must be called before this function.
 
         #### Returns :
-        - `VBox` : A vertical box containing the prospective scenario graphs title, reference prospective scenario box, prospective scenario boxes and group comparison prospective scenario box.
+        - `VBox` : A vertical box containing the prospective scenario graphs title and the collapsible prospective scenario figures (reference prospective scenario box, prospective scenario boxes and group comparison prospective scenario box).
         """
         # Create a widget for the title of the reference prospective scenario section :
         self.prospective_scenario_graphs_title = draw_prospective_scenario_graphs_title()
 
-        # Create the boxes for the prospective scenario figures :
-        self.reference_prospective_scenario_box = Box(
-            [self.reference_prospective_scenario_figure],
-            layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT)
+        # Create the collapsible box of the prospective scenario figures (filled when it is first expanded) :
+        self.prospective_scenario_figures_box = VBox([], layout = Layout(**SECTION_VBOX_LAYOUT))
+        self.prospective_scenario_accordion = draw_section_accordion(
+            self.prospective_scenario_figures_box,
+            "Trajectoires des émissions de CO₂ des scénarios",
+            PROSPECTIVE_SCENARIO_SECTION_EXPANDED
         )
+        self.prospective_scenario_accordion.observe(lambda change: self._on_prospective_scenario_section_expanded(), names = "selected_index")
 
-        self.prospective_scenarios_boxes = create_prospective_scenarios_boxes(self.prospective_scenarios_figures)
-
-        # Create the box for the group comparison prospective scenario figure :
-        self.group_comparison_prospective_scenario_box = Box(
-            [self.group_comparison_prospective_scenario_figure],
-            layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT)
+        # Create the collapsible box of the figures of the groups, inside the section (filled when it is first expanded, so the expanded section draws two figures whatever the number of groups) :
+        self.prospective_scenarios_boxes = VBox([], layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT))
+        self.groups_prospective_scenario_accordion = draw_section_accordion(
+            self.prospective_scenarios_boxes,
+            "Trajectoires des scénarios de chaque groupe",
+            PROSPECTIVE_SCENARIO_GROUPS_SECTION_EXPANDED
         )
+        self.groups_prospective_scenario_accordion.observe(lambda change: self._on_groups_prospective_scenario_section_expanded(), names = "selected_index")
 
         # Create the prospective scenario section :
         self.prospective_scenario_section = VBox(
             [
                 self.prospective_scenario_graphs_title,
-                self.reference_prospective_scenario_box,
-                self.prospective_scenarios_boxes,
-                self.group_comparison_prospective_scenario_box
+                self.prospective_scenario_accordion
             ],
             layout = Layout(**SECTION_VBOX_LAYOUT)
         )
 
+        self._on_prospective_scenario_section_expanded()
+
         return self.prospective_scenario_section
 
 
     def _update_prospective_scenario_section(self) -> VBox:
         """
-        Updates the prospective scenario section of the interface.
+        Updates the prospective scenario section of the interface (only if its figures are drawn).
         """
-        # Rebuild the prospective scenario section with the updated prospective scenario boxes :
-        self.prospective_scenarios_boxes = create_prospective_scenarios_boxes(self.prospective_scenarios_figures)
+        if not self.prospective_scenario_graphs_drawn:
+            return self.prospective_scenario_section
 
-        # Update the prospective scenario section with the new prospective scenario boxes :
+        # Rebuild the boxes of the prospective scenario figures :
+        self.reference_prospective_scenario_box = Box(
+            [self.reference_prospective_scenario_figure],
+            layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT)
+        )
+        if self.groups_prospective_scenario_graphs_drawn:
+            self.prospective_scenarios_boxes.children = self.prospective_scenarios_figures
         self.group_comparison_prospective_scenario_box = Box(
             [self.group_comparison_prospective_scenario_figure],
             layout = Layout(**PROSPECTIVE_SCENARIO_BOX_LAYOUT)
         )
-        self.prospective_scenario_section.children = [
-            self.prospective_scenario_graphs_title,
+
+        # Update the prospective scenario section with the new boxes :
+        self.prospective_scenario_figures_box.children = [
             self.reference_prospective_scenario_box,
-            self.prospective_scenarios_boxes,
+            self.groups_prospective_scenario_accordion,
             self.group_comparison_prospective_scenario_box
         ]
 
         return self.prospective_scenario_section
 
 
+    def _on_prospective_scenario_section_expanded(self) -> None:
+        """
+        Draws the prospective scenario figures (from the current process engines data) the first time their section is expanded.
+        """
+        if self.prospective_scenario_accordion.selected_index is None or self.prospective_scenario_graphs_drawn:
+            return
+
+        # Draw the figures (timed as the "draw" stage of the metrics) :
+        with STAGE_DURATION.time(stage = "draw"):
+            self._draw_prospective_scenario_graphs()
+        self._on_groups_prospective_scenario_section_expanded()
+        self._update_prospective_scenario_section()
+
+
+    def _on_groups_prospective_scenario_section_expanded(self) -> None:
+        """
+        Draws the prospective scenario figures of the groups (from the current process engines data) the first time their sub-section is expanded.
+        """
+        if self.groups_prospective_scenario_accordion.selected_index is None or self.groups_prospective_scenario_graphs_drawn:
+            return
+
+        # Draw the figures (timed as the "draw" stage of the metrics) :
+        with STAGE_DURATION.time(stage = "draw"):
+            self._draw_groups_prospective_scenario_graphs()
+        self.prospective_scenarios_boxes.children = self.prospective_scenarios_figures
+
+
     def _build_multidisciplinary_section(self) -> VBox:
         """
         Builds the multidisciplinary section of the interface.
@@ -562,35 +694,42 @@ class FresqueAeroMapsUI:
         - The `self.initialize_multidisciplinary_graphs` function must be called before this function.
 
         #### Returns :
-        - `VBox` : A vertical box containing the multidisciplinary graphs title and multidisciplinary boxes.
+        - `VBox` : A vertical box containing the multidisciplinary graphs title and the collapsible multidisciplinary boxes.
         """
         # Create a widget for the title of the multidisciplinary graphs section :
         self.multidisciplinary_graphs_title = draw_multidisciplinary_graphs_title()
 
-        # Create the boxes for the multidisciplinary figures (each box contains two figures) :
-        self.multidisciplinary_boxes = create_multidisciplinary_boxes(
-            self.number_of_groups,
-            self.reference_multidisciplinary_figure,
-            self.multidisciplinary_figures
+        # Create the collapsible box of the multidisciplinary figures (filled when it is first expanded) :
+        self.multidisciplinary_figures_box = VBox([], layout = Layout(**SECTION_VBOX_LAYOUT))
+        self.multidisciplinary_accordion = draw_section_accordion(
+            self.multidisciplinary_figures_box,
+            "Budgets des ressources consommées par les scénarios",
+            MULTIDISCIPLINARY_SECTION_EXPANDED
         )
+        self.multidisciplinary_accordion.observe(lambda change: self._on_multidisciplinary_section_expanded(), names = "selected_index")
 
         # Create the multidisciplinary section :
         self.multidisciplinary_section = VBox(
             [
                 self.multidisciplinary_graphs_title,
-                *self.multidisciplinary_boxes
+                self.multidisciplinary_accordion
             ],
             layout = Layout(**SECTION_VBOX_LAYOUT)
         )
 
+        self._on_multidisciplinary_section_expanded()
+
         return self.multidisciplinary_section
 
 
     def _update_multidisciplinary_section(self) -> VBox:
         """
-        Updates the multidisciplinary section of the interface.
+        Updates the multidisciplinary section of the interface (only if its figures are drawn).
         """
-        # Rebuild the multidisciplinary section with the updated multidisciplinary boxes :
+        if not self.multidisciplinary_graphs_drawn:
+            return self.multidisciplinary_section
+
+        # Rebuild the boxes of the multidisciplinary figures (each box contains two figures) :
         self.multidisciplinary_boxes = create_multidisciplinary_boxes(
             self.number_of_groups,
             self.reference_multidisciplinary_figure,
@@ -598,36 +737,181 @@ class FresqueAeroMapsUI:
         )
 
         # Update the multidisciplinary section with the new multidisciplinary boxes :
-        self.multidisciplinary_section.children = [
-            self.multidisciplinary_graphs_title,
-            *self.multidisciplinary_boxes
-        ]
+        self.multidisciplinary_figures_box.children = self.multidisciplinary_boxes
 
         return self.multidisciplinary_section
 
 
-    def _update_figures(self, _button: Button = None) -> None:
+    def _on_multidisciplinary_section_expanded(self) -> None:
         """
-        Updates the figures based on the selected checkboxes and the process engines.
+        Draws the multidisciplinary figures (from the current process engines data) the first time their section is expanded.
         """
-        # Compute the process engines data for each group based on the selected checkboxes :
-        self._compute_process_engines()
+        if self.multidisciplinary_accordion.selected_index is None or self.multidisciplinary_graphs_drawn:
+            return
+
+        # Draw the figures (timed as the "draw" stage of the metrics) :
+        with STAGE_DURATION.time(stage = "draw"):
+            self._draw_multidisciplinary_graphs()
+        self._update_multidisciplinary_section()
 
-        # Update the figures shared y-axis :
-        self.prospective_scenario_graphs_shared_y_scale.min, self.prospective_scenario_graphs_shared_y_scale.max = get_prospective_scenario_y_scales(self.process_engines_data)
-        self.multidisciplinary_graphs_shared_y_scale.min, self.multidisciplinary_graphs_shared_y_scale.max = get_multidisciplinary_graphs_y_scales(self.process_engines_data)
 
-        # Update each figure based on the selected checkboxes :
-        for index in range(self.number_of_groups):
-            self.prospective_scenarios_graphs[index].update(self.process_engines_data[index])
-            self.multidisciplinary_graphs[index].update(self.process_engines_data[index])
+    def _get_changed_groups_selection(self) -> Tuple[List[int], List[Optional[List[str]]], List[str]]:
+        """
+        Takes a snapshot of the cards selected by every group, and of the groups whose scenario changed since the last update.
 
-        self.group_comparison_prospective_scenario_graph.update(
-            self.reference_process_engine_data,
-            self.process_engines_data
+        If the charts configuration was reloaded since the last update, all the groups are considered changed.
+
+        #### Returns :
+        - `List[int]` : The indices of the groups whose scenario changed.
+        - `List[Optional[List[str]]]` : The identifiers of the cards selected by every group.
+        - `List[str]` : The fingerprints of the scenarios of every group.
+        """
+        cards_ids_lists = get_selected_cards_ids_lists(self.checkboxes_lists)
+        fingerprints    = get_cards_ids_lists_fingerprints(cards_ids_lists)
+
+        changed_groups_indices = (
+            get_changed_groups_indices(self.process_engines_fingerprints, fingerprints)
+            if get_charts_configuration() is self.charts_configuration
+            else list(range(self.number_of_groups))
+        )
+
+        return changed_groups_indices, cards_ids_lists, fingerprints
+
+
+    def _compute_figures_update(
+            self,
+            process_engines: List[ProcessEngine],
+            groups_indices: List[int],
+            cards_ids_lists: List[Optional[List[str]]],
+            fingerprints: List[str]
+        ) -> Tuple[List[int], List[Dict[str, Any]], List[str], Optional[Tuple[ChartsConfiguration, ScenarioResult, str]]]:
+        """
+        Computes the process engines data of a figures update (this is the part of the update run in the background).
+
+        If the charts configuration was reloaded since the figures were drawn, all the groups and the reference scenario are computed again (with the variables of the new formulas).
+
+        #### Arguments :
+        - `process_engines` : The process engines of every group.
+        - `groups_indices` : The indices of the groups whose scenario changed.
+        - `cards_ids_lists` : The identifiers of the cards selected by every group.
+        - `fingerprints` : The fingerprints of the scenarios of every group.
+
+        #### Returns :
+        - `List[int]` : The indices of the computed groups.
+        - `List[Dict[str, Any]]` : The computed data of these groups.
+        - `List[str]` : The fingerprints of the scenarios of these groups.
+        - `Optional[Tuple]` : The reloaded charts configuration, with the reference scenario data and fingerprint computed for it (None if the configuration was not reloaded).
+        """
+        reference_scenario = None
+        charts_configuration = get_charts_configuration()
+        if charts_configuration is not self.charts_configuration:
+            groups_indices = list(range(len(process_engines)))
+            reference_scenario = (charts_configuration, *get_reference_scenario())
+
+        process_engines_data = compute_process_engines(
+            [process_engines[index] for index in groups_indices],
+            [cards_ids_lists[index] for index in groups_indices]
+        )
+
+        return groups_indices, process_engines_data, [fingerprints[index] for index in groups_indices], reference_scenario
+
+
+    def _request_figures_update(self, _button: Button = None) -> None:
+        """
+        Requests an update of the figures based on the selected checkboxes, without blocking the interface.
+
+        Only the groups whose scenario changed since the last update are computed and updated.
+        The process engines data is computed in the background, and the figures are only updated if no newer update has been requested meanwhile.
+        """
+        # Take a snapshot of the current selection (the checkboxes may change during the computation) :
+        changed_groups_indices, cards_ids_lists, fingerprints = self._get_changed_groups_selection()
+        if not changed_groups_indices:
+            self.update_runner.invalidate() # The displayed figures already match the selection.
+            return
+
+        process_engines = list(self.process_engines)
+
+        self.update_runner.submit(
+            lambda: self._compute_figures_update(process_engines, changed_groups_indices, cards_ids_lists, fingerprints),
+            lambda figures_update: self._apply_process_engines_data(*figures_update)
         )
 
 
+    def _apply_process_engines_data(
+            self,
+            groups_indices: List[int],
+            process_engines_data: List[Dict[str, Any]],
+            fingerprints: List[str],
+            reference_scenario: Optional[Tuple[ChartsConfiguration, ScenarioResult, str]] = None
+        ) -> None:
+        """
+        Updates the figures with the computed process engines data of the given groups (the figures of the other groups are left untouched).
+
+        #### Arguments :
+        - `groups_indices` : The indices of the updated groups.
+        - `process_engines_data` : The computed data of each given group (in the same order as `groups_indices`).
+        - `fingerprints` : The fingerprints of the scenarios of the updated groups (in the same order as `groups_indices`).
+        - `reference_scenario` : The reloaded charts configuration, with the reference scenario data and fingerprint computed for it (see `_compute_figures_update`). Defaults to None (the configuration was not reloaded).
+        """
+        for index, process_engine_data, fingerprint in zip(groups_indices, process_engines_data, fingerprints):
+            self.process_engines_data[index]         = process_engine_data
+            self.process_engines_fingerprints[index] = fingerprint
+
+        # Take the reloaded charts configuration into account (all the groups were computed again for it) :
+        if reference_scenario is not None:
+            self._refresh_charts_configuration(*reference_scenario)
+
+        # Prepare the chart data of the updated groups (each formula is evaluated once for all of them) :
+        self._prepare_groups_charts_data(groups_indices)
+
+        # Update the figures (timed as the "render" stage of the metrics) :
+        with STAGE_DURATION.time(stage = "render"):
+            # Update the figures shared y-axis (only if an extreme value moved) :
+            set_shared_y_scale(
+                self.prospective_scenario_graphs_shared_y_scale,
+                get_prospective_scenario_y_scales(self.process_engines_data, self.charts_data)
+            )
+            set_shared_y_scale(
+                self.multidisciplinary_graphs_shared_y_scale,
+                get_multidisciplinary_graphs_y_scales(self.process_engines_data, self.charts_data)
+            )
+
+            # Update the figures of the updated groups (the figures of a section not expanded yet are drawn from the current data when it is) :
+            for index in groups_indices:
+                if self.groups_prospective_scenario_graphs_drawn:
+                    self.prospective_scenarios_graphs[index].update(self.process_engines_data[index], self.charts_data[index])
+                if self.multidisciplinary_graphs_drawn:
+                    self.multidisciplinary_graphs[index].update(self.process_engines_data[index], self.charts_data[index])
+
+            if groups_indices and self.prospective_scenario_graphs_drawn:
+                self.group_comparison_prospective_scenario_graph.update(
+                    self.reference_process_engine_data,
+                    self.process_engines_data,
+                    [self.reference_process_engine_fingerprint] + self.process_engines_fingerprints
+                )
+
+
+    def _refresh_charts_configuration(self, charts_configuration: ChartsConfiguration, reference_process_engine_data: ScenarioResult, reference_process_engine_fingerprint: str) -> None:
+        """
+        Takes a reloaded charts configuration into account : the reference figures are updated with the reference scenario computed for it (nothing is computed here).
+
+        #### Arguments :
+        - `charts_configuration` : The reloaded charts configuration.
+        - `reference_process_engine_data` : The reference scenario data computed for this configuration.
+        - `reference_process_engine_fingerprint` : The fingerprint of the reference scenario.
+        """
+        self.charts_configuration = charts_configuration
+        self.reference_process_engine_data        = reference_process_engine_data
+        self.reference_process_engine_fingerprint = reference_process_engine_fingerprint
+
+        # Look up the chart data of the reference scenario (it was prepared along with it in `get_reference_scenario`, so this call only reads the cache) :
+        reference_chart_data = prepare_charts_data([self.reference_process_engine_data])[0]
+        if self.prospective_scenario_graphs_drawn:
+            self.reference_prospective_scenario_graph.update(self.reference_process_engine_data, reference_chart_data)
+        if self.multidisciplinary_graphs_drawn:
+            self.reference_multidisciplinary_graph.update(self.reference_process_engine_data, reference_chart_data)
+
+
     def _on_group_selector_change(self, _button: Button = None) -> None:
         """
         Handles the change event of the group selector slider.
@@ -640,13 +924,17 @@ class FresqueAeroMapsUI:
         if old_number_of_groups == self.number_of_groups:
             return
 
+        # Discard the pending figures updates (they were computed for the previous number of groups) :
+        self.update_runner.invalidate()
+
         # Update the checkboxes lists and process engines :
         self._update_checkboxes_lists(old_number_of_groups)
         self._update_process_engines(old_number_of_groups)
 
-        # Update the prospective scenario graphs and multidisciplinary graphs :
-        self._update_prospective_scenario_graphs(old_number_of_groups)
-        self._update_multidisciplinary_graphs(old_number_of_groups)
+        # Update the prospective scenario graphs and multidisciplinary graphs (timed as the "draw" stage of the metrics) :
+        with STAGE_DURATION.time(stage = "draw"):
+            self._update_prospective_scenario_graphs(old_number_of_groups)
+            self._update_multidisciplinary_graphs(old_number_of_groups)
 
         # Rebuild the interface elements impacted by the number of groups change :
         self._update_checkboxes_grid_section()
@@ -674,3 +962,79 @@ class FresqueAeroMapsUI:
         )
 
         return self.interface
+
+
+    def _get_drawn_graphs(self) -> List[BaseGraph]:
+        """
+        Get the graphs drawn by the interface (the graphs of a section not expanded yet are not drawn).
+
+        #### Returns :
+        - `List[BaseGraph]` : The drawn graphs.
+        """
+        graphs = []
+        if self.prospective_scenario_graphs_drawn:
+            graphs.extend([self.reference_prospective_scenario_graph, self.group_comparison_prospective_scenario_graph])
+        if self.groups_prospective_scenario_graphs_drawn:
+            graphs.extend(self.prospective_scenarios_graphs)
+        if self.multidisciplinary_graphs_drawn:
+            graphs.extend([self.reference_multidisciplinary_graph, *self.multidisciplinary_graphs])
+
+        return graphs
+
+
+    def _get_widgets(self) -> List[Widget]:
+        """
+        Get all the widgets of the interface (sections, checkboxes and figures, with their layouts, styles, marks and scales).
+
+        #### Returns :
+        - `List[Widget]` : The distinct widgets of the interface.
+        """
+        return get_widgets_tree([
+            getattr(self, "interface", None), # Only assembled by `self.display_interface`.
+            self.explanation_section,
+            self.group_selector_section,
+            self.checkboxes_grid_section,
+            self.prospective_scenario_section,
+            self.multidisciplinary_section,
+            self.checkboxes_lists,
+            [graph.figure for graph in self._get_drawn_graphs()]
+        ])
+
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """
+        Get the memory accounting of the interface (see `MemoryBudget.register_session`).
+
+        The scenarios data and the charts data may be shared with other sessions (for instance, the reference scenario), they are counted in each session using them.
+        The widgets are counted with their estimated memory in a Panel session (see `WIDGET_MEMORY_SIZE`), which is most of the memory of a session.
+
+        #### Returns :
+        - `Dict[str, int]` : The numbers of process engines (`process_engines`) and widgets (`widgets`),
+        and the approximate sizes of the widgets (`widgets_bytes`), the scenarios data (`scenarios_bytes`), the charts data (`charts_data_bytes`) and the figures data (`figures_bytes`), in bytes.
+        """
+        scenarios_results = {id(process_data): process_data for process_data in [self.reference_process_engine_data, *self.process_engines_data]}
+        charts_data       = {id(chart_data): chart_data for chart_data in self.charts_data if chart_data is not None}
+
+        number_of_widgets = len(self._get_widgets())
+
+        return {
+            "process_engines": len(self.process_engines),
+            "widgets": number_of_widgets,
+            "widgets_bytes": number_of_widgets * WIDGET_MEMORY_SIZE,
+            "scenarios_bytes": sum(scenario_result.get_memory_size() for scenario_result in scenarios_results.values()),
+            "charts_data_bytes": sum(chart_data.get_memory_size() for chart_data in charts_data.values()),
+            "figures_bytes": sum(graph.get_memory_size() for graph in self._get_drawn_graphs())
+        }
+
+
+    def close(self, notify_frontend: bool = True) -> None:
+        """
+        Releases the interface once it is not displayed anymore (for instance, when its Panel session is destroyed).
+
+        The pending figures updates are discarded, and the widgets are closed : the widgets library keeps every widget until it is closed, and the widgets callbacks keep the whole interface alive.
+
+        #### Arguments :
+        - `notify_frontend (bool)` : If False, the closing messages of the widgets are not sent (when the document of the session is already destroyed). Defaults to True.
+        """
+        self.update_runner.close()
+        close_widgets(self._get_widgets(), notify_frontend = notify_frontend)
@@ -1,17 +1,22 @@
 from typing import Dict
 
-from crud.crud_cards import get_cards_name
 
 
 
-
-# Define the general constants:
-CARDS_NAMES = get_cards_name()
-
+# Define the general constants (the cards are read from the cards registry when the interface is built, see `get_cards_registry`) :
 DEFAULT_NUMBER_OF_GROUPS = 2
 MIN_NUMBER_OF_GROUPS = 1
 MAX_NUMBER_OF_GROUPS = 10
 
+# Sections of figures expanded when the interface is opened (the figures of a collapsed section are only drawn when it is first expanded) :
+# the prospective scenario section draws the reference and group comparison figures, and its sub-section the figure of each group (collapsed, so the first paint does not depend on the number of groups).
+PROSPECTIVE_SCENARIO_SECTION_EXPANDED        = True
+PROSPECTIVE_SCENARIO_GROUPS_SECTION_EXPANDED = False
+MULTIDISCIPLINARY_SECTION_EXPANDED           = False
+
+# Estimated memory of a widget in a Panel session, in bytes : its state, its comm and its Bokeh model (calibrated with `benchmarks/load_test.py`, about 3.6 MiB for the ~300 widgets of a session) :
+WIDGET_MEMORY_SIZE = 12 * 1024
+
 # Define the FresqueAeroMaps application graphs colors:
 COLORS_PROSPECTIVE_SCENARIO = [
     "#8c564b", "#000000", "#d62728", "#1f77b4",
@@ -162,3 +167,7 @@ MULTIDISCIPLINARY_GRAPH_AND_LEGEND_VBOX_LAYOUT = {
 SECTION_VBOX_LAYOUT = {
     "width": "100%"
 }
+
+SECTION_ACCORDION_LAYOUT = {
+    "width": "100%"
+}
@@ -1,17 +1,24 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from threading import Lock
 
 from core.aeromaps_utils.process_engine import ProcessEngine
+from core.aeromaps_utils.compute_pool import compute_scenarios
+from core.aeromaps_utils.charts_configuration import ChartsConfiguration, get_charts_configuration
+from core.aeromaps_utils.scenario_parameters import get_scenario_fingerprint
+from core.aeromaps_utils.scenario_result import ScenarioResult
+from core.metrics import STAGE_DURATION
+
+from crud.crud_cards import get_cards_registry
 
 from bqplot import Figure, LinearScale
 from bqplot_figures.prospective_scenario_graph import ProspectiveScenarioGraph, ProspectiveScenarioGroupComparisonGraph
 from bqplot_figures.multidisciplinary_graph import MultidisciplinaryGraph
+from bqplot_figures.utils.chart_data import prepare_charts_data
 
 from ipywidgets import VBox, HBox, Layout, Checkbox, HTML, Label
 
-from crud.crud_cards import get_card_id_by_name
-
 from ui.utils.fresque_aeromaps_UI_constants import (
-    CARDS_NAMES,
     get_style_string,
     COLORS_PROSPECTIVE_SCENARIO,
     COLORS_PROSPECTIVE_SCENARIO_GROUP_COMPARISON,
@@ -38,31 +45,127 @@ def initialize_process_engine() -> ProcessEngine:
     return ProcessEngine()
 
 
-def compute_process_engine(
-    process_engine: ProcessEngine,
-    checkboxes: Optional[List[Checkbox]] = []
-) -> Dict[str, Any]:
+# Reference scenario shared read-only by every session of the server, with the charts configuration it was prepared for (see `get_reference_scenario`) :
+_REFERENCE_SCENARIO: Optional[Tuple[ChartsConfiguration, ScenarioResult, str]] = None
+_REFERENCE_SCENARIO_LOCK = Lock()
+
+
+def get_reference_scenario() -> Tuple[ScenarioResult, str]:
     """
-    Computes the data for a single process engine based on the selected checkbox widgets.
+    Get the reference scenario (no card selected), computed once per server process and shared read-only by every session.
+
+    The first call computes the scenario and prepares its chart data (historic line, prospective lines, aspects areas and bars), which are then kept as long as the server runs
+    (unlike the entries of the `SCENARIO_STORE`, they are never evicted). They are computed again when the charts configuration changes.
+
+    #### Returns :
+    - `Tuple[ScenarioResult, str]` : The read-only computed data of the reference scenario, and its fingerprint.
+    """
+    global _REFERENCE_SCENARIO
+
+    charts_configuration = get_charts_configuration()
+    with _REFERENCE_SCENARIO_LOCK: # The sessions opened meanwhile wait for the first computation instead of computing it again.
+        if _REFERENCE_SCENARIO is None or _REFERENCE_SCENARIO[0] is not charts_configuration:
+            scenario_result = initialize_process_engine().compute(None)
+            prepare_charts_data([scenario_result]) # The chart data is kept as long as the scenario result is alive.
+            _REFERENCE_SCENARIO = (charts_configuration, scenario_result, get_scenario_fingerprint(None))
+
+        return _REFERENCE_SCENARIO[1], _REFERENCE_SCENARIO[2]
+
+
+def get_selected_cards_ids(checkboxes: Optional[List[Checkbox]] = []) -> List[str]:
+    """
+    Get the identifiers of the cards selected with the checkbox widgets of a group.
 
     #### Parameters :
-    - `process_engine (ProcessEngine)` : The process engine to compute.
     - `checkboxes (List[Checkbox])` : A list of checkbox widgets representing the selected cards. If empty, no cards are selected. Defaults to [].
 
     #### Returns :
-    - `Dict[str, Any]` : The computed data for the process engine.
-    """
-    # Get the selected card IDs for the current group :
-    selected_ids = []
-    for index_checkbox, checkbox in enumerate(checkboxes):
-        if checkbox.value:
-            # If the checkbox is checked, get the card ID by its name :
-            selected_ids.append(get_card_id_by_name(CARDS_NAMES[index_checkbox]))
-
-    # Compute the process engine with the selected card IDs :
-    return process_engine.compute(
-        tuple(selected_ids) if selected_ids else None
-    )
+    - `List[str]` : The identifiers of the selected cards.
+    """
+    # The checkboxes share the indices of the cards identifiers :
+    cards_ids = get_cards_registry().ids
+    return [
+        cards_ids[index_checkbox]
+        for index_checkbox, checkbox in enumerate(checkboxes)
+        if checkbox.value
+    ]
+
+
+def get_selected_cards_ids_lists(checkboxes_lists: List[List[Checkbox]]) -> List[Optional[List[str]]]:
+    """
+    Get the identifiers of the cards selected by each group.
+
+    #### Parameters :
+    - `checkboxes_lists (List[List[Checkbox]])` : The list of checkbox widgets of each group.
+
+    #### Returns :
+    - `List[Optional[List[str]]]` : The identifiers of the cards selected by each group (None if a group has not selected any card).
+    """
+    return [get_selected_cards_ids(checkboxes) or None for checkboxes in checkboxes_lists]
+
+
+def get_cards_ids_lists_fingerprints(cards_ids_lists: List[Optional[List[str]]]) -> List[str]:
+    """
+    Get the fingerprint of the scenario of each group (two groups, or two successive selections of a group, leading to the same effective parameters share the same fingerprint).
+
+    #### Parameters :
+    - `cards_ids_lists (List[Optional[List[str]]])` : The identifiers of the cards selected by each group (see `get_selected_cards_ids_lists`).
+
+    #### Returns :
+    - `List[str]` : The fingerprint of the scenario of each group, in the same order as the groups.
+    """
+    return [get_scenario_fingerprint(cards_ids) for cards_ids in cards_ids_lists]
+
+
+def get_changed_groups_indices(
+    old_fingerprints: List[Optional[str]],
+    new_fingerprints: List[str]
+) -> List[int]:
+    """
+    Get the indices of the groups whose scenario changed.
+
+    #### Parameters :
+    - `old_fingerprints (List[Optional[str]])` : The fingerprints of the scenarios currently displayed (None for a group which is not displayed yet).
+    - `new_fingerprints (List[str])` : The fingerprints of the scenarios currently selected.
+
+    #### Returns :
+    - `List[int]` : The indices of the groups whose scenario fingerprint changed.
+    """
+    return [
+        index
+        for index, new_fingerprint in enumerate(new_fingerprints)
+        if index >= len(old_fingerprints) or old_fingerprints[index] != new_fingerprint
+    ]
+
+
+def compute_process_engines(
+    process_engines: List[ProcessEngine],
+    cards_ids_lists: List[Optional[List[str]]]
+) -> List[Dict[str, Any]]:
+    """
+    Computes the data for several process engines at once (in parallel) based on the cards selected by each group.
+    The groups without any selected card share the reference scenario of the server (see `get_reference_scenario`).
+
+    #### Parameters :
+    - `process_engines (List[ProcessEngine])` : The process engines to compute (one per group).
+    - `cards_ids_lists (List[Optional[List[str]]])` : The identifiers of the cards selected by each group (in the same order as the process engines, see `get_selected_cards_ids_lists`).
+
+    #### Returns :
+    - `List[Dict[str, Any]]` : The computed data for each process engine, in the same order as the process engines.
+    """
+    with STAGE_DURATION.time(stage = "compute_scenarios"):
+        computed_groups_indices = [index for index, cards_ids in enumerate(cards_ids_lists) if cards_ids]
+        processes_data = [get_reference_scenario()[0] if not cards_ids else None for cards_ids in cards_ids_lists]
+
+        if computed_groups_indices:
+            computed_processes_data = compute_scenarios(
+                [process_engines[index] for index in computed_groups_indices],
+                [cards_ids_lists[index] for index in computed_groups_indices]
+            )
+            for index, process_data in zip(computed_groups_indices, computed_processes_data):
+                processes_data[index] = process_data
+
+        return processes_data
 
 
 #########################
@@ -142,7 +245,8 @@ def draw_prospective_scenario_group_comparison_graph(
     group_comparison_prospective_scenario_graph: ProspectiveScenarioGroupComparisonGraph,
     reference_process_engine_data: Dict[str, Any],
     process_engines_data: List[Dict[str, Any]],
-    shared_y_scale: Optional[LinearScale] = None
+    shared_y_scale: Optional[LinearScale] = None,
+    scenarios_keys: Optional[List[str]] = None
 ) -> Figure:
     """
     Draws the prospective scenario group comparison graph.
@@ -152,6 +256,7 @@ def draw_prospective_scenario_group_comparison_graph(
     - `reference_process_engine_data` : The data of the reference process engine to use for the comparison.
     - `process_engines_data` : A list of computed data for each process engine.
     - `shared_y_scale` : An optional shared y-axis scale for the group comparison graph. If not provided, the graph will have its own scale.
+    - `scenarios_keys` : The fingerprints of the reference scenario followed by the fingerprints of the groups scenarios, to merge the identical scenarios without comparing their lines. Defaults to None.
 
     #### Returns :
     - `Figure` : The drawn figure for the prospective scenario group comparison graph.
@@ -159,7 +264,8 @@ def draw_prospective_scenario_group_comparison_graph(
     figure = group_comparison_prospective_scenario_graph.draw(
         reference_process_engine_data,
         process_engines_data,
-        y_scale = shared_y_scale
+        y_scale = shared_y_scale,
+        scenarios_keys = scenarios_keys
     )
     figure.fig_margin = {"top": 60, "bottom": 60, "left": 60, "right": 180}
     figure.layout = Layout(**PROSPECTIVE_SCENARIO_GRAPH_LAYOUT)
@@ -240,3 +346,24 @@ def draw_multidisciplinary_graph(
         [figure, figure_legend],
         layout = Layout(**MULTIDISCIPLINARY_GRAPH_AND_LEGEND_VBOX_LAYOUT)
     )
+
+
+#################
+# GRAPHS UPDATE #
+#################
+def set_shared_y_scale(shared_y_scale: LinearScale, y_bounds: Tuple[float, float]) -> bool:
+    """
+    Sets the bounds of a shared y-scale, only if they changed (so the browser is not asked to redraw all the figures sharing the scale for nothing).
+
+    #### Parameters :
+    - `shared_y_scale (LinearScale)` : The shared y-scale.
+    - `y_bounds (Tuple[float, float])` : The new minimal and maximal values of the scale.
+
+    #### Returns :
+    - `bool` : True if the bounds of the scale changed, False otherwise.
+    """
+    if (shared_y_scale.min, shared_y_scale.max) == tuple(y_bounds):
+        return False
+
+    shared_y_scale.min, shared_y_scale.max = y_bounds
+    return True
@@ -0,0 +1,172 @@
+from typing import Any, Callable, List, Optional
+
+import logging
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event, Lock
+
+
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LatestUpdateRunner:
+    """
+    Runs the updates of an interface off the event loop, keeping only the result of the latest update request.
+
+    Each update is split in two steps :
+    - `compute` : The slow part of the update (the AeroMAPS computations), run in a background thread.
+    - `apply` : The update of the widgets with the computed result, run through the `dispatch` function (on the event loop).
+
+    A new request cancels the older requests that have not started yet, and discards the result of the older requests that are already running.
+
+    #### Arguments :
+    - `dispatch (Optional[Callable[[Callable[[], None]], None]])` : A function scheduling a callback on the event loop of the interface (for instance, `Document.add_next_tick_callback` in a Panel server). Defaults to None (the callback is run directly in the background thread).
+    - `on_busy_change (Optional[Callable[[bool], None]])` : A function called (through `dispatch`) with `True` when an update starts and with `False` when the latest update is done. Defaults to None.
+    """
+    def __init__(
+            self,
+            dispatch: Optional[Callable[[Callable[[], None]], None]] = None,
+            on_busy_change: Optional[Callable[[bool], None]] = None
+        ) -> None:
+        self._dispatch = dispatch or (lambda callback: callback())
+        self._on_busy_change = on_busy_change or (lambda busy: None)
+
+        self._executor: ThreadPoolExecutor = None # Created on the first request.
+        self._generation: int = 0                 # Identifier of the latest request.
+        self._pending_futures: List[Future] = []
+        self._lock = Lock()
+
+        # Set when the latest request is applied or invalidated :
+        self._idle = Event()
+        self._idle.set()
+
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether an update is currently running or waiting to be applied.
+
+        #### Returns :
+        - `bool` : `True` if an update is running or waiting to be applied, `False` otherwise.
+        """
+        with self._lock:
+            return any(not future.done() for future in self._pending_futures)
+
+
+    def submit(
+            self,
+            compute: Callable[[], Any],
+            apply: Callable[[Any], None]
+        ) -> None:
+        """
+        Submit a new update request, superseding all the older requests.
+
+        #### Arguments :
+        - `compute (Callable[[], Any])` : The function computing the update result (run in a background thread).
+        - `apply (Callable[[Any], None])` : The function applying the update result to the interface (run through `dispatch`, only if this request is still the latest one).
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._idle.clear()
+
+            # Cancel the older requests which have not started yet :
+            for future in self._pending_futures:
+                future.cancel()
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "fresque-aeromaps-update")
+
+            future = self._executor.submit(compute)
+            self._pending_futures = [future for future in self._pending_futures if not future.done()] + [future]
+
+        self._on_busy_change(True)
+        future.add_done_callback(lambda future: self._on_done(future, generation, apply))
+
+
+    def invalidate(self) -> None:
+        """
+        Discard the results of all the pending update requests (for instance, when the interface changed in a way making them obsolete).
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+            for future in self._pending_futures:
+                future.cancel()
+
+        def end_busy_state() -> None:
+            self._on_busy_change(False)
+            self._set_idle(generation)
+
+        self._dispatch(end_busy_state)
+
+
+    def close(self) -> None:
+        """
+        Discard the pending update requests and stop the background thread (for instance, when the session of the interface is destroyed).
+        """
+        with self._lock:
+            self._generation += 1
+
+            for future in self._pending_futures:
+                future.cancel()
+
+            if self._executor is not None:
+                self._executor.shutdown(wait = False, cancel_futures = True)
+                self._executor = None
+
+        self._idle.set()
+
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the latest update request is applied to the interface (or invalidated).
+
+        #### Arguments :
+        - `timeout (Optional[float])` : The maximal waiting time, in seconds. Defaults to None (no limit).
+
+        #### Returns :
+        - `bool` : `True` if the latest request is applied, `False` if the timeout expired first.
+        """
+        return self._idle.wait(timeout)
+
+
+    def _is_latest(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+
+    def _set_idle(self, generation: int) -> None:
+        # A newer request may have been submitted meanwhile :
+        with self._lock:
+            if generation == self._generation:
+                self._idle.set()
+
+
+    def _on_done(
+            self,
+            future: Future,
+            generation: int,
+            apply: Callable[[Any], None]
+        ) -> None:
+        # Discard the cancelled and superseded requests (the latest request will end the busy state) :
+        if future.cancelled() or not self._is_latest(generation):
+            return
+
+        def apply_latest_result() -> None:
+            # The request may have been superseded while waiting for the event loop :
+            if not self._is_latest(generation):
+                return
+
+            try:
+                apply(future.result())
+            except Exception:
+                LOGGER.exception("The update of the interface failed.")
+            finally:
+                self._on_busy_change(False)
+                self._set_idle(generation)
+
+        self._dispatch(apply_latest_result)
@@ -1,11 +1,14 @@
-from typing import List, Union
+from typing import Any, Iterable, List, Union
 
-from ipywidgets import Box, VBox, Layout, GridspecLayout, Checkbox, HTML, Label, Button, IntSlider
+import comm
+
+from ipywidgets import Accordion, Box, VBox, Layout, GridspecLayout, Checkbox, HTML, Label, Button, IntSlider, Widget
 
 import markdown
 
+from crud.crud_cards import get_cards_registry
+
 from ui.utils.fresque_aeromaps_UI_constants import (
-    CARDS_NAMES,
     DEFAULT_NUMBER_OF_GROUPS,
     MIN_NUMBER_OF_GROUPS,
     MAX_NUMBER_OF_GROUPS,
@@ -20,7 +23,8 @@ from ui.utils.fresque_aeromaps_UI_constants import (
     CHECKBOXES_GRID_LAYOUT,
     CHECKBOXES_GRID_CELL_LAYOUT,
     CHECKBOXES_GRID_LABEL_LAYOUT,
-    CHECKBOXES_GRID_CHECKBOX_LAYOUT
+    CHECKBOXES_GRID_CHECKBOX_LAYOUT,
+    SECTION_ACCORDION_LAYOUT
 )
 
 from utils import APPLICATION_EXPLANATIONS_PATH
@@ -87,8 +91,10 @@ def initialize_checkboxes_grid(
     #### Returns :
     - `GridspecLayout` : The grid layout containing the checkboxes.
     """
+    cards_names = get_cards_registry().names
+
     # Check if the checkboxes_lists is in the correct format :
-    error_message = "checkboxes_lists must be a list of lists containing Checkbox widgets, with each inner list having the same length as CARDS_NAMES."
+    error_message = "checkboxes_lists must be a list of lists containing Checkbox widgets, with each inner list having the same length as the cards names."
 
     if not isinstance(checkboxes_lists, list) or len(checkboxes_lists) != number_of_groups:
         raise ValueError(error_message)
@@ -96,8 +102,8 @@ def initialize_checkboxes_grid(
     for checkboxes_list in checkboxes_lists:
         if not isinstance(checkboxes_list, list) :
             raise ValueError(error_message)
-        # Check if each inner list contains Checkbox widgets and has the same length as CARDS_NAMES :
-        if len(checkboxes_list) != len(CARDS_NAMES) or not all(isinstance(checkbox, Checkbox) for checkbox in checkboxes_list):
+        # Check if each inner list contains Checkbox widgets and has the same length as the cards names :
+        if len(checkboxes_list) != len(cards_names) or not all(isinstance(checkbox, Checkbox) for checkbox in checkboxes_list):
             raise ValueError(error_message)
 
     # Create a wrapper function to create the checkboxes grid cells :
@@ -133,7 +139,7 @@ def initialize_checkboxes_grid(
         )
 
     # Get the number of rows and columns for the grid layout :
-    number_of_rows    = len(CARDS_NAMES) + 1 # +1 for the "Groups names" row.
+    number_of_rows    = len(cards_names) + 1 # +1 for the "Groups names" row.
     number_of_columns = number_of_groups + 2 # +2 for the "Cards names" column and the "Reference scenario" column.
 
     # Initialize the grid layout for the checkboxes :
@@ -150,7 +156,7 @@ def initialize_checkboxes_grid(
     )
 
     # Initialise the "Cards names" column :
-    for index_row, card_name in enumerate(CARDS_NAMES):
+    for index_row, card_name in enumerate(cards_names):
         label = Label(
             value = card_name,
             layout = Layout(**CHECKBOXES_GRID_LABEL_LAYOUT)
@@ -159,7 +165,7 @@ def initialize_checkboxes_grid(
 
     # Initialize the "Reference scenario" column :
     grid[0, 1] = create_cell_checkboxes_grid(Label(value = "Scénario de référence"), ["top", "right", "bottom"])
-    for index_row, card_name in enumerate(CARDS_NAMES):
+    for index_row, card_name in enumerate(cards_names):
         checkbox = Checkbox(
             value = False,
             indent = False,
@@ -177,7 +183,7 @@ def initialize_checkboxes_grid(
         )
         grid[0, index_column] = create_cell_checkboxes_grid(label, ["top", "right", "bottom"])
         # Create the checkboxes for each group :
-        for index_row, card_name in enumerate(CARDS_NAMES):
+        for index_row, card_name in enumerate(cards_names):
             # Create the checkbox for the current group :
             checkbox = checkboxes_lists[index_column - 2][index_row]
             checkbox.indent = False
@@ -264,6 +270,26 @@ def draw_multidisciplinary_graphs_title() -> Box:
     )
 
 
+def draw_section_accordion(content: Box, title: str, expanded: bool = True) -> Accordion:
+    """
+    Draws a collapsible section of figures.
+
+    #### Arguments :
+    - `content (Box)` : The content of the section.
+    - `title (str)` : The title of the header of the section.
+    - `expanded (bool)` : Whether the section is expanded. Defaults to `True`.
+
+    #### Returns :
+    - `Accordion` : An accordion with a single panel containing the content of the section.
+    """
+    return Accordion(
+        children = [content],
+        titles = (title,),
+        selected_index = 0 if expanded else None,
+        layout = Layout(**SECTION_ACCORDION_LAYOUT)
+    )
+
+
 def draw_update_button() -> Button:
     """
     Draws the update button to update all the figures.
@@ -276,4 +302,91 @@ def draw_update_button() -> Button:
         button_style = "success",
         style = BUTTON_STYLE,
         layout = Layout(**BUTTON_LAYOUT)
-    )
\ No newline at end of file
+    )
+
+
+def set_update_button_busy(update_button: Button, busy: bool) -> None:
+    """
+    Displays (or hides) the busy state of the update button, while the figures are being updated.
+
+    #### Arguments :
+    - `update_button (Button)` : The update button.
+    - `busy (bool)` : Whether the figures are being updated.
+    """
+    if busy:
+        update_button.description  = "Mise à jour des graphiques en cours..."
+        update_button.button_style = "warning"
+        update_button.icon         = "hourglass-half"
+    else:
+        update_button.description  = "Mettre à jour les graphiques"
+        update_button.button_style = "success"
+        update_button.icon         = ""
+
+
+def get_widgets_tree(roots: Iterable[Any]) -> List[Widget]:
+    """
+    Get all the widgets of several widgets trees : the roots, and the widgets referenced by their synchronized attributes (children, layouts, styles, figures marks and scales...), recursively.
+
+    #### Arguments :
+    - `roots (Iterable[Any])` : The roots of the trees (the values which are not widgets are ignored).
+
+    #### Returns :
+    - `List[Widget]` : The distinct widgets of the trees.
+    """
+    widgets = {}
+    pending_values = list(roots)
+    while pending_values:
+        value = pending_values.pop()
+        if isinstance(value, Widget) and id(value) not in widgets:
+            widgets[id(value)] = value
+            pending_values.extend(getattr(value, key, None) for key in value.keys)
+        elif isinstance(value, (list, tuple)):
+            pending_values.extend(value)
+        elif isinstance(value, dict):
+            pending_values.extend(value.values())
+
+    return list(widgets.values())
+
+
+def get_kernel_widgets(widget: Widget) -> List[Widget]:
+    """
+    Get all the open widgets whose comms share the kernel of a widget.
+
+    In a Panel server, each session has its own kernel : these are all the widgets created by the session, including the widgets not reachable from its interface anymore (for instance, the default layouts replaced after the creation of a widget).
+
+    #### Arguments :
+    - `widget (Widget)` : A widget of the session.
+
+    #### Returns :
+    - `List[Widget]` : The open widgets sharing the kernel of the widget (none if the widget has no kernel).
+    """
+    kernel = getattr(widget.comm, "kernel", None)
+    if kernel is None:
+        return []
+
+    return [other_widget for other_widget in list(Widget.widgets.values()) if getattr(other_widget.comm, "kernel", None) is kernel]
+
+
+def close_widgets(widgets: Iterable[Widget], notify_frontend: bool = True) -> None:
+    """
+    Closes widgets, so they are removed from the registry of the widgets library and can be garbage collected.
+
+    #### Arguments :
+    - `widgets (Iterable[Widget])` : The widgets to close (see `get_widgets_tree`).
+    - `notify_frontend (bool)` : If False, the closing messages are not sent (for instance, when the Panel session displaying the widgets is already destroyed). Defaults to True.
+    """
+    for widget in widgets:
+        widget_comm = widget.comm
+        if notify_frontend or widget_comm is None:
+            widget.close()
+            continue
+
+        # The comm is detached from the widget, so closing it sends no message. The widget is removed from the registry of the widgets library,
+        # and its comm from the comms managers (the global one, and the one of the kernel of the session in a Panel server) :
+        widget.comm = None
+        Widget.widgets.pop(widget_comm.comm_id, None)
+
+        kernel = getattr(widget_comm, "kernel", None)
+        for comms_manager in (comm.get_comm_manager(), getattr(kernel, "comm_manager", None)):
+            if comms_manager is not None and widget_comm.comm_id in comms_manager.comms:
+                comms_manager.unregister_comm(widget_comm)
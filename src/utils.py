@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 
 from pathlib import Path
 
@@ -10,13 +10,19 @@ import colorsys
 ROOT_DIRECTORY_PATH = Path(__file__).resolve().parents[1]
 DATAFILES_PATH = ROOT_DIRECTORY_PATH / "data"
 
-# Paths to the JSON data files :
-CARDS_JSON_PATH = DATAFILES_PATH / "graphs_json" / "cards" / "cards.json"
+# Paths to the JSON data files (the charts and cards configuration, reloaded live when changed) :
+GRAPHS_JSON_PATH = DATAFILES_PATH / "graphs_json"
 
-PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH = DATAFILES_PATH / "graphs_json" / "prospective_scenario_graph" / "prospective_scenario_aspects_areas.json"
-PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH = DATAFILES_PATH / "graphs_json" / "prospective_scenario_graph" / "prospective_scenario_aspects_lines.json"
+CARDS_JSON_PATH            = GRAPHS_JSON_PATH / "cards" / "cards.json"
+CARDS_PARAMETERS_JSON_PATH = GRAPHS_JSON_PATH / "cards" / "cards_parameters.json"
 
-MULTIDISCIPLINARY_BARS_JSON_PATH = DATAFILES_PATH / "graphs_json" / "multidisciplinary_graph" / "multidisciplinary_bars.json"
+PROSPECTIVE_SCENARIO_ASPECTS_AREAS_JSON_PATH = GRAPHS_JSON_PATH / "prospective_scenario_graph" / "prospective_scenario_aspects_areas.json"
+PROSPECTIVE_SCENARIO_ASPECTS_LINES_JSON_PATH = GRAPHS_JSON_PATH / "prospective_scenario_graph" / "prospective_scenario_aspects_lines.json"
+
+MULTIDISCIPLINARY_BARS_JSON_PATH = GRAPHS_JSON_PATH / "multidisciplinary_graph" / "multidisciplinary_bars.json"
+
+# Path to the precomputed scenarios file (built by the `core.aeromaps_utils.scenario_lattice` module) :
+SCENARIO_LATTICE_PATH = DATAFILES_PATH / "scenario_lattice.pkl"
 
 # Paths to the Application utility files :
 APPLICATION_EXPLANATIONS_PATH = DATAFILES_PATH / "fresque-aeromaps_application_explanation.md"
@@ -54,46 +60,45 @@ def generate_pastel_palette(number_of_colors: int) -> list[str]:
     return palette
 
 
-def get_all_distances(values: List[float]) -> List[float]:
-    """
-    Returns the list of all distances between all of the values.
-
-    #### Arguments :
-    - `values (List[float])` : A list of float values.
-
-    #### Returns :
-    - `List(float)` : A list of `n * (n - 1) / 2` distances between all of the values, where `n` is the number of values.
+def spread_values(values: List[float], minimal_distance: float) -> List[float]:
     """
-    # If there are less than 2 values, return an empty list :
-    if len(values) < 2:
-        return []
-
-    # Calculate the distances between all of the values :
-    distances = []
-    for index_first_value, first_value in enumerate(values):
-        for second_value in values[index_first_value + 1:]:
-            distances.append(abs(first_value - second_value))
-
-    # Sort the distances :
-    distances.sort()
-
-    return distances
+    Moves the values apart so that any two of them are at least `minimal_distance` apart (for instance, to place labels without overlap).
 
-
-def get_first_positive_minimal_distance(values: List[float]) -> float:
-    """
-    Returns the first minimal distance greater than 0 between all of the values.
+    The values are sorted, and each run of values closer than the minimal distance is spread evenly around its mean (runs which overlap once spread are merged and spread again).
+    The values already far enough from the others are not moved, and the order of the values is preserved.
 
     #### Arguments :
     - `values (List[float])` : A list of float values.
+    - `minimal_distance (float)` : The minimal distance between two spread values.
 
     #### Returns :
-    - `float` : The first minimal distance greater than 0 between all of the values or 0.0 if there are no positive distances.
+    - `List[float]` : The spread values, in the same order as the given values.
     """
-    # Get all of the distances (sorted) :
-    all_distances = get_all_distances(values)
-
-    # Get all of the positive distances :
-    positive_distances = [distance for distance in all_distances if distance > 0]
-
-    return min(positive_distances) if positive_distances else 0.0
+    if minimal_distance < 0:
+        raise ValueError("The minimal distance must be positive.")
+
+    order = sorted(range(len(values)), key = lambda index: values[index])
+
+    # Merge the sorted values into runs, each run being spread around its mean (`(number of values, sum of the values)`) :
+    runs: List[Tuple[int, float]] = []
+    for index in order:
+        runs.append((1, values[index]))
+        while len(runs) > 1:
+            (previous_count, previous_sum), (count, total) = runs[-2], runs[-1]
+            previous_top = previous_sum / previous_count + (previous_count - 1) / 2 * minimal_distance
+            bottom       = total / count - (count - 1) / 2 * minimal_distance
+            if bottom - previous_top >= minimal_distance:
+                break
+
+            runs[-2:] = [(previous_count + count, previous_sum + total)]
+
+    # Spread the values of each run evenly around its mean :
+    spread = [0.0] * len(values)
+    position = 0
+    for count, total in runs:
+        first_value = total / count - (count - 1) / 2 * minimal_distance
+        for rank in range(count):
+            spread[order[position + rank]] = first_value + rank * minimal_distance
+        position += count
+
+    return spread
@@ -0,0 +1,117 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from pandas import DataFrame, Series
+
+from core.aeromaps_utils.evaluate_expression import CompiledFormula, evaluate_formulas_batch
+from core.aeromaps_utils.scenario_result import ScenarioBatch, ScenarioResult
+
+
+
+
+FULL_YEARS = list(range(2000, 2051))
+
+VARIABLES = {
+    "float_inputs": ("fleet_share",),
+    "float_outputs": ("carbon_budget",),
+    "vector_outputs": ("co2_emissions", "energy_consumption"),
+    "climate_outputs": ("temperature_increase",)
+}
+
+
+def create_scenario_result(seed: int) -> ScenarioResult:
+    """
+    Creates a scenario result with random values for the `VARIABLES`.
+    """
+    random = np.random.default_rng(seed)
+
+    process_data = {
+        "years": {
+            "full_years": FULL_YEARS,
+            "historic_years": list(range(2000, 2020)),
+            "prospective_years": list(range(2019, 2051))
+        },
+        "float_inputs": {"fleet_share": random.uniform(0.1, 1.0)},
+        "float_outputs": {"carbon_budget": random.uniform(100.0, 1000.0)},
+        "vector_outputs": DataFrame(
+            {
+                "co2_emissions": random.uniform(0.0, 1000.0, len(FULL_YEARS)),
+                "energy_consumption": random.uniform(0.0, 100.0, len(FULL_YEARS))
+            },
+            index = FULL_YEARS
+        ),
+        "climate_outputs": DataFrame({"temperature_increase": random.uniform(0.0, 3.0, len(FULL_YEARS))}, index = FULL_YEARS)
+    }
+
+    return ScenarioResult(process_data, VARIABLES)
+
+
+@pytest.fixture
+def scenarios_results() -> List[ScenarioResult]:
+    return [create_scenario_result(seed) for seed in range(4)]
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "float_inputs('fleet_share').__class__",
+    "(lambda: 1)()",
+    "open('data')",
+    "float_inputs(__name__)",
+    "max(1)",
+    "[1, 2]",
+    "1 if float_inputs('fleet_share') else 2",
+    "vector_outputs('co2_emissions')[0]"
+])
+def test_compiled_formula_rejects_non_allowed_expressions(expression):
+    with pytest.raises(ValueError):
+        CompiledFormula(expression, "full_years")
+
+
+def test_compiled_formula_rejects_vector_variables_without_year_range():
+    with pytest.raises(ValueError):
+        CompiledFormula("vector_outputs('co2_emissions')")
+
+
+def test_compiled_formula_records_its_dependencies():
+    formula = CompiledFormula("max(vector_outputs('co2_emissions'), 1) * float_inputs('fleet_share')", "full_years")
+
+    assert formula.dependencies == {("vector_outputs", "co2_emissions"), ("float_inputs", "fleet_share")}
+
+
+@pytest.mark.parametrize("expression, year_range", [
+    ("vector_outputs('co2_emissions') * float_inputs('fleet_share') + max(climate_outputs('temperature_increase'), 1)", "prospective_years"),
+    ("-vector_outputs('energy_consumption') / 2 ** 3 - min(vector_outputs('co2_emissions'), float_outputs('carbon_budget'))", "historic_years"),
+    ("vector_outputs('co2_emissions') / float_outputs('carbon_budget')", 2050),
+    ("float_inputs('fleet_share') * float_outputs('carbon_budget')", None),
+    ("2 + 3", "full_years")
+])
+def test_evaluate_batch_matches_evaluate(scenarios_results, expression, year_range):
+    formula = CompiledFormula(expression, year_range)
+
+    batch_values = formula.evaluate_batch(ScenarioBatch(scenarios_results))
+
+    assert len(batch_values) == len(scenarios_results)
+    for scenario_result, batch_value in zip(scenarios_results, batch_values):
+        value = formula.evaluate(scenario_result)
+        if isinstance(value, Series):
+            assert isinstance(batch_value, Series)
+            assert list(batch_value.index) == list(value.index)
+            np.testing.assert_allclose(batch_value.to_numpy(), value.to_numpy())
+        else:
+            assert batch_value == pytest.approx(value)
+
+
+def test_evaluate_formulas_batch_returns_the_values_of_each_scenario(scenarios_results):
+    formulas = [
+        CompiledFormula("vector_outputs('co2_emissions')", "full_years"),
+        CompiledFormula("float_outputs('carbon_budget')")
+    ]
+
+    values = evaluate_formulas_batch(formulas, scenarios_results)
+
+    assert len(values) == len(scenarios_results)
+    for scenario_result, scenario_values in zip(scenarios_results, values):
+        np.testing.assert_allclose(scenario_values[0].to_numpy(), formulas[0].evaluate(scenario_result).to_numpy())
+        assert scenario_values[1] == pytest.approx(formulas[1].evaluate(scenario_result))
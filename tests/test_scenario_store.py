@@ -0,0 +1,147 @@
+import gc
+import time
+
+from threading import Barrier, Lock, Thread
+
+from core.aeromaps_utils.scenario_store import ScenarioStore
+
+
+
+
+class Scenario:
+    """
+    Scenario of a given memory size (weakly referenceable, like a `ScenarioResult`).
+    """
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+
+
+def create_store(max_bytes: int = 100) -> ScenarioStore:
+    return ScenarioStore(max_bytes = max_bytes, get_size = lambda scenario: scenario.size)
+
+
+def test_get_or_compute_computes_once_per_key_under_concurrency():
+    store = create_store()
+    number_of_threads = 8
+    barrier = Barrier(number_of_threads)
+
+    computations = []
+    computations_lock = Lock()
+
+    def compute() -> Scenario:
+        with computations_lock:
+            computations.append(1)
+        time.sleep(0.05) # Let the other callers request the scenario while it is computed.
+        return Scenario("a", 10)
+
+    results = [None] * number_of_threads
+
+    def request(index: int) -> None:
+        barrier.wait()
+        results[index] = store.get_or_compute("a", compute)
+
+    threads = [Thread(target = request, args = (index,)) for index in range(number_of_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(computations) == 1
+    assert all(result is results[0] for result in results)
+
+    statistics = store.get_statistics()
+    assert statistics["misses"] == 1
+    assert statistics["hits"] == number_of_threads - 1
+
+
+def test_get_or_compute_computes_again_after_a_failure():
+    store = create_store()
+
+    def fail() -> Scenario:
+        raise RuntimeError("Computation failed")
+
+    try:
+        store.get_or_compute("a", fail)
+    except RuntimeError:
+        pass
+
+    assert "a" not in store
+    assert store.get_or_compute("a", lambda: Scenario("a", 10)).name == "a"
+
+
+def test_put_evicts_the_least_recently_used_scenarios_by_size():
+    store = create_store(max_bytes = 100)
+
+    store.put("a", Scenario("a", 40))
+    store.put("b", Scenario("b", 40))
+    store.get("a") # "b" becomes the least recently used scenario.
+    store.put("c", Scenario("c", 40))
+
+    assert len(store) == 2
+    assert store.get_statistics()["bytes"] == 80
+    assert store.get_statistics()["evictions"] == 1
+    assert store.get("b") is None
+    assert store.get("a").name == "a"
+    assert store.get("c").name == "c"
+
+
+def test_put_keeps_the_latest_scenario_larger_than_the_store():
+    store = create_store(max_bytes = 100)
+
+    store.put("a", Scenario("a", 40))
+    store.put("b", Scenario("b", 150))
+
+    assert len(store) == 1
+    assert store.get("b").name == "b"
+
+
+def test_evicted_scenarios_still_referenced_are_adopted_again():
+    store = create_store(max_bytes = 100)
+
+    scenario_a = Scenario("a", 60)
+    store.put("a", scenario_a)
+    store.put("b", Scenario("b", 60)) # Evicts "a", still referenced here.
+
+    assert store.get_or_compute("a", lambda: Scenario("a (computed again)", 60)) is scenario_a
+
+
+def test_released_scenarios_still_referenced_are_adopted_again():
+    store = create_store()
+
+    scenario_a = Scenario("a", 10)
+    store.put("a", scenario_a)
+    store.put("b", Scenario("b", 10))
+    assert store.release() == 2
+    assert len(store) == 0
+
+    # "a" is still referenced here, "b" is not anymore :
+    gc.collect()
+    assert store.get_or_compute("a", lambda: Scenario("a (computed again)", 10)) is scenario_a
+    assert store.get_or_compute("b", lambda: Scenario("b (computed again)", 10)).name == "b (computed again)"
+
+
+def test_evict_removes_the_matching_scenarios():
+    store = create_store()
+
+    scenario_a = Scenario("a", 10)
+    store.put("a", scenario_a)
+    store.put("b", Scenario("b", 10))
+
+    assert store.evict(lambda scenario: scenario.name == "a") == 1
+    assert "a" not in store # Not adopted again, even though it is still referenced here.
+    assert "b" in store
+
+
+def test_clear_keeps_the_statistics():
+    store = create_store()
+
+    store.get_or_compute("a", lambda: Scenario("a", 10))
+    store.get_or_compute("a", lambda: Scenario("a", 10))
+    store.clear()
+
+    statistics = store.get_statistics()
+    assert statistics["entries"] == 0
+    assert statistics["bytes"] == 0
+    assert statistics["hits"] == 1
+    assert statistics["misses"] == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from utils import spread_values
+
+
+
+
+def assert_spread(values, spread, minimal_distance):
+    """
+    Checks that the spread values keep the order of the values and are at least `minimal_distance` apart.
+    """
+    assert len(spread) == len(values)
+
+    order = sorted(range(len(values)), key = lambda index: values[index])
+    assert sorted(range(len(spread)), key = lambda index: spread[index]) == order
+
+    sorted_spread = sorted(spread)
+    for previous_value, value in zip(sorted_spread, sorted_spread[1:]):
+        assert value - previous_value >= minimal_distance - 1e-9
+
+
+@pytest.mark.parametrize("values, minimal_distance", [
+    ([], 1.0),
+    ([5.0], 1.0),
+    ([0.0, 0.0, 0.0], 1.0),
+    ([3.0, 1.0, 2.0, 1.5, 10.0], 1.0),
+    ([10.0, 10.2, 10.4, 11.0, 11.1, 30.0, 30.5], 2.0),
+    ([0.5 * index for index in range(20)], 1.0),
+    ([7.0, -2.0, 7.1, -2.1, 0.0], 0.5)
+])
+def test_spread_values_keeps_the_minimal_distance_and_the_order(values, minimal_distance):
+    spread = spread_values(values, minimal_distance)
+
+    assert_spread(values, spread, minimal_distance)
+
+
+def test_spread_values_does_not_move_the_values_far_enough_apart():
+    values = [5.0, 0.0, 10.0]
+
+    assert spread_values(values, 2.0) == values
+
+
+def test_spread_values_spreads_close_values_around_their_mean():
+    spread = spread_values([1.0, 1.0, 10.0], 2.0)
+
+    assert spread == pytest.approx([0.0, 2.0, 10.0])
+
+
+def test_spread_values_rejects_a_negative_distance():
+    with pytest.raises(ValueError):
+        spread_values([1.0, 2.0], -1.0)